@@ -1,19 +1,40 @@
 import streamlit as st
-import requests
+import hashlib
 import json
-from langdetect import detect, DetectorFactory
 import re
 import random
-from config import HUGGINGFACE_TOKEN
+from config import (
+    HUGGINGFACE_TOKEN,
+    FAST_LANGUAGE_ID,
+    TRANSLITERATE_INPUT,
+    REQUEST_TIMEOUT,
+    CHAT_RESPONSE_DEADLINE,
+    AI_RESPONSE_CACHE_TTL,
+)
+from transliteration import transliterate, fold_for_matching
+from language_id import TELUGU_SCRIPT, identify_language
+from http_client import get_session
+from metrics import timed
+from shared_cache import cache_requests, get_shared_cache
+from resilience import (
+    CircuitOpenError,
+    Deadline,
+    DeadlineExceeded,
+    deadline,
+    get_breaker,
+    timeout_for,
+)
 
-# Set seed for consistent language detection
-DetectorFactory.seed = 0
+# detect_language results that should get a Telugu reply
+TELUGU_LANGUAGES = ("telugu", "mixed", "romanized_telugu")
 
 class TeluguAI:
     def __init__(self):
         self.hf_token = HUGGINGFACE_TOKEN
         self.api_url = "https://api-inference.huggingface.co/models/microsoft/DialoGPT-medium"
         self.headers = {"Authorization": f"Bearer {self.hf_token}"}
+        self.breaker = get_breaker("huggingface")
+        self.cache = get_shared_cache()
         
         # Fallback responses
         self.telugu_responses = {
@@ -63,70 +84,162 @@ class TeluguAI:
             "thanks": "thanks",
             "thank u": "thanks"
         }
+        
+        # Telugu keyword patterns, checked in order
+        self.telugu_keywords = [
+            ("greeting", ["నమస్కారం", "హలో", "హాయ్", "వందనలు"]),
+            ("howaru", ["ఎలా ఉన్నారు", "ఎలా ఉన్నావు", "సంగతేంటి"]),
+            ("help", ["సహాయం", "హెల్ప్", "సపోర్ట్"]),
+            ("thanks", ["ధన్యవాదాలు", "థాంక్ యు", "కృతజ్ఞతలు"]),
+        ]
+        self.folded_telugu_keywords = [
+            (category, [fold_for_matching(keyword) for keyword in keywords])
+            for category, keywords in self.telugu_keywords
+        ]
+        self.latin_pattern = re.compile(r'[a-zA-Z]')
     
     def detect_language(self, text):
         """Detect if text is Telugu, English, or mixed"""
         # Check for Telugu script
-        telugu_pattern = re.compile(r'[\u0C00-\u0C7F]')
-        has_telugu = bool(telugu_pattern.search(text))
+        has_telugu = bool(TELUGU_SCRIPT.search(text))
         
         # Check for English
-        english_pattern = re.compile(r'[a-zA-Z]')
-        has_english = bool(english_pattern.search(text))
+        has_english = bool(self.latin_pattern.search(text))
         
         if has_telugu and has_english:
             return "mixed"
         elif has_telugu:
             return "telugu"
         elif has_english:
+            if FAST_LANGUAGE_ID:
+                # Latin script may still be Telugu typed phonetically
+                return identify_language(text)
             return "english"
         else:
             return "unknown"
     
+    def _cache_key(self, text):
+        return "ai:" + hashlib.sha1(f"{self.api_url}\0{text}".encode("utf-8")).hexdigest()
+    
+    @timed("ai.query_huggingface")
     def query_huggingface(self, text):
-        """Query Hugging Face API"""
+        """Query Hugging Face API, sharing replies for the same message across workers"""
         if not self.hf_token or self.hf_token == "":
             return None
-            
+        
+        def compute():
+            reply = self._query_huggingface(text)
+            # Failures are not cached, only real replies
+            return reply.encode("utf-8") if reply else None
+        
+        try:
+            # Waiting on another worker's identical request stays within the deadline
+            lease_ttl = timeout_for(REQUEST_TIMEOUT)
+        except DeadlineExceeded:
+            return None
+        reply = self.cache.get_or_set(
+            self._cache_key(text), compute, AI_RESPONSE_CACHE_TTL,
+            lease_ttl=lease_ttl, name="ai",
+        )
+        return reply.decode("utf-8") if reply is not None else None
+    
+    def _query_huggingface(self, text):
         try:
             payload = {"inputs": text}
-            response = requests.post(self.api_url, headers=self.headers, json=payload, timeout=10)
+            with self.breaker.guard():
+                response = get_session().post(self.api_url, headers=self.headers, json=payload,
+                                              timeout=timeout_for(REQUEST_TIMEOUT))
+                if response.status_code >= 500:
+                    response.raise_for_status()
             
             if response.status_code == 200:
                 result = response.json()
                 if isinstance(result, list) and len(result) > 0:
                     return result[0].get('generated_text', '').replace(text, '').strip()
             return None
+        except (CircuitOpenError, DeadlineExceeded):
+            return None
         except Exception as e:
             print(f"Hugging Face API error: {e}")
             return None
     
+    @timed("ai.stream_huggingface")
+    def stream_huggingface(self, text, budget=None):
+        """Stream generated text from Hugging Face, falling back to a single chunk"""
+        if not self.hf_token or self.hf_token == "":
+            return
+            
+        key = self._cache_key(text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            cache_requests.inc(cache="ai", result="hit")
+            yield cached.decode("utf-8")
+            return
+        cache_requests.inc(cache="ai", result="miss")
+        
+        try:
+            payload = {"inputs": text, "stream": True}
+            with self.breaker.guard():
+                response = get_session().post(self.api_url, headers=self.headers, json=payload,
+                                              timeout=timeout_for(REQUEST_TIMEOUT, budget),
+                                              stream=True)
+                # Closing returns the connection to the pool, however the stream ends
+                with response:
+                    if response.status_code >= 500:
+                        response.raise_for_status()
+                    if response.status_code != 200:
+                        return
+                
+                    # Models without streaming support answer with a normal JSON body
+                    if "text/event-stream" not in response.headers.get("content-type", ""):
+                        result = response.json()
+                        if isinstance(result, list) and len(result) > 0:
+                            reply = result[0].get('generated_text', '').replace(text, '').strip()
+                            if reply:
+                                self.cache.set(key, reply.encode("utf-8"), AI_RESPONSE_CACHE_TTL)
+                            yield reply
+                        return
+                    
+                    parts = []
+                    for line in response.iter_lines():
+                        if budget is not None and budget.remaining() <= 0:
+                            # Keep what has been shown, stop waiting for the rest
+                            return
+                        if not line.startswith(b"data:"):
+                            continue
+                        event = json.loads(line[5:])
+                        token = event.get("token", {})
+                        if token.get("special"):
+                            continue
+                        if token.get("text"):
+                            parts.append(token["text"])
+                            yield token["text"]
+                    
+                    # Only a reply that streamed to the end is shared
+                    if "".join(parts).strip():
+                        self.cache.set(key, "".join(parts).encode("utf-8"), AI_RESPONSE_CACHE_TTL)
+        except (CircuitOpenError, DeadlineExceeded):
+            return
+        except Exception as e:
+            print(f"Hugging Face streaming error: {e}")
+    
     def get_telugu_response_category(self, text):
         """Determine response category based on input"""
         text_lower = text.lower()
         
-        # Telugu keyword patterns
-        telugu_greetings = ["నమస్కారం", "హలో", "హాయ్", "వందనలు"]
-        telugu_howaru = ["ఎలా ఉన్నారు", "ఎలా ఉన్నావు", "సంగతేంటి"]
-        telugu_help = ["సహాయం", "హెల్ప్", "సపోర్ట్"]
-        telugu_thanks = ["ధన్యవాదాలు", "థాంక్ యు", "కృతజ్ఞతలు"]
-        
         # Check Telugu patterns
-        for greeting in telugu_greetings:
-            if greeting in text:
-                return "greeting"
+        for category, keywords in self.telugu_keywords:
+            for keyword in keywords:
+                if keyword in text:
+                    return category
         
-        for howaru in telugu_howaru:
-            if howaru in text:
-                return "howaru"
-                
-        for help_word in telugu_help:
-            if help_word in text:
-                return "help"
-                
-        for thanks in telugu_thanks:
-            if thanks in text:
-                return "thanks"
+        # Romanized Telugu is transliterated once and matched loosely
+        if TRANSLITERATE_INPUT and self.latin_pattern.search(text):
+            folded = fold_for_matching(transliterate(text))
+            for category, keywords in self.folded_telugu_keywords:
+                for keyword in keywords:
+                    if keyword in folded:
+                        return category
         
         # Check English patterns
         for eng_phrase, category in self.english_to_telugu.items():
@@ -135,6 +248,7 @@ class TeluguAI:
         
         return "default"
     
+    @timed("ai.generate_response")
     def generate_response(self, user_input: str) -> str:
         """Generate AI response supporting both English and Telugu"""
         try:
@@ -149,26 +263,85 @@ class TeluguAI:
             
             # Try Hugging Face API first if available
             if self.hf_token:
-                hf_response = self.query_huggingface(user_input)
+                with deadline(CHAT_RESPONSE_DEADLINE):
+                    hf_response = self.query_huggingface(user_input)
                 if hf_response and len(hf_response) > 10:
                     # If HF gives English response but user prefers Telugu, translate concept
-                    if lang in ["telugu", "mixed"]:
+                    if lang in TELUGU_LANGUAGES:
                         return self.adapt_response_to_telugu(hf_response, user_input)
                     return hf_response
             
             # Fallback to rule-based responses
-            category = self.get_telugu_response_category(user_input)
-            
-            if category in self.telugu_responses:
-                responses = self.telugu_responses[category]
-                return random.choice(responses)
-            else:
-                return random.choice(self.telugu_responses["default"])
+            return self.fallback_response(user_input)
                 
         except Exception as e:
             print(f"Error in generate_response: {e}")
             return "క్షమించండి, ప్రస్తుతం నేను సరిగ్గా జవాబు ఇవ్వలేకపోతున్నాను. దయచేసి మళ్లీ ప్రయత్నించండి."
     
+    def chunk_text(self, text):
+        """Split a complete reply into word chunks for incremental display"""
+        return (match.group(0) for match in re.finditer(r'\S+\s*', text))
+    
+    def fallback_response(self, user_input):
+        """Pick a rule-based Telugu response for the input"""
+        category = self.get_telugu_response_category(user_input)
+        
+        if category in self.telugu_responses:
+            responses = self.telugu_responses[category]
+            return random.choice(responses)
+        else:
+            return random.choice(self.telugu_responses["default"])
+    
+    @timed("ai.generate_response_stream")
+    def generate_response_stream(self, user_input: str):
+        """Generate AI response as a stream of text chunks"""
+        yielded = False
+        try:
+            if not user_input.strip():
+                yield "దయచేసి ఏదైనా టైప్ చేయండి."
+                return
+            
+            # Clean input
+            user_input = user_input.strip()
+            
+            # Detect language
+            lang = self.detect_language(user_input)
+            
+            # Try Hugging Face API first if available
+            if self.hf_token:
+                # A deadline object rather than deadline(), which must not span yields
+                budget = Deadline(CHAT_RESPONSE_DEADLINE)
+                if lang in TELUGU_LANGUAGES:
+                    # Adaptation needs the whole English reply before it can be shown
+                    hf_response = "".join(self.stream_huggingface(user_input, budget)).strip()
+                    if len(hf_response) > 10:
+                        yield from self.chunk_text(
+                            self.adapt_response_to_telugu(hf_response, user_input)
+                        )
+                        return
+                else:
+                    # Hold back the first few characters so a too-short reply
+                    # can still fall through to the rule-based responses
+                    head = ""
+                    for chunk in self.stream_huggingface(user_input, budget):
+                        if yielded:
+                            yield chunk
+                            continue
+                        head += chunk
+                        if len(head.strip()) > 10:
+                            yielded = True
+                            yield head.lstrip()
+                    if yielded:
+                        return
+            
+            # Fallback to rule-based responses
+            yield from self.chunk_text(self.fallback_response(user_input))
+                
+        except Exception as e:
+            print(f"Error in generate_response: {e}")
+            if not yielded:
+                yield "క్షమించండి, ప్రస్తుతం నేను సరిగ్గా జవాబు ఇవ్వలేకపోతున్నాను. దయచేసి మళ్లీ ప్రయత్నించండి."
+    
     def adapt_response_to_telugu(self, english_response, original_input):
         """Adapt English response to Telugu context"""
         # Simple adaptation - in production, use proper translation
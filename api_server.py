@@ -0,0 +1,204 @@
+"""
+Headless HTTP API for chat, news and speech.
+
+In the Streamlit app every interaction reruns the whole script, which is
+a lot of work for mobile clients and integrations that only need JSON or
+audio. This is a Starlette ASGI app served by uvicorn, built on the same
+service objects as the app (services.create_services). Those services are
+blocking, so each call runs on a bounded thread pool while the event loop
+keeps accepting connections. Chat replies are streamed as they are
+generated.
+
+    python api_server.py [--host 127.0.0.1] [--port 8000] [--workers 1]
+
+Endpoints:
+    GET  /health                     database and circuit breaker state
+    POST /chat   {"message", "user_id"?, "stream"?}
+                                     reply as streamed text, or JSON with stream=false
+    POST /tts    {"text", "lang"?}   MP3 audio
+    GET  /news?category=all          latest articles, or the newest of one category
+    GET  /news/search?q=&limit=      full-text search over fetched articles
+
+When API_TOKEN is set, every endpoint but /health requires an
+"Authorization: Bearer <token>" header. Chat turns are saved for user_id
+when a database is configured. The server trusts user_id, so keep it on
+localhost or set API_TOKEN.
+"""
+import argparse
+import contextlib
+import functools
+import hmac
+
+import anyio.to_thread
+from starlette.applications import Starlette
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from config import (
+    API_HOST,
+    API_PORT,
+    API_TOKEN,
+    API_WORKER_THREADS,
+    API_MAX_TEXT_CHARS,
+    NEWS_SEARCH_LIMIT,
+    TTS_LANGUAGE,
+)
+from news_category import CATEGORIES, GENERAL
+from resilience import CircuitOpenError, breaker_states
+from services import create_services
+from tts_service import supported_languages, synthesize_speech
+from turn_tasks import TurnOrchestrator
+
+MAX_SEARCH_LIMIT = 100
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Blocking service calls share one pool; requests beyond it wait their turn
+    anyio.to_thread.current_default_thread_limiter().total_tokens = API_WORKER_THREADS
+    state = app.state
+    state.db, state.ai, state.news, state.swecha_api, state.uploader = create_services()
+    state.orchestrator = TurnOrchestrator()
+    yield
+    state.orchestrator.executor.shutdown(wait=True)
+
+
+def protected(handler):
+    """Reject requests without the configured bearer token"""
+    @functools.wraps(handler)
+    async def wrapper(request):
+        if API_TOKEN:
+            supplied = request.headers.get("authorization", "")
+            if not hmac.compare_digest(supplied.encode(), f"Bearer {API_TOKEN}".encode()):
+                raise HTTPException(401, "Missing or invalid bearer token")
+        return await handler(request)
+    return wrapper
+
+
+async def read_text(request, field):
+    """The JSON body and its required, length-checked text field"""
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(400, "Request body must be JSON")
+    text = body.get(field) if isinstance(body, dict) else None
+    if not isinstance(text, str) or not text.strip():
+        raise HTTPException(400, f"'{field}' is required")
+    if len(text) > API_MAX_TEXT_CHARS:
+        raise HTTPException(413, f"'{field}' is longer than {API_MAX_TEXT_CHARS} characters")
+    return body, text
+
+
+def save_turn(state, user_id, message, response):
+    """Persist a chat turn in the background, like the app does"""
+    if state.db is not None and user_id:
+        state.orchestrator.submit(state.db.save_chat_message, str(user_id), message, response, None)
+
+
+async def health(request):
+    db = request.app.state.db
+    return JSONResponse({
+        "status": "ok",
+        "database": db.health if db is not None else "disabled",
+        "breakers": breaker_states(),
+    })
+
+
+@protected
+async def chat(request):
+    body, message = await read_text(request, "message")
+    state = request.app.state
+    user_id = body.get("user_id")
+
+    if body.get("stream", True) is False:
+        response = await run_in_threadpool(state.ai.generate_response, message)
+        save_turn(state, user_id, message, response)
+        return JSONResponse({"response": response})
+
+    async def reply():
+        chunks = []
+        async for chunk in iterate_in_threadpool(state.ai.generate_response_stream(message)):
+            chunks.append(chunk)
+            yield chunk
+        save_turn(state, user_id, message, "".join(chunks))
+
+    return StreamingResponse(reply(), media_type="text/plain; charset=utf-8")
+
+
+@protected
+async def tts(request):
+    body, text = await read_text(request, "text")
+    lang = body.get("lang") or TTS_LANGUAGE
+    if not isinstance(lang, str) or lang not in supported_languages():
+        raise HTTPException(400, f"Unsupported language '{lang}'")
+    try:
+        audio = await run_in_threadpool(synthesize_speech, text, lang)
+    except CircuitOpenError as e:
+        return JSONResponse(
+            {"error": str(e)}, status_code=503,
+            headers={"Retry-After": str(max(1, round(e.retry_in)))},
+        )
+    except Exception as e:
+        print(f"API TTS error: {e}")
+        return JSONResponse({"error": "Speech synthesis failed"}, status_code=502)
+    return Response(audio, media_type="audio/mpeg")
+
+
+@protected
+async def news(request):
+    category = request.query_params.get("category", "all")
+    if category != "all" and category != GENERAL and category not in CATEGORIES:
+        raise HTTPException(400, f"Unknown category '{category}'")
+    articles = await run_in_threadpool(request.app.state.news.get_news_by_category, category)
+    return JSONResponse({"articles": [article.to_dict() for article in articles]})
+
+
+@protected
+async def news_search(request):
+    query = request.query_params.get("q", "")
+    if not query.strip():
+        raise HTTPException(400, "'q' is required")
+    try:
+        limit = int(request.query_params.get("limit", NEWS_SEARCH_LIMIT))
+    except ValueError:
+        raise HTTPException(400, "'limit' must be a number")
+    limit = min(max(limit, 1), MAX_SEARCH_LIMIT)
+    articles = await run_in_threadpool(request.app.state.news.search_news, query, limit)
+    return JSONResponse({"articles": [article.to_dict() for article in articles]})
+
+
+async def http_error(request, exc):
+    return JSONResponse({"error": exc.detail}, status_code=exc.status_code, headers=exc.headers)
+
+
+app = Starlette(
+    routes=[
+        Route("/health", health),
+        Route("/chat", chat, methods=["POST"]),
+        Route("/tts", tts, methods=["POST"]),
+        Route("/news", news),
+        Route("/news/search", news_search),
+    ],
+    exception_handlers={HTTPException: http_error},
+    lifespan=lifespan,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes; each one creates its own services")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    uvicorn.run("api_server:app", host=args.host, port=args.port,
+                workers=args.workers, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,321 +1,25 @@
 import streamlit as st
-import asyncio
-import os
-from datetime import datetime
 import base64
-import io
-from gtts import gTTS
-import tempfile
 import uuid
-import sys
-import json
-import http.client
-from config import SUPABASE_URL, SUPABASE_KEY
-
-from database import Database
-from ai_services import TeluguAI
-from news_service import NewsService
-from utils import *
-
-# Swecha API Integration Class
-class SwechaAPI:
-    """
-    Swecha Corpus API Integration for Telugu AI Chat
-    Handles authentication, user management, and data contributions
-    """
-    
-    def __init__(self):
-        self.base_url = "api.corpus.swecha.org"
-        self.conn = http.client.HTTPSConnection(self.base_url)
-        self.headers = {"content-type": "application/json"}
-        self.auth_token = None
-    
-    def _make_request(self, method, endpoint, payload=None):
-        """Make HTTP request to Swecha API"""
-        try:
-            if payload:
-                self.conn.request(method, endpoint, payload, self.headers)
-            else:
-                self.conn.request(method, endpoint, headers=self.headers)
-            
-            res = self.conn.getresponse()
-            data = res.read()
-            return json.loads(data.decode("utf-8"))
-        except Exception as e:
-            st.error(f"API Error: {e}")
-            return None
-    
-    # Authentication Methods
-    def send_signup_otp(self, phone_number):
-        """Send OTP for signup"""
-        payload = json.dumps({"phone_number": phone_number})
-        return self._make_request("POST", "/api/v1/auth/signup/send-otp", payload)
-    
-    def verify_signup_otp(self, phone_number, otp_code, name, email, password):
-        """Verify OTP and complete signup"""
-        payload = json.dumps({
-            "phone_number": phone_number,
-            "otp_code": otp_code,
-            "name": name,
-            "email": email,
-            "password": password,
-            "has_given_consent": True
-        })
-        return self._make_request("POST", "/api/v1/auth/signup/verify-otp", payload)
-    
-    def resend_signup_otp(self, phone_number):
-        """Resend signup OTP"""
-        payload = json.dumps({"phone_number": phone_number})
-        return self._make_request("POST", "/api/v1/auth/signup/resend-otp", payload)
-    
-    def send_login_otp(self, phone_number):
-        """Send OTP for login"""
-        payload = json.dumps({"phone_number": phone_number})
-        return self._make_request("POST", "/api/v1/auth/login/send-otp", payload)
-    
-    def verify_login_otp(self, phone_number, otp_code):
-        """Verify login OTP"""
-        payload = json.dumps({
-            "phone_number": phone_number,
-            "otp_code": otp_code
-        })
-        return self._make_request("POST", "/api/v1/auth/login/verify-otp", payload)
-    
-    def resend_login_otp(self, phone_number):
-        """Resend login OTP"""
-        payload = json.dumps({"phone_number": phone_number})
-        return self._make_request("POST", "/api/v1/auth/login/resend-otp", payload)
-    
-    def get_user_profile(self):
-        """Get current user profile"""
-        return self._make_request("GET", "/api/v1/auth/me")
-    
-    def change_password(self, current_password, new_password):
-        """Change user password"""
-        payload = json.dumps({
-            "current_password": current_password,
-            "new_password": new_password
-        })
-        return self._make_request("POST", "/api/v1/auth/change-password", payload)
-    
-    def reset_password(self, phone, new_password):
-        """Reset password"""
-        payload = json.dumps({
-            "phone": phone,
-            "new_password": new_password
-        })
-        return self._make_request("POST", "/api/v1/auth/reset-password", payload)
-    
-    def forgot_password_init(self, phone_number):
-        """Initialize forgot password process"""
-        payload = json.dumps({"phone_number": phone_number})
-        return self._make_request("POST", "/api/v1/auth/forgot-password/init", payload)
-    
-    def forgot_password_confirm(self, phone_number, otp_code, new_password, confirm_password):
-        """Confirm forgot password with OTP"""
-        payload = json.dumps({
-            "phone_number": phone_number,
-            "otp_code": otp_code,
-            "new_password": new_password,
-            "confirm_password": confirm_password
-        })
-        return self._make_request("POST", "/api/v1/auth/forgot-password/confirm", payload)
-    
-    # User Management Methods
-    def get_users(self):
-        """Get all users"""
-        return self._make_request("GET", "/api/v1/users/")
-    
-    def create_user(self, phone, name, email, gender, date_of_birth, place, password, role_ids):
-        """Create new user"""
-        payload = json.dumps({
-            "phone": phone,
-            "name": name,
-            "email": email,
-            "gender": gender,
-            "date_of_birth": date_of_birth,
-            "place": place,
-            "password": password,
-            "role_ids": role_ids,
-            "has_given_consent": True
-        })
-        return self._make_request("POST", "/api/v1/users/", payload)
-    
-    def get_user_by_id(self, user_id):
-        """Get user by ID"""
-        return self._make_request("GET", f"/api/v1/users/{user_id}")
-    
-    def update_user(self, user_id, name, email, gender, date_of_birth, place, is_active):
-        """Update user information"""
-        payload = json.dumps({
-            "name": name,
-            "email": email,
-            "gender": gender,
-            "date_of_birth": date_of_birth,
-            "place": place,
-            "is_active": is_active,
-            "has_given_consent": True
-        })
-        return self._make_request("PUT", f"/api/v1/users/{user_id}", payload)
-    
-    def get_user_with_roles(self, user_id):
-        """Get user with roles"""
-        return self._make_request("GET", f"/api/v1/users/{user_id}/with-roles")
-    
-    def get_user_by_phone(self, phone):
-        """Get user by phone number"""
-        return self._make_request("GET", f"/api/v1/users/phone/{phone}")
-    
-    def get_user_contributions(self, user_id):
-        """Get user contributions"""
-        return self._make_request("GET", f"/api/v1/users/{user_id}/contributions")
-    
-    def get_user_contributions_by_type(self, user_id, media_type):
-        """Get user contributions by media type"""
-        return self._make_request("GET", f"/api/v1/users/{user_id}/contributions/{media_type}")
-    
-    # Role Management Methods
-    def get_roles(self):
-        """Get all roles"""
-        return self._make_request("GET", "/api/v1/roles/")
-    
-    def create_role(self, name, description):
-        """Create new role"""
-        payload = json.dumps({
-            "name": name,
-            "description": description
-        })
-        return self._make_request("POST", "/api/v1/roles/", payload)
-    
-    def get_role_by_id(self, role_id):
-        """Get role by ID"""
-        return self._make_request("GET", f"/api/v1/roles/{role_id}")
-    
-    def get_user_roles(self, user_id):
-        """Get user roles"""
-        return self._make_request("GET", f"/api/v1/users/{user_id}/roles")
-    
-    def assign_user_roles(self, user_id, role_ids):
-        """Assign roles to user"""
-        payload = json.dumps(role_ids)
-        return self._make_request("POST", f"/api/v1/users/{user_id}/roles", payload)
-    
-    # Category Management Methods
-    def get_categories(self):
-        """Get all categories"""
-        return self._make_request("GET", "/api/v1/categories/")
-    
-    def create_category(self, name, title, description, published, rank):
-        """Create new category"""
-        payload = json.dumps({
-            "name": name,
-            "title": title,
-            "description": description,
-            "published": published,
-            "rank": rank
-        })
-        return self._make_request("POST", "/api/v1/categories/", payload)
-    
-    def get_category_by_id(self, category_id):
-        """Get category by ID"""
-        return self._make_request("GET", f"/api/v1/categories/{category_id}")
-    
-    def delete_category(self, category_id):
-        """Delete category"""
-        return self._make_request("DELETE", f"/api/v1/categories/{category_id}")
-    
-    # Records Management Methods
-    def get_records(self):
-        """Get all records"""
-        return self._make_request("GET", "/api/v1/records/")
-    
-    def create_record(self, title, description, media_type, file_url, file_name, 
-                     file_size, location, release_rights, language, user_id, category_id):
-        """Create new record"""
-        payload = json.dumps({
-            "title": title,
-            "description": description,
-            "media_type": media_type,
-            "file_url": file_url,
-            "file_name": file_name,
-            "file_size": file_size,
-            "status": "pending",
-            "location": location,
-            "reviewed": False,
-            "release_rights": release_rights,
-            "language": language,
-            "user_id": user_id,
-            "category_id": category_id
-        })
-        return self._make_request("POST", "/api/v1/records/", payload)
-    
-    def get_record_by_id(self, record_id):
-        """Get record by ID"""
-        return self._make_request("GET", f"/api/v1/records/{record_id}")
-    
-    def update_record(self, record_id, title, description, media_type, file_url, 
-                     file_name, file_size, status, location, reviewed, reviewed_by, 
-                     release_rights, language):
-        """Update record"""
-        payload = json.dumps({
-            "title": title,
-            "description": description,
-            "media_type": media_type,
-            "file_url": file_url,
-            "file_name": file_name,
-            "file_size": file_size,
-            "status": status,
-            "location": location,
-            "reviewed": reviewed,
-            "reviewed_by": reviewed_by,
-            "release_rights": release_rights,
-            "language": language
-        })
-        return self._make_request("PATCH", f"/api/v1/records/{record_id}", payload)
-    
-    def upload_record(self, title, description, media_type, file_url, file_name, 
-                     file_size, location, release_rights, language, user_id, category_id):
-        """Upload record"""
-        payload = json.dumps({
-            "title": title,
-            "description": description,
-            "media_type": media_type,
-            "file_url": file_url,
-            "file_name": file_name,
-            "file_size": file_size,
-            "status": "pending",
-            "location": location,
-            "reviewed": False,
-            "release_rights": release_rights,
-            "language": language,
-            "user_id": user_id,
-            "category_id": category_id
-        })
-        return self._make_request("POST", "/api/v1/records/upload", payload)
-    
-    def search_nearby_records(self, latitude, longitude, radius):
-        """Search records nearby"""
-        return self._make_request("GET", "/api/v1/records/search/nearby")
-    
-    def search_records_by_bbox(self, min_lat, min_lon, max_lat, max_lon):
-        """Search records by bounding box"""
-        return self._make_request("GET", "/api/v1/records/search/bbox")
-    
-    def get_record_url(self, record_id):
-        """Get record URL"""
-        return self._make_request("GET", f"/api/v1/records/{record_id}/record-url")
-    
-    # Task Management Methods
-    def export_data(self, task_name):
-        """Export data task"""
-        payload = json.dumps({
-            "task_id": str(uuid.uuid4()),
-            "task_name": task_name,
-            "status": "pending",
-            "message": "Export task initiated"
-        })
-        return self._make_request("POST", "/api/v1/tasks/export-data", payload)
+import time
+from functools import partial
+from config import (
+    SUPABASE_URL,
+    SWECHA_PAGE_SIZE,
+    CHAT_RENDER_WINDOW,
+    MAX_CHAT_HISTORY,
+    AUDIO_POLL_INTERVAL,
+    PROFILE_STATS_TTL,
+)
 
+from news_category import CATEGORIES, GENERAL, category_label
+from services import create_services
+from export_service import ChatExporter
+from corpus_builder import ConversationCorpus
+from session_store import MessageStore, memory_stats
+from turn_tasks import TurnOrchestrator
+from tts_service import synthesize_speech
+from utils import *
 
 # Page configuration
 st.set_page_config(
@@ -333,50 +37,149 @@ def init_services():
         # Check if environment variables are loaded
         if not SUPABASE_URL:
             st.warning("⚠️ SUPABASE_URL is not set. Database features will be limited.")
-            db = None
-        else:
-            try:
-                db = Database(SUPABASE_URL, SUPABASE_KEY)
-                # Test connection
-                db.client.table('users').select('count', count='exact').limit(1).execute()
-                st.success("✅ Supabase connected successfully!")
-            except Exception as e:
-                st.warning(f"⚠️ Supabase connection failed: {e}. Using local session only.")
-                db = None
-        
-        ai = TeluguAI()
-        news = NewsService()
-        swecha_api = SwechaAPI()
-        
-        return db, ai, news, swecha_api
+        return create_services()
     except Exception as e:
         st.error(f"❌ Error initializing services: {e}")
-        return None, None, None, None
+        return None, None, None, None, None
+
+
+@st.cache_resource
+def get_turn_orchestrator():
+    return TurnOrchestrator()
 
 
 def generate_tts_fixed(text, lang="te"):
     """Generate Text-to-Speech audio with better error handling"""
     try:
-        if not text or len(text.strip()) == 0:
-            return None
-
-        # Create gTTS object
-        tts = gTTS(text=text, lang=lang, slow=False)
-
-        # Use BytesIO instead of temp file to avoid file access issues
-        audio_buffer = io.BytesIO()
-        tts.write_to_fp(audio_buffer)
-        audio_buffer.seek(0)
-
-        return audio_buffer.getvalue()
-
+        return synthesize_speech(text, lang=lang)
     except Exception as e:
         print(f"TTS Error: {str(e)}")
         st.warning("వాయిస్ ఔట్‌పుట్ ప్రస్తుతం అందుబాటులో లేదు.")
         return None
 
 
-def chat_interface(db, ai, swecha_api):
+def get_swecha_corpus(uploader):
+    """Get the corpus builder for the current chat session"""
+    if "swecha_corpus" not in st.session_state:
+        st.session_state.swecha_corpus = ConversationCorpus(
+            st.session_state.get("session_id", str(uuid.uuid4())),
+            st.session_state.get("swecha_user_id", ""),
+            # Turns are saved to the queue as they arrive, so closing the tab loses nothing
+            drafts=uploader.queue,
+            owner=st.session_state.user_id,
+        )
+        uploader.start()
+    corpus = st.session_state.swecha_corpus
+    corpus.location = st.session_state.get("user_location", {"latitude": 17.385, "longitude": 78.4867})
+    corpus.category_id = st.session_state.get("swecha_category_id", "")
+    return corpus
+
+
+def flush_swecha_corpus(swecha_api, uploader, orchestrator=None):
+    """Queue the buffered conversation as a single Swecha record"""
+    corpus = st.session_state.get("swecha_corpus")
+    if corpus is None or corpus.is_empty():
+        return
+
+    draft = (corpus.session_id, corpus.part)
+    record = corpus.build_record(swecha_api)
+    if record:
+        if orchestrator:
+            orchestrator.submit(uploader.enqueue, st.session_state.user_id, record, draft)
+        else:
+            uploader.enqueue(st.session_state.user_id, record, draft)
+        # One record per conversation part, not per turn
+        st.session_state.swecha_contributions = st.session_state.get("swecha_contributions", 0) + 1
+
+
+def save_chat_turn(db, user_id, prompt, response, audio_file):
+    """Persist a chat turn, run off the render thread"""
+    db.save_chat_message(
+        user_id,
+        prompt,
+        response,
+        base64.b64encode(audio_file).decode() if audio_file else None,
+    )
+
+
+def show_turn_errors():
+    """Report failures of background turn tasks, which cannot call st.* themselves"""
+    errors = st.session_state.get("turn_errors")
+    while errors:
+        kind, error = errors.pop(0)
+        if kind == "synthesize":
+            st.warning("వాయిస్ ఔట్‌పుట్ ప్రస్తుతం అందుబాటులో లేదు.")
+        else:
+            st.error(f"Error saving chat: {error}")
+
+
+@st.fragment(run_every=AUDIO_POLL_INTERVAL)
+def pending_audio_player(message_id):
+    """Poll a background TTS task and attach its audio to the message when ready"""
+    pending = st.session_state.get("pending_audio", {})
+    future = pending.get(message_id)
+    if future is None:
+        return
+
+    if not future.done():
+        st.caption("🔊 ఆడియో తయారవుతోంది...")
+        return
+
+    del pending[message_id]
+    audio = future.result()
+    if audio:
+        st.session_state.messages.attach_audio(message_id, audio)
+    # Full rerun so the transcript renders the finished player and polling stops
+    st.rerun()
+
+
+def render_transcript(messages):
+    """Render the most recent chat messages, older ones behind a load control"""
+    window = st.session_state.get("chat_window", CHAT_RENDER_WINDOW)
+    hidden = max(0, len(messages) - window)
+
+    if hidden > 0:
+        if st.button(f"⬆️ పాత సందేశాలు చూపించు ({hidden})", key="load_older_messages"):
+            st.session_state.chat_window = window + CHAT_RENDER_WINDOW
+            st.rerun()
+
+    visible = messages.recent(window)
+
+    # Only the newest reply gets a player up front, older ones are created on demand
+    latest_audio = None
+    for message in reversed(visible):
+        if message.get("audio_ref"):
+            latest_audio = message["id"]
+            break
+
+    played = st.session_state.setdefault("played_audio", set())
+
+    pending = st.session_state.get("pending_audio", {})
+
+    for message in visible:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+            if message["id"] in pending:
+                pending_audio_player(message["id"])
+                continue
+            if not message.get("audio_ref"):
+                continue
+
+            show_audio = message["id"] == latest_audio or message["id"] in played
+            if not show_audio and st.button("🔊", key=f"play_audio_{message['id']}"):
+                played.add(message["id"])
+                show_audio = True
+
+            if show_audio:
+                audio = messages.audio(message)
+                if audio:
+                    try:
+                        st.audio(audio, format="audio/mp3")
+                    except:
+                        pass  # Skip audio if there's an issue
+
+
+def chat_interface(db, ai, swecha_api, uploader, orchestrator):
     st.title("💬 Telugu Chat Assistant")
     st.write("Telugu మరియు English రెండు భాషలలో టైప్ చేయండి - AI తెల���గులో జవాబిస్తుంది")
 
@@ -386,24 +189,20 @@ def chat_interface(db, ai, swecha_api):
 
     # Initialize chat history
     if "messages" not in st.session_state:
-        st.session_state.messages = []
+        st.session_state.messages = MessageStore()
         if hasattr(st.session_state, "save_history") and st.session_state.save_history:
-            # Load chat history from database
+            # Load the most recent chat history from database
             try:
-                history = db.get_chat_history(st.session_state.user_id)
-                st.session_state.messages = history
+                history = db.get_chat_history(
+                    st.session_state.user_id, limit=MAX_CHAT_HISTORY // 2
+                )
+                st.session_state.messages.extend(history)
             except:
-                st.session_state.messages = []
+                st.session_state.messages = MessageStore()
 
-    # Display chat messages
-    for message in st.session_state.messages:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"])
-            if message.get("audio_file"):
-                try:
-                    st.audio(message["audio_file"])
-                except:
-                    pass  # Skip audio if there's an issue
+    # Display chat messages, then anything the last turn's background tasks reported
+    render_transcript(st.session_state.messages)
+    show_turn_errors()
 
     # Chat input with better handling
     prompt = st.chat_input("Telugu లేదా English లో టైప్ చేయండి...")
@@ -418,115 +217,94 @@ def chat_interface(db, ai, swecha_api):
 
         # Generate AI response
         with st.chat_message("assistant"):
-            with st.spinner("ఆలోచ���స్తున్నాను..."):
-                try:
-                    response = ai.generate_response(prompt)
-                    st.markdown(response)
-
-                    # Generate TTS audio if voice output is enabled
-                    audio_file = None
-                    if hasattr(
-                        st.session_state, "voice_output"
-                    ) and st.session_state.get("voice_output", True):
-                        audio_file = generate_tts_fixed(response, lang="te")
-                        if audio_file:
-                            st.audio(audio_file)
-
-                    # Add assistant response
-                    st.session_state.messages.append(
-                        {
-                            "role": "assistant",
-                            "content": response,
-                            "audio_file": audio_file,
-                        }
-                    )
+            try:
+                # Stream the reply as it is generated
+                response = st.write_stream(ai.generate_response_stream(prompt))
+
+                # Add assistant response, audio is attached once it is ready
+                message = st.session_state.messages.append(
+                    {"role": "assistant", "content": response}
+                )
+
+                # Run TTS and persistence in the background
+                synthesize = None
+                if hasattr(
+                    st.session_state, "voice_output"
+                ) and st.session_state.get("voice_output", True):
+                    synthesize = partial(synthesize_speech, response, lang="te")
+
+                save = None
+                if (
+                    hasattr(st.session_state, "save_history")
+                    and st.session_state.save_history
+                    and db is not None
+                ):
+                    save = partial(save_chat_turn, db, st.session_state.user_id, prompt, response)
+
+                audio_future = orchestrator.run_turn(
+                    synthesize=synthesize,
+                    save=save,
+                    errors=st.session_state.setdefault("turn_errors", []),
+                )
+                if audio_future:
+                    st.session_state.setdefault("pending_audio", {})[message["id"]] = audio_future
+                    pending_audio_player(message["id"])
+
+                # Enhanced Swecha API integration for corpus building
+                if st.session_state.get("contribute_to_swecha", False) and st.session_state.get("swecha_authenticated", False):
+                    try:
+                        # Detect language of the conversation
+                        user_lang = ai.detect_language(prompt)
+                        response_lang = ai.detect_language(response)
+                        
+                        # Accumulate the turn; the conversation is uploaded as one record
+                        corpus = get_swecha_corpus(uploader)
+                        if corpus.add_turn(prompt, user_lang, response, response_lang):
+                            flush_swecha_corpus(swecha_api, uploader, orchestrator)
+                        
+                    except Exception as e:
+                        print(f"Error contributing to Swecha: {e}")
+                        # Don't show error to user to avoid interrupting chat flow
 
-                    # Save to database if enabled
-                    if (
-                        hasattr(st.session_state, "save_history")
-                        and st.session_state.save_history
-                    ):
-                        try:
-                            db.save_chat_message(
-                                st.session_state.user_id,
-                                prompt,
-                                response,
-                                base64.b64encode(audio_file).decode()
-                                if audio_file
-                                else None,
-                            )
-                        except Exception as e:
-                            print(f"Error saving chat: {e}")
-
-                    # Enhanced Swecha API integration for corpus building
-                    if st.session_state.get("contribute_to_swecha", False) and st.session_state.get("swecha_authenticated", False):
-                        try:
-                            # Detect language of the conversation
-                            user_lang = ai.detect_language(prompt)
-                            response_lang = ai.detect_language(response)
-                            
-                            # Create structured conversation data for LLM training
-                            conversation_data = {
-                                "conversation_id": str(uuid.uuid4()),
-                                "timestamp": datetime.now().isoformat(),
-                                "user_input": {
-                                    "text": prompt,
-                                    "language": user_lang,
-                                    "length": len(prompt)
-                                },
-                                "ai_response": {
-                                    "text": response,
-                                    "language": response_lang,
-                                    "length": len(response)
-                                },
-                                "context": {
-                                    "conversation_turn": len(st.session_state.messages) // 2,
-                                    "session_id": st.session_state.get("session_id", str(uuid.uuid4())),
-                                    "user_id": st.session_state.get("swecha_user_id", "anonymous")
-                                },
-                                "metadata": {
-                                    "domain": "conversational_ai",
-                                    "quality": "human_verified",
-                                    "source": "telugu_ai_chat",
-                                    "version": "1.0"
-                                }
-                            }
-                            
-                            # Determine primary language for categorization
-                            primary_language = "telugu" if user_lang in ["telugu", "mixed"] or response_lang in ["telugu", "mixed"] else "english"
-                            
-                            # Create record in Swecha corpus
-                            swecha_api.create_record(
-                                title=f"Telugu AI Chat - {datetime.now().strftime('%Y-%m-%d %H:%M')}",
-                                description=json.dumps(conversation_data, ensure_ascii=False, indent=2),
-                                media_type="text",
-                                file_url="",
-                                file_name=f"conversation_{conversation_data['conversation_id']}.json",
-                                file_size=len(json.dumps(conversation_data)),
-                                location=st.session_state.get("user_location", {"latitude": 17.385, "longitude": 78.4867}),
-                                release_rights="creator",
-                                language=primary_language,
-                                user_id=st.session_state.get("swecha_user_id", ""),
-                                category_id=st.session_state.get("swecha_category_id", "")
-                            )
-                            
-                            # Update contribution counter
-                            if "swecha_contributions" not in st.session_state:
-                                st.session_state.swecha_contributions = 0
-                            st.session_state.swecha_contributions += 1
-                            
-                        except Exception as e:
-                            print(f"Error contributing to Swecha: {e}")
-                            # Don't show error to user to avoid interrupting chat flow
+            except Exception as e:
+                error_response = "క్షమించండి, ప్రస్తుతం సమస్య ఉంది. దయచేసి మళ్లీ ప్రయత్నించండి."
+                st.markdown(error_response)
+                st.session_state.messages.append(
+                    {"role": "assistant", "content": error_response}
+                )
 
-                except Exception as e:
-                    error_response = "క్షమించండి, ప్రస్తుతం సమస్య ఉంది. దయచేసి మళ్లీ ప్రయత్నించండి."
-                    st.markdown(error_response)
-                    st.session_state.messages.append(
-                        {"role": "assistant", "content": error_response}
+
+@st.fragment
+def render_article(article, key):
+    """One news article as an expander with listen and read-more controls"""
+    with st.expander(f"📰 {article.title[:80]}..."):
+        # Article content
+        col1, col2 = st.columns([3, 1])
+
+        with col1:
+            st.write(f"**సారాంశం:** {article.summary}")
+            st.write(f"**మూలం:** {article.source}")
+            st.write(f"**వర్గం:** {category_label(article.category)}")
+            st.write(f"**సమయం:** {article.published_text}")
+
+        with col2:
+            # Listen button for TTS
+            if st.button(f"🔊 వినండి", key=f"listen_{key}"):
+                with st.spinner("ఆడియో తయారు చేస్తున్నాం..."):
+                    audio_file = generate_tts_fixed(
+                        article.summary, lang="te"
                     )
+                    if audio_file:
+                        st.audio(audio_file)
+                    else:
+                        st.warning("ఆడియో తయారు చేయడంలో సమస్య")
+
+            # Read more link
+            if article.link and article.link != "#":
+                st.markdown(f"[📖 పూర్తిగా చదవండి]({article.link})")
 
 
+@st.fragment
 def news_interface(news):
     st.title("📰 Telugu News Summary")
     st.write("తెలుగు వార్తల సంక్షిప్త సమాచారం")
@@ -535,59 +313,109 @@ def news_interface(news):
     col1, col2 = st.columns([1, 3])
 
     with col1:
-        if st.button("🔄 Refresh News", type="primary"):
-            st.session_state.news_loading = True
+        # Refresh polls every feed now; loading reuses feeds polled recently
+        refresh = st.button("🔄 Refresh News", type="primary")
+
+    # Both buttons are created on every run so neither disappears after a click
+    load = st.button("📥 Load Latest News", type="secondary")
 
     # Load news
-    if (
-        st.button("📥 Load Latest News", type="secondary")
-        or "news_data" not in st.session_state
-    ):
+    if refresh or load or "news_data" not in st.session_state:
         with st.spinner("వార్తలు తెస్తున్నాము..."):
             try:
-                news_data = news.get_telugu_news()
+                news_data = news.get_telugu_news(force=refresh)
                 st.session_state.news_data = news_data
                 st.success(f"✅ {len(news_data)} వార్తలు లోడ్ అయ్యాయి")
             except Exception as e:
                 st.error(f"వార్తలు లోడ్ చేయడంలో సమస్య: {e}")
                 st.session_state.news_data = []
 
+    # Search every article fetched so far, not just the latest ones
+    query = st.text_input(
+        "🔍 వార్తలు వెతకండి",
+        placeholder="ఉదా: మెట్రో, వర్షాలు, hyderabad",
+        key="news_search",
+    )
+    category = st.selectbox(
+        "🏷️ వర్గం",
+        ["all", *CATEGORIES, GENERAL],
+        format_func=lambda name: "అన్నీ" if name == "all" else category_label(name),
+        key="news_category",
+    )
+
+    if query and query.strip():
+        results = news.search_news(query)
+        st.subheader(f"🔍 వెతుకులాట ఫలితాలు ({len(results)})")
+        if not results:
+            st.info("సరిపోయే వార్తలు దొరకలేదు")
+        for idx, article in enumerate(results):
+            render_article(article, f"search_{idx}")
+
+    # One category, newest first, from what has been fetched so far
+    elif category != "all":
+        articles = news.get_news_by_category(category)
+        st.subheader(f"🏷️ {category_label(category)} ({len(articles)})")
+        if not articles:
+            st.info("ఈ వర్గంలో వార్తలు లేవు")
+        for idx, article in enumerate(articles):
+            render_article(article, f"{category}_{idx}")
+
     # Display news
-    if "news_data" in st.session_state and st.session_state.news_data:
+    elif "news_data" in st.session_state and st.session_state.news_data:
         st.subheader(f"📈 తాజా వార్తలు ({len(st.session_state.news_data)})")
 
-        for idx, article in enumerate(
-            st.session_state.news_data[:8]
-        ):  # Show top 8 articles
-            with st.expander(f"📰 {article['title'][:80]}..."):
-                # Article content
-                col1, col2 = st.columns([3, 1])
-
-                with col1:
-                    st.write(f"**సారాంశం:** {article['summary']}")
-                    st.write(f"**మూలం:** {article['source']}")
-                    st.write(f"**సమయం:** {article['published']}")
-
-                with col2:
-                    # Listen button for TTS
-                    if st.button(f"🔊 వినండి", key=f"listen_{idx}"):
-                        with st.spinner("ఆడియో తయారు చేస్తున్నాం..."):
-                            audio_file = generate_tts_fixed(
-                                article["summary"], lang="te"
-                            )
-                            if audio_file:
-                                st.audio(audio_file)
-                            else:
-                                st.warning("ఆడియో తయారు చేయడంలో సమస్య")
-
-                    # Read more link
-                    if article.get("link") and article["link"] != "#":
-                        st.markdown(f"[📖 పూర్తిగా చదవండి]({article['link']})")
+        # Show top 8 articles
+        for idx, article in enumerate(st.session_state.news_data[:8]):
+            render_article(article, idx)
 
     else:
         st.info("వార్తలు లోడ్ చేయడానికి 'Load Latest News' బటన్ నొక్కండి")
 
+    # Poll intervals and health of each source
+    health = news.feed_health()
+    if health:
+        with st.expander("📡 Feed status"):
+            st.dataframe(health, use_container_width=True, hide_index=True)
+
 
+def swecha_paged_table(key, fetch_page, page_size=SWECHA_PAGE_SIZE):
+    """Render one page of a Swecha list with previous/next controls"""
+    page_key = f"{key}_page"
+    page = st.session_state.get(page_key, 0)
+
+    items = fetch_page(page, page_size)
+    if items is None:
+        st.error("Failed to fetch data")
+        return
+
+    if items:
+        st.dataframe(items, use_container_width=True, hide_index=True)
+    else:
+        st.info("ఇంకా డేటా లేదు")
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("⬅️ Previous", key=f"{key}_prev", disabled=page == 0):
+            st.session_state[page_key] = page - 1
+            st.rerun(scope="fragment")
+    with col2:
+        st.caption(f"Page {page + 1}")
+    with col3:
+        if st.button("Next ➡️", key=f"{key}_next", disabled=len(items) < page_size):
+            st.session_state[page_key] = page + 1
+            st.rerun(scope="fragment")
+
+
+def swecha_toggle_view(key, label):
+    """Button that opens or closes a lazily loaded view"""
+    open_key = f"{key}_open"
+    if st.button(label, key=f"{key}_toggle"):
+        st.session_state[open_key] = not st.session_state.get(open_key, False)
+        st.session_state[f"{key}_page"] = 0
+    return st.session_state.get(open_key, False)
+
+
+@st.fragment
 def swecha_integration_interface(swecha_api):
     """Swecha API Integration Interface"""
     st.title("🌐 Swecha Corpus Integration")
@@ -723,22 +551,17 @@ def swecha_integration_interface(swecha_api):
                         st.error("❌ Failed to submit contribution")
             
             # View contributions
-            if st.button("📊 View My Contributions"):
+            if swecha_toggle_view("contributions", "📊 View My Contributions"):
                 user_id = st.session_state.get("swecha_user_id", "")
                 if user_id:
-                    contributions = swecha_api.get_user_contributions(user_id)
-                    if contributions:
-                        st.json(contributions)
-                    else:
-                        st.error("Failed to fetch contributions")
+                    swecha_paged_table(
+                        "contributions",
+                        lambda page, size: swecha_api.get_user_contributions_page(user_id, page, size),
+                    )
             
             # View all records
-            if st.button("📋 View All Records"):
-                records = swecha_api.get_records()
-                if records:
-                    st.json(records)
-                else:
-                    st.error("Failed to fetch records")
+            if swecha_toggle_view("records", "📋 View All Records"):
+                swecha_paged_table("records", swecha_api.get_records_page)
         else:
             st.warning("Please authenticate first to access contribution features.")
     
@@ -747,12 +570,8 @@ def swecha_integration_interface(swecha_api):
         
         if st.session_state.get("swecha_authenticated", False):
             # View categories
-            if st.button("📋 View Categories"):
-                categories = swecha_api.get_categories()
-                if categories:
-                    st.json(categories)
-                else:
-                    st.error("Failed to fetch categories")
+            if swecha_toggle_view("categories", "📋 View Categories"):
+                swecha_paged_table("categories", swecha_api.get_categories_page)
             
             # Create category
             st.write("**Create New Category**")
@@ -803,9 +622,16 @@ def main():
     )
 
     # Initialize services
-    db, ai, news, swecha_api = init_services()
+    db, ai, news, swecha_api, uploader = init_services()
 
-    if not ai or not news or not swecha_api:
+    # Fall back to local session mode once the background probe reports failure
+    if db is not None and not db.is_available():
+        if not st.session_state.get("db_failure_shown"):
+            st.warning(f"⚠️ Supabase connection failed: {db.health_error}. Using local session only.")
+            st.session_state.db_failure_shown = True
+        db = None
+
+    if not ai or not news or not swecha_api or not uploader:
         st.error("🚫 కొన్ని సేవలు లోడ్ కాలేదు. దయచేసి పేజీ రిఫ్రెష్ చేయండి.")
         return
 
@@ -926,16 +752,50 @@ def main():
                 contributions_count = st.session_state.get("swecha_contributions", 0)
                 st.metric("🤝 Contributions Made", contributions_count)
                 
-                if contributions_count > 0:
-                    st.success(f"✅ మీరు {contributions_count} సంభాషణలను కార్పస్‌కు సహకరించారు!")
+                # Background upload status for this user's queued records
+                upload_status = uploader.status(st.session_state.user_id)
+                col1, col2, col3 = st.columns(3)
+                col1.metric("⏳ Queued", upload_status["pending"] + upload_status["in_flight"])
+                col2.metric("✅ Uploaded", upload_status["uploaded"])
+                col3.metric("❌ Failed", upload_status["failed"])
+                
+                if upload_status["uploaded"] > 0:
+                    st.success(f"✅ మీరు {upload_status['uploaded']} సంభాషణలను కార్పస్‌కు సహకరించారు!")
+                
+                # Conversations are packed into one record, let the user send it early
+                corpus = st.session_state.get("swecha_corpus")
+                if corpus is not None and not corpus.is_empty():
+                    if st.button("📤 Contribute Conversation Now", use_container_width=True):
+                        flush_swecha_corpus(swecha_api, uploader)
+                        st.success("✅ సంభాషణ అప్‌లోడ్ క్యూలో చేర్చబడింది")
             elif contribute_to_swecha and not st.session_state.get("swecha_authenticated", False):
                 st.warning("⚠️ Swecha లో లాగిన్ చేయండి")
                 st.info("Swecha టాబ్‌లో వెళ్లి ఆథెంటికేట్ చేయండి")
 
+            # Process-wide memory metrics for chat sessions and audio
+            with st.expander("🧠 Memory Usage"):
+                stats = memory_stats()
+                st.metric(
+                    "🔊 Audio Cache",
+                    f"{stats['audio_bytes'] / 1048576:.1f} / "
+                    f"{stats['audio_budget_bytes'] / 1048576:.0f} MB",
+                )
+                st.caption(
+                    f"Sessions: {stats['sessions']} · Messages: {stats['messages']} · "
+                    f"Audio hits/misses/evictions: {stats['audio_hits']}/"
+                    f"{stats['audio_misses']}/{stats['audio_evictions']}"
+                )
+
             st.markdown("---")
 
             # Logout button
             if st.button("🚪 Logout", type="secondary", use_container_width=True):
+                # Contribute whatever is left of the conversation before it is lost
+                try:
+                    flush_swecha_corpus(swecha_api, uploader)
+                except Exception as e:
+                    print(f"Error contributing to Swecha: {e}")
+
                 # Clear all session state
                 for key in list(st.session_state.keys()):
                     del st.session_state[key]
@@ -943,19 +803,25 @@ def main():
 
     # Main content
     if "user_id" in st.session_state:
-        # Create tabs for different features
-        tab1, tab2, tab3, tab4 = st.tabs(["💬 Chat", "📰 News", "🌐 Swecha", "👤 Profile"])
+        # Only the selected tab is executed, so one tab never pays for another's I/O
+        active_tab = st.radio(
+            "Section",
+            ["💬 Chat", "📰 News", "🌐 Swecha", "👤 Profile"],
+            horizontal=True,
+            label_visibility="collapsed",
+            key="active_tab",
+        )
 
-        with tab1:
-            chat_interface(db, ai, swecha_api)
+        if active_tab == "💬 Chat":
+            chat_interface(db, ai, swecha_api, uploader, get_turn_orchestrator())
 
-        with tab2:
+        elif active_tab == "📰 News":
             news_interface(news)
 
-        with tab3:
+        elif active_tab == "🌐 Swecha":
             swecha_integration_interface(swecha_api)
 
-        with tab4:
+        else:
             profile_interface(db)
 
     else:
@@ -1002,11 +868,23 @@ def main():
                 st.write(message["content"])
 
 
+def get_cached_user_stats(db):
+    """User stats for the profile tab, refetched at most every PROFILE_STATS_TTL seconds"""
+    cached = st.session_state.get("user_stats_cache")
+    if cached and time.time() - cached[0] < PROFILE_STATS_TTL:
+        return cached[1]
+
+    user_stats = db.get_user_stats(st.session_state.user_id)
+    st.session_state.user_stats_cache = (time.time(), user_stats)
+    return user_stats
+
+
+@st.fragment
 def profile_interface(db):
     st.title("👤 User Profile")
 
     try:
-        user_stats = db.get_user_stats(st.session_state.user_id)
+        user_stats = get_cached_user_stats(db)
 
         # Display stats in columns
         col1, col2, col3 = st.columns(3)
@@ -1033,14 +911,42 @@ def profile_interface(db):
             if st.button("🗑️ Clear Chat History", type="secondary"):
                 try:
                     db.clear_chat_history(st.session_state.user_id)
-                    st.session_state.messages = []
+                    st.session_state.messages = MessageStore()
+                    st.session_state.pop("played_audio", None)
+                    st.session_state.pop("user_stats_cache", None)
+                    st.session_state.pop("chat_window", None)
                     st.success("✅ చాట్ చరిత్ర క్లియర్ అయింది!")
                 except Exception as e:
                     st.error(f"❌ ఎర్రర్: {e}")
 
         with col2:
+            export_format = st.selectbox("📄 Export Format", ["ndjson", "parquet"])
+            export_compress = st.checkbox("🗜️ Compress (gzip)", value=True)
+
             if st.button("📁 Export Chat Data", type="secondary"):
-                st.info("ఈ ఫీచర్ త్వరలో అందుబాటులో ఉంటుంది")
+                exporter = ChatExporter(db)
+                with st.spinner("ఎక్స్‌పోర్ట్ తయారు చేస్తున్నాం..."):
+                    try:
+                        # Remove the previous export before spooling a new one
+                        previous = st.session_state.pop("export_file", None)
+                        if previous is not None:
+                            previous.delete()
+
+                        st.session_state.export_file = exporter.spool(
+                            st.session_state.user_id, export_format, export_compress
+                        )
+                    except Exception as e:
+                        st.error(f"❌ ఎక్స్‌పోర్ట్ ఎర్రర్: {e}")
+
+            export_file = st.session_state.get("export_file")
+            if export_file is not None and export_file.exists():
+                st.download_button(
+                    "⬇️ Download Export",
+                    # Read from disk only when the button is clicked, not on every rerun
+                    data=export_file.read,
+                    file_name=export_file.name,
+                    mime=export_file.mime,
+                )
 
         # User preferences
         st.subheader("⚙️ Preferences")
@@ -0,0 +1,92 @@
+"""
+Import-time budget for the service layer.
+
+Each run imports the app's service modules in a fresh interpreter, after
+streamlit itself has been imported, and reports the median extra time.
+Heavy dependencies (supabase, bcrypt, gtts, feedparser, bs4, requests,
+numpy, pyarrow) must be imported on first use, so they should not show
+up here. Exits non-zero when the median exceeds the budget.
+
+    python benchmarks/import_time.py --budget-ms 150 --json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVICE_MODULES = [
+    "config",
+    "utils",
+    "database",
+    "ai_services",
+    "news_service",
+    "swecha_service",
+    "export_service",
+    "contribution_queue",
+    "corpus_builder",
+    "session_store",
+    "turn_tasks",
+]
+
+HEAVY_MODULES = [
+    "supabase", "bcrypt", "gtts", "feedparser", "bs4", "requests",
+    "langdetect", "dateutil", "numpy", "pyarrow",
+]
+
+PROBE = """
+import json, sys, time
+import streamlit
+before = set(sys.modules)
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+loaded = sorted(m for m in {heavy!r} if m in sys.modules and m not in before)
+print(json.dumps({{"seconds": elapsed, "heavy_loaded": loaded}}))
+"""
+
+
+def measure_once(modules):
+    code = PROBE.format(modules=modules, heavy=HEAVY_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=150.0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    samples = [measure_once(SERVICE_MODULES) for _ in range(args.runs)]
+    median_ms = statistics.median(s["seconds"] for s in samples) * 1000
+    heavy = sorted({name for s in samples for name in s["heavy_loaded"]})
+
+    report = {
+        "modules": SERVICE_MODULES,
+        "runs": args.runs,
+        "median_ms": round(median_ms, 2),
+        "budget_ms": args.budget_ms,
+        "heavy_modules_loaded": heavy,
+        "passed": median_ms <= args.budget_ms and not heavy,
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Service import time: {report['median_ms']} ms (budget {args.budget_ms} ms)")
+        if heavy:
+            print(f"Eagerly imported heavy modules: {', '.join(heavy)}")
+
+    sys.exit(0 if report["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""
+Multi-session load test against local stand-ins for every external service.
+
+Starts benchmarks/stub_services.py in a subprocess, points TeluguAI,
+NewsService, Database, SwechaAPI and gTTS at it, then runs a number of
+simulated users at each concurrency level. Every user walks the same code
+paths as chat_interface and news_interface: it loads the news and plays one
+summary, opens a page of Swecha records, then chats for a number of turns,
+streaming each reply, synthesizing it, saving it and adding it to the corpus
+that is contributed when the session ends.
+
+For each level the report has throughput, p50/p99 latency of every timed
+stage (the same telugu_ai_stage_seconds histogram the app exports) and
+peak memory.
+
+    python benchmarks/load_test.py --users 1,5,10,25 --turns 5
+    python benchmarks/load_test.py --latency hf=1.0 --error-rate swecha=0.2,tts=0.1 --json load.json
+    python benchmarks/load_test.py --latency 0 --tracemalloc      # CPU and memory only
+"""
+import argparse
+import base64
+import contextlib
+import json
+import logging
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(BENCH_DIR, "fixtures")
+
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from ai_services import TeluguAI  # noqa: E402
+from contribution_queue import ContributionQueue, ContributionUploader  # noqa: E402
+from corpus_builder import ConversationCorpus  # noqa: E402
+from database import Database  # noqa: E402
+from metrics import registry, span, stage_errors, stage_seconds  # noqa: E402
+from news_service import NewsService  # noqa: E402
+from resilience import breaker_rejections, breaker_states  # noqa: E402
+from shared_cache import SQLiteCache, use_shared_cache  # noqa: E402
+from swecha_service import SwechaAPI  # noqa: E402
+from tts_service import synthesize_speech  # noqa: E402
+from turn_tasks import TurnOrchestrator  # noqa: E402
+
+# Supabase only checks that the key looks like a JWT
+STUB_SUPABASE_KEY = "stub.stub.stub"
+
+LOCATION = {"latitude": 17.385, "longitude": 78.4867}
+
+
+def start_stub_process(args):
+    """Run the stand-in services in their own process, returning (process, base_url)"""
+    command = [sys.executable, os.path.join(BENCH_DIR, "stub_services.py"),
+               "--jitter", str(args.jitter), "--seed", str(args.seed)]
+    if args.latency is not None:
+        command += ["--latency", args.latency]
+    if args.error_rate:
+        command += ["--error-rate", args.error_rate]
+    if args.hf_stream:
+        command.append("--hf-stream")
+
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    base_url = process.stdout.readline().strip()
+    if not base_url:
+        process.kill()
+        raise RuntimeError("stub services did not start")
+    return process, base_url
+
+
+def stub_stats(base_url):
+    with urllib.request.urlopen(f"{base_url}/_stats", timeout=5) as response:
+        return json.load(response)
+
+
+def point_gtts_at(base_url):
+    """Send gTTS requests to the stand-in instead of translate.google.com"""
+    import gtts.tts
+
+    gtts.tts._translate_url = lambda tld="com", path="": f"{base_url}/tts/{path}"
+
+
+def build_services(base_url, queue_path):
+    """The shared service objects init_services would create, aimed at the stubs"""
+    ai = TeluguAI()
+    ai.hf_token = "stub"
+    ai.headers = {"Authorization": f"Bearer {ai.hf_token}"}
+    ai.api_url = f"{base_url}/hf/models/stub"
+
+    news = NewsService()
+    news.rss_feeds = [
+        {"url": f"{base_url}/rss/{i}", "name": f"Stub Feed {i}"} for i in range(4)
+    ]
+
+    db = Database(f"{base_url}/supabase", STUB_SUPABASE_KEY)
+    # init_services probes the database in the background, which also builds the client
+    db.check_health()
+    swecha_api = SwechaAPI(base_url.split("://", 1)[1], secure=False)
+
+    # Short backoff so failed uploads settle within the run
+    uploader = ContributionUploader(
+        swecha_api, queue=ContributionQueue(queue_path),
+        backoff_base=0.05, backoff_max=1.0, poll_interval=0.2,
+    )
+    return ai, news, db, swecha_api, uploader
+
+
+def save_chat_turn(db, user_id, prompt, response, audio_file):
+    """Same persistence step as app.save_chat_turn"""
+    db.save_chat_message(
+        user_id,
+        prompt,
+        response,
+        base64.b64encode(audio_file).decode() if audio_file else None,
+    )
+
+
+def speak(text):
+    """TTS the way generate_tts_fixed does it, a failure just means no audio"""
+    try:
+        return synthesize_speech(text, lang="te")
+    except Exception:
+        return None
+
+
+def simulate_user(services, orchestrator, user_index, turns, prompts, seed):
+    """One session: news, Swecha records, then a conversation. Returns turns completed."""
+    ai, news, db, swecha_api, uploader = services
+    rng = random.Random(seed + user_index)
+    user_id = f"load-user-{user_index}"
+
+    with span("session.news"):
+        articles = news.get_telugu_news()
+        if articles:
+            speak(articles[0].summary)
+
+    with span("session.swecha_records"):
+        swecha_api.get_records_page(rng.randrange(4))
+
+    corpus = ConversationCorpus(f"load-{user_index}-{seed}", user_id, location=LOCATION)
+    completed = 0
+    for _ in range(turns):
+        prompt = rng.choice(prompts)
+        with span("session.turn"):
+            with span("session.reply"):
+                response = "".join(ai.generate_response_stream(prompt))
+
+            audio_future = orchestrator.run_turn(
+                synthesize=partial(speak, response),
+                save=partial(save_chat_turn, db, user_id, prompt, response),
+            )
+            # The user hears the reply once its audio is attached
+            audio_future.result()
+
+            if corpus.add_turn(prompt, ai.detect_language(prompt),
+                               response, ai.detect_language(response)):
+                record = corpus.build_record(swecha_api)
+                orchestrator.submit(uploader.enqueue, user_id, record)
+        completed += 1
+
+    # Logout flushes whatever is left of the conversation
+    record = corpus.build_record(swecha_api)
+    if record:
+        uploader.enqueue(user_id, record)
+    return completed
+
+
+def wait_for_uploads(uploader, timeout):
+    """Wait until no contribution is pending or in flight, returning the final counts"""
+    deadline = time.monotonic() + timeout
+    while True:
+        counts = uploader.status()
+        if counts["pending"] + counts["in_flight"] == 0 or time.monotonic() > deadline:
+            return counts
+        time.sleep(0.05)
+
+
+def stage_report():
+    """p50/p99 in milliseconds and error counts for every stage seen"""
+    stages = {}
+    for entry in stage_seconds.summary().values():
+        stage = entry["labels"]["stage"]
+        stages[stage] = {
+            "count": entry["count"],
+            "errors": stage_errors.value(stage=stage),
+            "mean_ms": round(entry["mean"] * 1000, 2),
+            "p50_ms": round(entry["p50"] * 1000, 2),
+            "p99_ms": round(entry["p99"] * 1000, 2),
+        }
+    return dict(sorted(stages.items()))
+
+
+def run_level(users, args, base_url, prompts, queue_dir):
+    registry.reset()
+    queue_path = os.path.join(queue_dir, f"contributions-{users}.db")
+    # Every level starts from an empty shared cache, so feeds, audio and
+    # replies cached by an earlier level do not hide the stubs' latency
+    cache = SQLiteCache(os.path.join(queue_dir, f"shared_cache-{users}.db"))
+    use_shared_cache(cache)
+    services = build_services(base_url, queue_path)
+    orchestrator = TurnOrchestrator()
+    before = stub_stats(base_url)
+
+    if args.tracemalloc:
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users, thread_name_prefix="load-user") as pool:
+        futures = [
+            pool.submit(simulate_user, services, orchestrator, i, args.turns, prompts, args.seed)
+            for i in range(users)
+        ]
+        turns = sum(future.result() for future in futures)
+    elapsed = time.perf_counter() - start
+
+    # Background saves and uploads are part of the load, so let them finish
+    orchestrator.executor.shutdown(wait=True)
+    uploader = services[4]
+    uploads = wait_for_uploads(uploader, args.upload_timeout)
+    uploader.stop(timeout=5)
+    services[3].pool.close()
+    cache.close()
+    drained = time.perf_counter() - start
+
+    traced_peak = None
+    if args.tracemalloc:
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    after = stub_stats(base_url)
+    stub_requests = {
+        service: after["requests"][service] - before["requests"][service]
+        for service in after["requests"]
+    }
+    injected_errors = {
+        service: after["errors"][service] - before["errors"][service]
+        for service in after["errors"]
+    }
+
+    return {
+        "users": users,
+        "turns": turns,
+        "seconds": round(elapsed, 3),
+        "seconds_until_drained": round(drained, 3),
+        "turns_per_second": round(turns / elapsed, 2),
+        "sessions_per_second": round(users / elapsed, 3),
+        "uploads": uploads,
+        "stub_requests": stub_requests,
+        "injected_errors": injected_errors,
+        "breakers": {
+            name: {"state": state, "rejections": breaker_rejections.value(dependency=name)}
+            for name, state in breaker_states().items()
+        },
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            / (1024 * 1024 if sys.platform == "darwin" else 1024), 1
+        ),
+        "traced_peak_mb": round(traced_peak / (1024 * 1024), 2) if traced_peak else None,
+        "stages": stage_report(),
+    }
+
+
+def print_level(result):
+    print(
+        f"\n{result['users']} users: {result['turns']} turns in {result['seconds']} s, "
+        f"{result['turns_per_second']} turns/s, peak RSS {result['peak_rss_mb']} MB"
+        + (f", traced peak {result['traced_peak_mb']} MB" if result["traced_peak_mb"] else "")
+    )
+    uploads = result["uploads"]
+    print(f"  uploads: {uploads['uploaded']} uploaded, {uploads['pending']} pending, "
+          f"{uploads['failed']} failed; drained after {result['seconds_until_drained']} s")
+    injected = {k: v for k, v in result["injected_errors"].items() if v}
+    if injected:
+        print(f"  injected errors: {injected}")
+    tripped = {name: b["rejections"] for name, b in result["breakers"].items() if b["rejections"]}
+    if tripped:
+        print(f"  calls skipped by open breakers: {tripped}")
+    print(f"  {'stage':34s} {'count':>6s} {'errors':>6s} {'p50 ms':>9s} {'p99 ms':>9s}")
+    for stage, stats in result["stages"].items():
+        print(f"  {stage:34s} {stats['count']:6d} {stats['errors']:6d} "
+              f"{stats['p50_ms']:9.1f} {stats['p99_ms']:9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", default="1,5,10,25",
+                        help="comma separated concurrency levels")
+    parser.add_argument("--turns", type=int, default=5, help="chat turns per user")
+    parser.add_argument("--latency",
+                        help="stub latency in seconds, per service (hf=0.4,tts=0.6) or for all")
+    parser.add_argument("--error-rate", help="stub failure probability, e.g. rss=0.2,swecha=0.1")
+    parser.add_argument("--jitter", type=float, default=0.25)
+    parser.add_argument("--hf-stream", action="store_true",
+                        help="stub answers streaming model calls with server-sent events")
+    parser.add_argument("--upload-timeout", type=float, default=30.0,
+                        help="seconds to wait for queued contributions after each level")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="also report the traced Python heap peak (slows the run)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="keep the services' own logging")
+    parser.add_argument("--json", metavar="PATH", help="write the report as JSON")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.users.split(",") if level.strip()]
+    with open(os.path.join(FIXTURES, "telugu_messages.json"), encoding="utf-8") as f:
+        prompts = json.load(f)["user_inputs"]
+
+    if not args.verbose:
+        # Streamlit calls outside a script run only log warnings
+        logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    process, base_url = start_stub_process(args)
+    point_gtts_at(base_url)
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as queue_dir:
+            for users in levels:
+                if args.verbose:
+                    result = run_level(users, args, base_url, prompts, queue_dir)
+                else:
+                    with open(os.devnull, "w") as devnull, \
+                            contextlib.redirect_stdout(devnull):
+                        result = run_level(users, args, base_url, prompts, queue_dir)
+                results.append(result)
+                print_level(result)
+    finally:
+        process.terminate()
+        process.wait(timeout=5)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "turns_per_user": args.turns,
+                "latency": args.latency,
+                "error_rate": args.error_rate,
+                "levels": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
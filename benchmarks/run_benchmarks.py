@@ -0,0 +1,183 @@
+"""
+Offline micro-benchmarks for the chat and news hot paths.
+
+Every case runs over recorded fixtures in benchmarks/fixtures, without any
+network access, and reports the best per-item time over several repeats.
+Results are compared against benchmarks/thresholds.json, and the run fails
+if any case is slower than its threshold.
+
+    python benchmarks/run_benchmarks.py --json results.json
+    python benchmarks/run_benchmarks.py --scale 2.0        # slower CI machines
+    python benchmarks/run_benchmarks.py --only clean_html
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(BENCH_DIR, "fixtures")
+THRESHOLDS = os.path.join(BENCH_DIR, "thresholds.json")
+
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from ai_services import TeluguAI  # noqa: E402
+from language_id import identify_language  # noqa: E402
+from news_article import Article, parse_date  # noqa: E402
+from news_service import NewsService  # noqa: E402
+
+
+def load_messages():
+    with open(os.path.join(FIXTURES, "telugu_messages.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_feed_items():
+    tree = ET.parse(os.path.join(FIXTURES, "sample_feed.xml"))
+    return [
+        {
+            "title": item.findtext("title", ""),
+            "link": item.findtext("link", ""),
+            "description": item.findtext("description", ""),
+            "published": item.findtext("pubDate", ""),
+        }
+        for item in tree.iter("item")
+    ]
+
+
+def build_cases():
+    """Map of case name to (function over the whole batch, batch size)"""
+    ai = TeluguAI()
+    ai.hf_token = ""  # never reach the network
+    news = NewsService()
+
+    messages = load_messages()
+    inputs = messages["user_inputs"]
+    responses = messages["english_responses"]
+    items = load_feed_items()
+
+    # A refresh worth of articles, with near-duplicate titles mixed in
+    articles = []
+    for copy in range(20):
+        for item in items:
+            suffix = "" if copy % 4 == 0 else f" #{copy}"
+            articles.append(Article(
+                title=item["title"] + suffix,
+                summary=item["description"],
+                source="Sample",
+                published=parse_date(item["published"]),
+                link=item["link"],
+            ))
+
+    # Cleaned descriptions as a refresh hands them to the summarizer
+    documents = [(item["title"], news.clean_html(item["description"])) for item in items] * 4
+
+    adapt_pairs = [(r, i) for r in responses for i in inputs[:3]]
+
+    return {
+        "detect_language": (
+            lambda: [ai.detect_language(text) for text in inputs], len(inputs)
+        ),
+        # FAST_LANGUAGE_ID is off by default, so the identifier is timed directly
+        "identify_language": (
+            lambda: [identify_language(text) for text in inputs], len(inputs)
+        ),
+        "get_telugu_response_category": (
+            lambda: [ai.get_telugu_response_category(text) for text in inputs], len(inputs)
+        ),
+        "adapt_response_to_telugu": (
+            lambda: [ai.adapt_response_to_telugu(r, i) for r, i in adapt_pairs],
+            len(adapt_pairs),
+        ),
+        "clean_html": (
+            lambda: [news.clean_html(item["description"]) for item in items], len(items)
+        ),
+        "create_summary": (
+            lambda: [news.create_summary(item["description"], item["title"]) for item in items],
+            len(items),
+        ),
+        "summarize_batch": (
+            lambda: news.summarizer.summarize(documents), len(documents)
+        ),
+        "classify_category": (
+            lambda: [news.classifier.classify(title, text) for title, text in documents],
+            len(documents),
+        ),
+        "format_date": (
+            lambda: [news.format_date(item["published"]) for item in items], len(items)
+        ),
+        "remove_duplicate_articles": (
+            lambda: news.remove_duplicate_articles(articles), len(articles)
+        ),
+    }
+
+
+def measure(fn, batch_size, repeats, min_time):
+    """Best per-item time in microseconds"""
+    fn()  # warm up lazy imports and caches
+
+    # Calibrate so every repeat runs for at least min_time seconds
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - start >= min_time:
+            break
+        loops *= 2
+
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / (loops * batch_size) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05,
+                        help="seconds each repeat should run for")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="multiply every threshold, for slower machines")
+    parser.add_argument("--only", action="append", help="run only the named case")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON")
+    args = parser.parse_args()
+
+    random.seed(0)
+    with open(THRESHOLDS, encoding="utf-8") as f:
+        thresholds = json.load(f)
+
+    results = {}
+    failed = False
+    for name, (fn, batch_size) in build_cases().items():
+        if args.only and name not in args.only:
+            continue
+        us_per_item = measure(fn, batch_size, args.repeats, args.min_time)
+        threshold = thresholds.get(name)
+        limit = threshold * args.scale if threshold is not None else None
+        passed = limit is None or us_per_item <= limit
+        failed = failed or not passed
+        results[name] = {
+            "us_per_item": round(us_per_item, 3),
+            "threshold_us": limit,
+            "passed": passed,
+        }
+        status = "ok" if passed else "REGRESSION"
+        limit_text = f"{limit:.1f}" if limit is not None else "-"
+        print(f"{name:32s} {us_per_item:10.3f} us/item  (limit {limit_text})  {status}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
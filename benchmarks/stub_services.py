@@ -0,0 +1,272 @@
+"""
+Local stand-ins for every external service the app depends on.
+
+One HTTP server answers for Hugging Face, the RSS hosts, Supabase's REST
+API, the Swecha corpus API and the gTTS endpoint, with a configurable
+latency and error rate per service. Responses are shaped like the real
+ones closely enough for the unmodified client code to parse them.
+
+    python benchmarks/stub_services.py --port 8765 --latency hf=0.4,tts=0.6 --error-rate rss=0.2
+
+The first line printed is the base URL, so a parent process can start the
+server on port 0 and read back where it ended up. GET /_stats returns the
+request and injected error counts per service.
+"""
+import argparse
+import base64
+import http.server
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+SERVICES = ("hf", "rss", "supabase", "swecha", "tts")
+
+# Ballpark latencies of the real services, in seconds
+DEFAULT_LATENCY = {"hf": 0.4, "rss": 0.25, "supabase": 0.08, "swecha": 0.15, "tts": 0.5}
+
+HF_REPLY = "That is a good question, here is a short answer from the model."
+
+SWECHA_RECORDS = [
+    {
+        "id": str(uuid.UUID(int=i)),
+        "title": f"Stub record {i}",
+        "media_type": "text",
+        "location": {"latitude": 17.3 + i * 0.01, "longitude": 78.4 + i * 0.01},
+    }
+    for i in range(25)
+]
+
+
+def parse_service_map(text, default=0.0):
+    """Parse "hf=0.4,tts=0.6" (or a bare number for every service) into a dict"""
+    values = {service: default for service in SERVICES}
+    if not text:
+        return values
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "=" not in part:
+            values = {service: float(part) for service in SERVICES}
+            continue
+        service, value = part.split("=", 1)
+        service = service.strip()
+        if service not in values:
+            raise ValueError(f"unknown service {service!r}, expected one of {SERVICES}")
+        values[service] = float(value)
+    return values
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _service(self):
+        path = urlsplit(self.path).path
+        if path.startswith("/api/"):
+            return "swecha"
+        return path.strip("/").split("/", 1)[0]
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status, body, content_type="application/json", headers=None):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, method):
+        stubs = self.server.stubs
+        service = self._service()
+        body = self._body()
+
+        if service == "_stats":
+            self._send(200, json.dumps(stubs.stats()))
+            return
+        if service not in SERVICES:
+            self._send(404, json.dumps({"detail": "not found"}))
+            return
+
+        stubs.count(service)
+        stubs.delay(service)
+        if stubs.should_fail(service):
+            stubs.count(service, error=True)
+            self._send(503, json.dumps({"detail": "injected failure"}))
+            return
+
+        getattr(self, f"_{service}")(method, body)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def _hf(self, method, body):
+        request = json.loads(body or b"{}")
+        inputs = request.get("inputs", "")
+        if request.get("stream") and self.server.stubs.hf_stream:
+            events = "".join(
+                f"data: {json.dumps({'token': {'text': word + ' ', 'special': False}})}\n\n"
+                for word in HF_REPLY.split()
+            )
+            self._send(200, events, "text/event-stream")
+            return
+        self._send(200, json.dumps([{"generated_text": f"{inputs} {HF_REPLY}"}]))
+
+    def _rss(self, method, body):
+        self._send(200, self.server.stubs.feed, "application/rss+xml; charset=utf-8")
+
+    def _supabase(self, method, body):
+        rows = []
+        if method in ("POST", "PATCH") and body:
+            data = json.loads(body)
+            rows = data if isinstance(data, list) else [data]
+            rows = [{"id": str(uuid.uuid4()), **row} for row in rows]
+        status = 201 if method == "POST" else 200
+        self._send(status, json.dumps(rows), headers={"Content-Range": f"*/{len(rows)}"})
+
+    def _swecha(self, method, body):
+        if method == "GET":
+            self._send(200, json.dumps(SWECHA_RECORDS))
+        elif method == "DELETE":
+            self._send(200, json.dumps({"detail": "deleted"}))
+        else:
+            self._send(201, json.dumps({"id": str(uuid.uuid4()), "status": "pending"}))
+
+    def _tts(self, method, body):
+        # gTTS scans each line for the jQ1olc RPC id and base64 decodes its payload
+        audio = base64.b64encode(self.server.stubs.audio).decode("ascii")
+        line = f'[["wrb.fr","jQ1olc","[\\"{audio}\\"]",null,null,null,"generic"]]'
+        self._send(200, f")]}}'\n\n{line}\n", "application/json; charset=utf-8")
+
+
+class StubServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+class StubServices:
+    """Stand-in server for all external services, with latency and error injection"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=None, error_rate=None,
+                 jitter=0.25, audio_bytes=16 * 1024, hf_stream=False, seed=None):
+        self.latency = dict(DEFAULT_LATENCY if latency is None else latency)
+        self.error_rate = dict(error_rate or {})
+        self.jitter = jitter
+        self.hf_stream = hf_stream
+        self.audio = random.Random(seed).randbytes(audio_bytes)
+        with open(os.path.join(FIXTURES, "sample_feed.xml"), "rb") as f:
+            self.feed = f.read()
+        self.random = random.Random(seed)
+        self.requests = {service: 0 for service in SERVICES}
+        self.errors = {service: 0 for service in SERVICES}
+        self._lock = threading.Lock()
+        self.server = StubServer((host, port), StubHandler)
+        self.server.stubs = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, service, error=False):
+        with self._lock:
+            (self.errors if error else self.requests)[service] += 1
+
+    def stats(self):
+        """Requests and injected errors per service so far"""
+        with self._lock:
+            return {"requests": dict(self.requests), "errors": dict(self.errors)}
+
+    def delay(self, service):
+        latency = self.latency.get(service, 0.0)
+        if latency > 0:
+            with self._lock:
+                factor = 1 + self.random.uniform(-self.jitter, self.jitter)
+            time.sleep(latency * factor)
+
+    def should_fail(self, service):
+        rate = self.error_rate.get(service, 0.0)
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self.random.random() < rate
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, name="stub-services", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--latency", help="seconds per service, e.g. hf=0.4,tts=0.6")
+    parser.add_argument("--error-rate", help="failure probability per service, e.g. rss=0.2")
+    parser.add_argument("--jitter", type=float, default=0.25,
+                        help="latency varies uniformly by this fraction")
+    parser.add_argument("--audio-bytes", type=int, default=16 * 1024)
+    parser.add_argument("--hf-stream", action="store_true",
+                        help="answer streaming model calls with server-sent events")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    latency = dict(DEFAULT_LATENCY)
+    if args.latency:
+        latency.update({
+            service: value
+            for service, value in parse_service_map(args.latency, default=None).items()
+            if value is not None
+        })
+
+    stubs = StubServices(
+        args.host, args.port, latency=latency,
+        error_rate=parse_service_map(args.error_rate), jitter=args.jitter,
+        audio_bytes=args.audio_bytes, hf_stream=args.hf_stream, seed=args.seed,
+    )
+    print(stubs.base_url, flush=True)
+    try:
+        stubs.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stubs.server.server_close()
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Throughput benchmark for the romanized Telugu transliterator.
+
+Transliterates chat-sized messages repeatedly and reports messages and
+characters per second, plus the cost of the full intent-matching step.
+
+    python benchmarks/transliteration.py --iterations 20000 --json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transliteration import get_transliterator, fold_for_matching  # noqa: E402
+
+MESSAGES = [
+    "namaskaram andi",
+    "ela unnaru? nenu baagunnanu",
+    "naaku konchem sahayam kavali, ee roju vaatavaranam ela undi?",
+    "hyderabad lo metro timings enti cheppandi",
+    "dhanyavadalu, chala baaga chepparu",
+    "meeru emi chestunnaru ippudu? repu kalustama",
+    "telugu varthalu chadavali ani undi, latest news cheppandi please",
+]
+
+
+def run(iterations):
+    transliterator = get_transliterator()
+    chars = sum(len(m) for m in MESSAGES)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for message in MESSAGES:
+            transliterator.transliterate(message)
+    elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for message in MESSAGES:
+            fold_for_matching(transliterator.transliterate(message))
+    folded_elapsed = time.perf_counter() - start
+
+    count = iterations * len(MESSAGES)
+    return {
+        "messages": count,
+        "seconds": round(elapsed, 4),
+        "messages_per_second": round(count / elapsed),
+        "chars_per_second": round(iterations * chars / elapsed),
+        "us_per_message": round(elapsed / count * 1e6, 2),
+        "us_per_message_with_fold": round(folded_elapsed / count * 1e6, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    report = run(args.iterations)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for key, value in report.items():
+            print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,16 +18,86 @@ RSS_FEEDS = [
     "https://feeds.feedburner.com/tv9telugulatestnews"
 ]
 
+# Swecha Corpus API Configuration
+SWECHA_API_HOST = "api.corpus.swecha.org"
+SWECHA_POOL_SIZE = 10  # max concurrent connections per process
+SWECHA_MAX_RETRIES = 2
+SWECHA_PAGE_SIZE = 25  # rows per page when browsing records
+SWECHA_PAGE_CACHE_TTL = 60  # seconds a fetched page is reused
+GEO_INDEX_REBUILD_INTERVAL = 3600  # seconds before the geo index is rebuilt, dropping deleted records
+
+# Background corpus contribution queue
+CONTRIBUTION_QUEUE_PATH = os.getenv("CONTRIBUTION_QUEUE_PATH", ".data/contributions.db")
+CONTRIBUTION_BATCH_SIZE = 20
+CONTRIBUTION_CONCURRENCY = 4  # parallel uploads per process
+CONTRIBUTION_BACKOFF_BASE = 2.0  # seconds, doubled on every failed attempt
+CONTRIBUTION_BACKOFF_MAX = 300.0  # retries of a failing upload continue at this interval
+CORPUS_MAX_TURNS = 50  # turns packed into one Swecha record
+CORPUS_MAX_BYTES = 256 * 1024  # flush a conversation record early past this size
+CORPUS_IDLE_FLUSH = 1800  # seconds without a new turn before a saved conversation is contributed
+
 # App Settings
 MAX_CHAT_HISTORY = 100
+AUDIO_CACHE_MAX_BYTES = 64 * 1024 * 1024  # per-process budget for cached TTS audio
+CHAT_RENDER_WINDOW = 20  # messages rendered per rerun, older ones load on demand
+TURN_TASK_WORKERS = 8  # shared threads for TTS, chat saves and corpus uploads
+AUDIO_POLL_INTERVAL = 0.5  # seconds between checks for background TTS audio
+PROFILE_STATS_TTL = 60  # seconds the profile tab reuses fetched user stats
 TTS_LANGUAGE = "te"  # Telugu language code for gTTS
 DEFAULT_LANGUAGE = "telugu"
+FAST_LANGUAGE_ID = False  # n-gram check for romanized Telugu in Latin-script input; off, it treats Latin script as English
+TRANSLITERATE_INPUT = True  # match romanized Telugu against native-script intents
 APP_NAME = "Telugu AI Assistant"
 VERSION = "1.0.0"
 
+# News feed polling
+FEED_POLL_INTERVAL = 300  # seconds between polls of a feed without history yet
+FEED_MIN_POLL_INTERVAL = 120  # never poll one feed more often than this
+FEED_MAX_POLL_INTERVAL = 3600  # quiet or failing feeds back off up to this
+FEED_EWMA_ALPHA = 0.3  # weight of the newest poll in the feed statistics
+NEWS_INDEX_PATH = os.getenv("NEWS_INDEX_PATH", ".data/news_index.db")
+NEWS_SEARCH_LIMIT = 20  # search results shown in the news tab
+SUMMARY_MAX_SENTENCES = 2  # sentences kept in a news summary
+SUMMARY_MAX_CHARS = 200  # summary length cap, which also bounds TTS time
+NEWS_UTC_OFFSET_MINUTES = 330  # article times are shown in India Standard Time
+
+# Cache shared by all worker processes (shared_cache.py)
+SHARED_CACHE_URL = os.getenv("SHARED_CACHE_URL", "")  # redis://host:6379/0, or empty for the local SQLite file
+SHARED_CACHE_PATH = os.getenv("SHARED_CACHE_PATH", ".data/shared_cache.db")
+SHARED_CACHE_MMAP_BYTES = 64 * 1024 * 1024  # SQLite file mapped into every worker
+SHARED_CACHE_MAX_BYTES = 256 * 1024 * 1024  # cached values kept in the SQLite file; oldest evicted past it
+TTS_CACHE_TTL = 7 * 24 * 3600  # seconds synthesized audio is reused for the same text
+AI_RESPONSE_CACHE_TTL = 3600  # seconds a model reply is reused for the same message
+
+# Export Settings
+EXPORT_PAGE_SIZE = 500  # chat_history rows fetched per page during export
+EXPORT_CHUNK_SIZE = 64 * 1024  # bytes per streamed chunk
+
 # API Timeouts
 REQUEST_TIMEOUT = 10
 TTS_TIMEOUT = 15
+HTTP_POOL_HOSTS = 10  # hosts with kept-alive connections (Hugging Face, RSS feeds)
+HTTP_POOL_SIZE = 32  # kept-alive connections per host
+
+# Headless API server (api_server.py)
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+API_TOKEN = os.getenv("API_TOKEN", "")  # bearer token clients must send; empty disables the check
+API_WORKER_THREADS = 64  # threads running blocking service calls per process
+API_MAX_TEXT_CHARS = 2000  # longest chat message or TTS text accepted
+
+# Outbound resilience
+BREAKER_FAILURE_THRESHOLD = 5  # consecutive failures before a dependency is skipped
+BREAKER_RESET_TIMEOUT = 30  # seconds a tripped dependency is skipped before one probe
+CHAT_RESPONSE_DEADLINE = 12  # seconds a reply may spend waiting on Hugging Face
+NEWS_REFRESH_DEADLINE = 15  # seconds for fetching every RSS feed in one refresh
+SWECHA_REQUEST_DEADLINE = 20  # seconds per Swecha call, retries included
+
+# Metrics export (Prometheus text format)
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")  # 0.0.0.0 exposes the endpoint to other hosts
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # 0 disables the HTTP endpoint
+METRICS_FILE = os.getenv("METRICS_FILE", "")  # empty disables the file export
+METRICS_FILE_INTERVAL = 15  # seconds between metrics file writes
 
 # Security Settings
 PASSWORD_MIN_LENGTH = 6
@@ -0,0 +1,395 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import (
+    CONTRIBUTION_QUEUE_PATH,
+    CONTRIBUTION_BATCH_SIZE,
+    CONTRIBUTION_CONCURRENCY,
+    CONTRIBUTION_BACKOFF_BASE,
+    CONTRIBUTION_BACKOFF_MAX,
+    CORPUS_IDLE_FLUSH,
+)
+from corpus_builder import ConversationCorpus
+from resilience import CircuitOpenError
+from swecha_service import SwechaAPIError
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+UPLOADED = "uploaded"
+FAILED = "failed"
+
+# Client errors that are worth retrying; any other 4xx will never succeed
+RETRYABLE_CLIENT_STATUSES = {408, 425, 429}
+
+DRAFT_SWEEP_INTERVAL = 60  # seconds between checks for idle conversation drafts
+DRAFT_TOMBSTONE_TTL = 7 * 24 * 3600  # seconds contributed drafts are remembered
+
+
+class ContributionQueue:
+    """
+    Durable local queue of Swecha record payloads backed by SQLite.
+    Records survive restarts and API outages until they are uploaded.
+    Conversations still being written are kept as drafts, one per session
+    part with its turns appended as rows, until the session or the
+    uploader turns them into a record.
+    """
+
+    def __init__(self, path=CONTRIBUTION_QUEUE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS contributions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                owner TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS contributions_due "
+            "ON contributions (status, next_attempt_at)"
+        )
+        # state is the draft's session header (its turns are in draft_turns).
+        # contributed = 1 marks a draft the uploader already queued, so a
+        # session returning from idle starts a new part instead of resending it
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS drafts (
+                session_id TEXT NOT NULL,
+                part INTEGER NOT NULL,
+                owner TEXT NOT NULL,
+                state TEXT NOT NULL,
+                contributed INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (session_id, part)
+            )
+            """
+        )
+        # One row per turn, so saving a turn never rewrites the ones before it
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS draft_turns (
+                session_id TEXT NOT NULL,
+                part INTEGER NOT NULL,
+                turn INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (session_id, part, turn)
+            )
+            """
+        )
+
+    def put(self, owner, payload, draft=None):
+        """
+        Add a record payload to the queue. draft is the (session_id, part)
+        the record was built from; its draft is removed in the same
+        transaction, and nothing is queued if the uploader already did.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                record_id = None
+                contributed = draft is not None and self._conn.execute(
+                    "SELECT 1 FROM drafts WHERE session_id = ? AND part = ? AND contributed = 1",
+                    draft,
+                ).fetchone()
+                if not contributed:
+                    cursor = self._conn.execute(
+                        "INSERT INTO contributions (owner, payload, created_at, updated_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (owner, payload, now, now),
+                    )
+                    record_id = cursor.lastrowid
+                    if draft is not None:
+                        self._conn.execute(
+                            "DELETE FROM drafts WHERE session_id = ? AND part = ?", draft
+                        )
+                        self._delete_draft_turns(*draft)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return record_id
+
+    def save_draft(self, session_id, part, owner, turn, header, data):
+        """
+        Append one turn to a conversation draft and refresh its header;
+        False if the draft was already contributed
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(
+                    "INSERT INTO drafts (session_id, part, owner, state, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (session_id, part) DO UPDATE SET state = excluded.state, "
+                    "updated_at = excluded.updated_at WHERE drafts.contributed = 0",
+                    (session_id, part, owner, header, time.time()),
+                )
+                saved = cursor.rowcount == 1
+                if saved:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO draft_turns (session_id, part, turn, data) "
+                        "VALUES (?, ?, ?, ?)",
+                        (session_id, part, turn, data),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return saved
+
+    def idle_drafts(self, older_than):
+        """
+        Drafts not updated for older_than seconds, as
+        (session_id, part, owner, header, updated_at)
+        """
+        cutoff = time.time() - older_than
+        with self._lock:
+            return self._conn.execute(
+                "SELECT session_id, part, owner, state, updated_at FROM drafts "
+                "WHERE contributed = 0 AND updated_at < ?",
+                (cutoff,),
+            ).fetchall()
+
+    def draft_turns(self, session_id, part):
+        """The saved turns of a draft, in order"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM draft_turns WHERE session_id = ? AND part = ? ORDER BY turn",
+                (session_id, part),
+            ).fetchall()
+        return [data for (data,) in rows]
+
+    def _delete_draft_turns(self, session_id, part):
+        self._conn.execute(
+            "DELETE FROM draft_turns WHERE session_id = ? AND part = ?", (session_id, part)
+        )
+
+    def contribute_draft(self, session_id, part, updated_at, owner, payload):
+        """
+        Queue an idle draft's record, unless its session saved a newer turn
+        or another process got there first; True if it was queued
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(
+                    "UPDATE drafts SET contributed = 1, state = '', updated_at = ? "
+                    "WHERE session_id = ? AND part = ? AND contributed = 0 AND updated_at = ?",
+                    (now, session_id, part, updated_at),
+                )
+                queued = cursor.rowcount == 1
+                if queued:
+                    self._conn.execute(
+                        "INSERT INTO contributions (owner, payload, created_at, updated_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (owner, payload, now, now),
+                    )
+                    self._delete_draft_turns(session_id, part)
+                self._conn.execute(
+                    "DELETE FROM drafts WHERE contributed = 1 AND updated_at < ?",
+                    (now - DRAFT_TOMBSTONE_TTL,),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return queued
+
+    def claim(self, limit):
+        """Mark up to limit due records as in flight and return them"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT id, payload, attempts FROM contributions "
+                    "WHERE status = ? AND next_attempt_at <= ? "
+                    "ORDER BY id LIMIT ?",
+                    (PENDING, now, limit),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE contributions SET status = ?, updated_at = ? WHERE id = ?",
+                    [(IN_FLIGHT, now, row[0]) for row in rows],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return rows
+
+    def mark_uploaded(self, record_id):
+        """Record a successful upload"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE contributions SET status = ?, last_error = NULL, updated_at = ? "
+                "WHERE id = ?",
+                (UPLOADED, time.time(), record_id),
+            )
+
+    def mark_failed(self, record_id, attempts, error, retry_at=None):
+        """Schedule a retry, or give up when retry_at is None"""
+        status = PENDING if retry_at is not None else FAILED
+        with self._lock:
+            self._conn.execute(
+                "UPDATE contributions SET status = ?, attempts = ?, next_attempt_at = ?, "
+                "last_error = ?, updated_at = ? WHERE id = ?",
+                (status, attempts, retry_at or 0, str(error)[:500], time.time(), record_id),
+            )
+
+    def requeue_stale(self, older_than):
+        """Return in-flight records abandoned by a crashed worker to the queue"""
+        cutoff = time.time() - older_than
+        with self._lock:
+            self._conn.execute(
+                "UPDATE contributions SET status = ? WHERE status = ? AND updated_at < ?",
+                (PENDING, IN_FLIGHT, cutoff),
+            )
+
+    def stats(self, owner=None):
+        """Count records per status, optionally for a single owner"""
+        query = "SELECT status, COUNT(*) FROM contributions"
+        params = ()
+        if owner is not None:
+            query += " WHERE owner = ?"
+            params = (owner,)
+        query += " GROUP BY status"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        counts = {PENDING: 0, IN_FLIGHT: 0, UPLOADED: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+
+class ContributionUploader:
+    """
+    Background worker that drains the contribution queue into the Swecha API
+    in batches, with bounded concurrency. Network errors and 5xx answers
+    are retried with exponential backoff capped at backoff_max, for as long
+    as it takes; only records the API rejects with a 4xx are marked failed.
+    """
+
+    def __init__(self, swecha_api, queue=None, batch_size=CONTRIBUTION_BATCH_SIZE,
+                 concurrency=CONTRIBUTION_CONCURRENCY, backoff_base=CONTRIBUTION_BACKOFF_BASE, backoff_max=CONTRIBUTION_BACKOFF_MAX,
+                 poll_interval=5.0):
+        self.swecha_api = swecha_api
+        self.queue = queue if queue is not None else ContributionQueue()
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._next_sweep = 0.0
+
+    def start(self):
+        """Start the background worker if it is not already running"""
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self.queue.requeue_stale(older_than=self.backoff_max)
+            self._thread = threading.Thread(
+                target=self._run, name="swecha-uploader", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Ask the worker to exit after its current batch"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def enqueue(self, owner, payload, draft=None):
+        """Queue a record payload for upload and wake the worker"""
+        record_id = self.queue.put(owner, payload, draft)
+        self.start()
+        self._wake.set()
+        return record_id
+
+    def contribute_idle_drafts(self, idle_for=CORPUS_IDLE_FLUSH):
+        """Queue conversations whose sessions stopped adding turns; returns how many"""
+        queued = 0
+        for session_id, part, owner, header, updated_at in self.queue.idle_drafts(idle_for):
+            turns = [json.loads(data) for data in self.queue.draft_turns(session_id, part)]
+            corpus = ConversationCorpus.from_draft(json.loads(header), turns)
+            record = corpus.build_record(self.swecha_api)
+            if record and self.queue.contribute_draft(session_id, part, updated_at, owner, record):
+                queued += 1
+        return queued
+
+    def status(self, owner=None):
+        """Queue counts for the sidebar"""
+        return self.queue.stats(owner)
+
+    def backoff(self, attempts):
+        """Delay in seconds before the given retry attempt"""
+        return min(self.backoff_max, self.backoff_base * 2 ** min(attempts - 1, 30))
+
+    def _upload(self, row):
+        record_id, payload, attempts = row
+        try:
+            self.swecha_api.submit_record(payload)
+            self.queue.mark_uploaded(record_id)
+        except CircuitOpenError as e:
+            # The API was not contacted, so this is not an attempt
+            self.queue.mark_failed(record_id, attempts, e, time.time() + e.retry_in)
+        except SwechaAPIError as e:
+            attempts += 1
+            print(f"Swecha upload failed for contribution {record_id}: {e}")
+            if e.status < 500 and e.status not in RETRYABLE_CLIENT_STATUSES:
+                # Rejected as invalid; resending the same payload cannot help
+                self.queue.mark_failed(record_id, attempts, e)
+            else:
+                self.queue.mark_failed(record_id, attempts, e, time.time() + self.backoff(attempts))
+        except Exception as e:
+            # Network errors and timeouts are retried until the API is back
+            attempts += 1
+            print(f"Swecha upload failed for contribution {record_id}: {e}")
+            self.queue.mark_failed(record_id, attempts, e, time.time() + self.backoff(attempts))
+
+    def drain_once(self, executor):
+        """Upload one batch, returning how many records were attempted"""
+        rows = self.queue.claim(self.batch_size)
+        if rows:
+            list(executor.map(self._upload, rows))
+        return len(rows)
+
+    def _run(self):
+        with ThreadPoolExecutor(max_workers=self.concurrency,
+                                thread_name_prefix="swecha-upload") as executor:
+            while not self._stop.is_set():
+                try:
+                    if time.monotonic() >= self._next_sweep:
+                        self._next_sweep = time.monotonic() + DRAFT_SWEEP_INTERVAL
+                        self.contribute_idle_drafts()
+                    if self.drain_once(executor):
+                        continue
+                except Exception as e:
+                    print(f"Swecha uploader error: {e}")
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
@@ -0,0 +1,147 @@
+import json
+from datetime import datetime
+from config import CORPUS_MAX_BYTES, CORPUS_MAX_TURNS
+
+CORPUS_METADATA = {
+    "domain": "conversational_ai",
+    "quality": "human_verified",
+    "source": "telugu_ai_chat",
+    "version": "1.1",
+}
+
+
+class ConversationCorpus:
+    """
+    Accumulates the turns of one chat session as compact JSONL so the whole
+    conversation is contributed to Swecha as a single record. Each turn is
+    serialized exactly once, when it is added.
+
+    With a drafts queue, every turn is also appended to a draft there, so
+    closing the tab loses nothing: the uploader rebuilds and contributes
+    drafts that have been idle for CORPUS_IDLE_FLUSH seconds.
+    """
+
+    def __init__(self, session_id, user_id, location=None, category_id="", drafts=None,
+                 owner=None, max_bytes=CORPUS_MAX_BYTES, max_turns=CORPUS_MAX_TURNS):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.location = location
+        self.category_id = category_id
+        self.drafts = drafts
+        self.owner = owner
+        self.max_bytes = max_bytes
+        self.max_turns = max_turns
+        self.part = 0
+        self.turn_count = 0
+        self.reset()
+
+    def reset(self):
+        """Start a new part of the conversation"""
+        self.lines = []
+        self.size = 0
+        self.languages = set()
+        self.started_at = None
+
+    def draft_header(self):
+        """Session context of the draft, saved alongside each turn"""
+        return {
+            "session_id": self.session_id,
+            "user_id": self.user_id,
+            "location": self.location,
+            "category_id": self.category_id,
+            "part": self.part,
+        }
+
+    @classmethod
+    def from_draft(cls, header, turns):
+        """Rebuild the unsent part from a saved draft header and its turns"""
+        corpus = cls(header["session_id"], header["user_id"], header["location"], header["category_id"])
+        corpus.part = header["part"]
+        for turn in turns:
+            corpus._add(turn)
+            corpus.turn_count = turn["turn"]
+        return corpus
+
+    def _append(self, data):
+        line = json.dumps(data, ensure_ascii=False, separators=(',', ':')) + '\n'
+        self.lines.append(line)
+        self.size += len(line.encode('utf-8'))
+
+    def _add(self, turn):
+        if not self.lines:
+            self.started_at = turn["timestamp"]
+            # Session level context is written once per record, not per turn
+            self._append({
+                "session_id": self.session_id,
+                "user_id": self.user_id or "anonymous",
+                "part": self.part,
+                "started_at": self.started_at,
+                "metadata": CORPUS_METADATA,
+            })
+        self._append(turn)
+        self.languages.update((turn["user"]["language"], turn["ai"]["language"]))
+
+    def add_turn(self, user_text, user_lang, ai_text, ai_lang):
+        """Add one exchange, returning True once the part should be flushed"""
+        self.turn_count += 1
+        turn = {
+            "turn": self.turn_count,
+            "timestamp": datetime.now().isoformat(),
+            "user": {"text": user_text, "language": user_lang},
+            "ai": {"text": ai_text, "language": ai_lang},
+        }
+        self._add(turn)
+        if self.drafts is not None and not self.save_draft(turn):
+            # The uploader contributed the earlier turns while this session
+            # was idle, so this turn starts the next part
+            self.part += 1
+            self.reset()
+            self._add(turn)
+            self.save_draft(turn)
+        return self.is_full()
+
+    def save_draft(self, turn):
+        """Append turn to the draft; False if the uploader already contributed it"""
+        return self.drafts.save_draft(
+            self.session_id, self.part, self.owner, turn["turn"],
+            json.dumps(self.draft_header(), ensure_ascii=False),
+            self.lines[-1],
+        )
+
+    def is_full(self):
+        """Whether the current part has reached its size or turn limit"""
+        turns = len(self.lines) - 1
+        return self.size >= self.max_bytes or turns >= self.max_turns
+
+    def is_empty(self):
+        return len(self.lines) <= 1
+
+    def primary_language(self):
+        """Corpus language for the record, Telugu if any turn used it"""
+        if self.languages & {"telugu", "mixed", "romanized_telugu"}:
+            return "telugu"
+        return "english"
+
+    def build_record(self, swecha_api):
+        """Build the Swecha record body for the current part and start the next one"""
+        if self.is_empty():
+            return None
+
+        started = datetime.fromisoformat(self.started_at)
+        record = swecha_api.build_record(
+            title=f"Telugu AI Chat - {started.strftime('%Y-%m-%d %H:%M')}",
+            description="".join(self.lines),
+            media_type="text",
+            file_url="",
+            file_name=f"conversation_{self.session_id}_{self.part}.jsonl",
+            file_size=self.size,
+            location=self.location,
+            release_rights="creator",
+            language=self.primary_language(),
+            user_id=self.user_id,
+            category_id=self.category_id,
+        )
+
+        self.part += 1
+        self.reset()
+        return record
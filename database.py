@@ -1,17 +1,56 @@
 import streamlit as st
-from supabase import create_client, Client
-import bcrypt
 from datetime import datetime
 import json
+import threading
 from config import SUPABASE_URL, SUPABASE_KEY
+from metrics import span, timed
 
 class Database:
     def __init__(self, url=SUPABASE_URL, key=SUPABASE_KEY):
-        self.client = create_client(url, key)
+        self.url = url
+        self.key = key
+        self._client = None
+        self._client_lock = threading.Lock()
+        self.health = "pending"
+        self.health_error = None
     
+    @property
+    def client(self):
+        """Supabase client, created on first use so importing supabase stays off cold start"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from supabase import create_client
+                    self._client = create_client(self.url, self.key)
+        return self._client
+    
+    def check_health(self):
+        """Probe the users table and record whether the database is reachable"""
+        try:
+            self.client.table('users').select('count', count='exact').limit(1).execute()
+            self.health = "ok"
+            self.health_error = None
+        except Exception as e:
+            self.health = "failed"
+            self.health_error = str(e)
+        return self.health
+    
+    def start_health_check(self):
+        """Run the connection probe in the background"""
+        thread = threading.Thread(target=self.check_health, name="supabase-health", daemon=True)
+        thread.start()
+        return thread
+    
+    def is_available(self):
+        """False only once the probe has failed, so a pending probe never blocks login"""
+        return self.health != "failed"
+    
+    @timed("database.create_user")
     def create_user(self, email: str, password: str) -> str:
         """Create a new user"""
         try:
+            import bcrypt
+            
             # Hash password
             hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
             
@@ -27,9 +66,12 @@ class Database:
             st.error(f"Error creating user: {str(e)}")
             return None
     
+    @timed("database.authenticate_user")
     def authenticate_user(self, email: str, password: str) -> dict:
         """Authenticate user login"""
         try:
+            import bcrypt
+            
             result = self.client.table('users').select('*').eq('email', email).execute()
             
             if result.data:
@@ -41,30 +83,33 @@ class Database:
             st.error(f"Error authenticating user: {str(e)}")
             return None
     
+    @timed("database.save_chat_message")
     def save_chat_message(self, user_id: str, user_message: str, ai_response: str, audio_file=None):
-        """Save chat message to database"""
-        try:
-            self.client.table('chat_history').insert({
-                'user_id': user_id,
-                'user_message': user_message,
-                'ai_response': ai_response,
-                'audio_file': audio_file,
-                'timestamp': datetime.now().isoformat()
-            }).execute()
-        except Exception as e:
-            st.error(f"Error saving chat: {str(e)}")
+        """Save chat message to database, raising on failure (it runs off the script thread)"""
+        self.client.table('chat_history').insert({
+            'user_id': user_id,
+            'user_message': user_message,
+            'ai_response': ai_response,
+            'audio_file': audio_file,
+            'timestamp': datetime.now().isoformat()
+        }).execute()
     
-    def get_chat_history(self, user_id: str) -> list:
-        """Retrieve chat history for user"""
+    @timed("database.get_chat_history")
+    def get_chat_history(self, user_id: str, limit: int = None) -> list:
+        """Retrieve chat history for user, optionally only the latest limit turns"""
         try:
-            result = self.client.table('chat_history')\
+            query = self.client.table('chat_history')\
                 .select('*')\
-                .eq('user_id', user_id)\
-                .order('timestamp')\
-                .execute()
+                .eq('user_id', user_id)
+            
+            if limit:
+                result = query.order('timestamp', desc=True).limit(limit).execute()
+                rows = list(reversed(result.data))
+            else:
+                rows = query.order('timestamp').execute().data
             
             messages = []
-            for row in result.data:
+            for row in rows:
                 messages.append({"role": "user", "content": row['user_message']})
                 messages.append({
                     "role": "assistant", 
@@ -77,6 +122,33 @@ class Database:
             st.error(f"Error fetching chat history: {str(e)}")
             return []
     
+    def iter_chat_history(self, user_id: str, page_size: int = 500, columns: str = '*'):
+        """
+        Yield chat history rows for user one page at a time. Errors are
+        raised, not reported, so a failed export never looks complete.
+        """
+        start = 0
+        while True:
+            # Timed per page so the consumer's work is not counted
+            with span("database.iter_chat_history"):
+                # id breaks timestamp ties, so pages never repeat or skip rows
+                result = self.client.table('chat_history')\
+                    .select(columns)\
+                    .eq('user_id', user_id)\
+                    .order('timestamp')\
+                    .order('id')\
+                    .range(start, start + page_size - 1)\
+                    .execute()
+            
+            rows = result.data or []
+            for row in rows:
+                yield row
+            
+            if len(rows) < page_size:
+                return
+            start += page_size
+    
+    @timed("database.clear_chat_history")
     def clear_chat_history(self, user_id: str):
         """Clear chat history for user"""
         try:
@@ -84,6 +156,7 @@ class Database:
         except Exception as e:
             st.error(f"Error clearing chat history: {str(e)}")
     
+    @timed("database.get_user_stats")
     def get_user_stats(self, user_id: str) -> dict:
         """Get user statistics"""
         try:
@@ -0,0 +1,211 @@
+import json
+import os
+import tempfile
+import weakref
+import zlib
+from datetime import datetime
+from config import EXPORT_PAGE_SIZE, EXPORT_CHUNK_SIZE
+
+EXPORT_COLUMNS = ['id', 'user_message', 'ai_response', 'timestamp']
+
+
+class _ChunkSink:
+    """Minimal writable file object that hands written bytes back to a generator"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class ExportFile:
+    """
+    A spooled export on disk. The file is deleted with delete(), or when
+    the object is garbage collected, which happens once the session
+    holding it ends.
+    """
+
+    def __init__(self, path, name, mime):
+        self.path = path
+        self.name = name
+        self.mime = mime
+        self._finalizer = weakref.finalize(self, _remove_file, path)
+
+    def exists(self):
+        return self._finalizer.alive and os.path.exists(self.path)
+
+    def read(self):
+        """Contents of the export, for the download button to call on click"""
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def delete(self):
+        self._finalizer()
+
+
+class ChatExporter:
+    """
+    Streams a user's chat history out of the database as NDJSON or Parquet.
+    Rows are pulled page by page so the full history is never held in memory.
+    """
+
+    formats = {
+        "ndjson": {"extension": "ndjson", "mime": "application/x-ndjson"},
+        "parquet": {"extension": "parquet", "mime": "application/vnd.apache.parquet"},
+    }
+
+    def __init__(self, db, page_size=EXPORT_PAGE_SIZE, chunk_size=EXPORT_CHUNK_SIZE):
+        self.db = db
+        self.page_size = page_size
+        self.chunk_size = chunk_size
+
+    def iter_rows(self, user_id, include_audio=False):
+        """Yield chat history rows for export"""
+        columns = EXPORT_COLUMNS + (['audio_file'] if include_audio else [])
+        return self.db.iter_chat_history(
+            user_id, page_size=self.page_size, columns=','.join(columns)
+        )
+
+    def iter_ndjson(self, user_id, compress=False, include_audio=False):
+        """Yield the export as NDJSON byte chunks, optionally gzip compressed"""
+        compressor = zlib.compressobj(wbits=31) if compress else None
+        buffer = []
+        buffered = 0
+
+        for row in self.iter_rows(user_id, include_audio):
+            line = json.dumps(row, ensure_ascii=False, separators=(',', ':')) + '\n'
+            encoded = line.encode('utf-8')
+            buffer.append(encoded)
+            buffered += len(encoded)
+
+            if buffered >= self.chunk_size:
+                data = b''.join(buffer)
+                buffer = []
+                buffered = 0
+                if compressor:
+                    data = compressor.compress(data)
+                if data:
+                    yield data
+
+        data = b''.join(buffer)
+        if compressor:
+            data = compressor.compress(data) + compressor.flush()
+        if data:
+            yield data
+
+    def iter_parquet(self, user_id, compress=False, include_audio=False):
+        """Yield the export as Parquet byte chunks, one row group per page"""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+
+        columns = EXPORT_COLUMNS + (['audio_file'] if include_audio else [])
+        schema = pa.schema([(name, pa.string()) for name in columns])
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(
+            sink, schema, compression='gzip' if compress else 'snappy'
+        )
+
+        page = []
+        try:
+            for row in self.iter_rows(user_id, include_audio):
+                page.append(row)
+                if len(page) >= self.page_size:
+                    writer.write_table(self._page_to_table(pa, schema, page))
+                    page = []
+                    data = sink.drain()
+                    if data:
+                        yield data
+
+            if page:
+                writer.write_table(self._page_to_table(pa, schema, page))
+        finally:
+            writer.close()
+
+        data = sink.drain()
+        if data:
+            yield data
+
+    def _page_to_table(self, pa, schema, rows):
+        """Convert a page of rows into an Arrow table"""
+        return pa.table(
+            {
+                name: [None if row.get(name) is None else str(row.get(name)) for row in rows]
+                for name in schema.names
+            },
+            schema=schema,
+        )
+
+    def export(self, user_id, fmt="ndjson", compress=False, include_audio=False):
+        """Return a generator of byte chunks for the requested format"""
+        if fmt == "ndjson":
+            return self.iter_ndjson(user_id, compress, include_audio)
+        if fmt == "parquet":
+            return self.iter_parquet(user_id, compress, include_audio)
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    def write_to_file(self, user_id, fmt="ndjson", compress=False, include_audio=False):
+        """Spool the export to a temporary file and return its path"""
+        suffix = "." + self.file_extension(fmt, compress)
+        fd, path = tempfile.mkstemp(prefix="chat_export_", suffix=suffix)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in self.export(user_id, fmt, compress, include_audio):
+                    f.write(chunk)
+        except Exception:
+            os.remove(path)
+            raise
+        return path
+
+    def spool(self, user_id, fmt="ndjson", compress=False, include_audio=False):
+        """Spool the export to a temporary file and return it as an ExportFile"""
+        path = self.write_to_file(user_id, fmt, compress, include_audio)
+        return ExportFile(path, self.file_name(fmt, compress), self.mime_type(fmt, compress))
+
+    def file_extension(self, fmt, compress=False):
+        """File extension for an export format"""
+        extension = self.formats[fmt]["extension"]
+        # Parquet compresses internally, only NDJSON gets an outer gzip layer
+        if compress and fmt == "ndjson":
+            extension += ".gz"
+        return extension
+
+    def mime_type(self, fmt, compress=False):
+        """MIME type for an export format"""
+        if compress and fmt == "ndjson":
+            return "application/gzip"
+        return self.formats[fmt]["mime"]
+
+    def file_name(self, fmt, compress=False):
+        """Download file name for an export"""
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return f"telugu_ai_chat_{stamp}.{self.file_extension(fmt, compress)}"
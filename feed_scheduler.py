@@ -0,0 +1,186 @@
+"""
+Adaptive polling for the RSS feeds.
+
+Every feed keeps running statistics: an EWMA of fetch latency, an EWMA
+error rate, and how often it publishes, estimated from the gaps between
+its own entry timestamps. From these each feed gets a poll interval and
+a priority score. Feeds are polled about twice per expected update, back
+off while they publish nothing new, and back off exponentially while they
+fail. Due feeds are fetched best first, so a slow or dead feed never holds
+up the others within a refresh budget.
+"""
+import math
+import statistics
+import threading
+import time
+from config import (
+    FEED_POLL_INTERVAL,
+    FEED_MIN_POLL_INTERVAL,
+    FEED_MAX_POLL_INTERVAL,
+    FEED_EWMA_ALPHA,
+)
+
+IDLE_BACKOFF = 1.5  # interval growth per poll that found nothing new
+MAX_BACKOFF_STEPS = 6
+
+
+def _ewma(current, value, alpha):
+    return value if current is None else alpha * value + (1 - alpha) * current
+
+
+class FeedStats:
+    """Health and freshness statistics for one feed"""
+
+    def __init__(self, name, url, alpha=FEED_EWMA_ALPHA):
+        self.name = name
+        self.url = url
+        self.alpha = alpha
+        self.latency = None  # seconds, EWMA
+        self.error_rate = 0.0  # EWMA of 1 for a failed poll, 0 for a good one
+        self.update_interval = None  # seconds between entries, EWMA
+        self.consecutive_errors = 0
+        self.idle_polls = 0  # successful polls in a row with no new entries
+        self.newest_entry = None
+        self.polls = 0
+        self.last_polled = None
+        self.next_due = 0.0
+        self.articles = []  # articles from the last successful poll
+        self.in_flight = None  # Event set when the poll claimed by plan() finishes
+
+    def record_success(self, latency, timestamps, articles):
+        """Update the statistics after a successful poll"""
+        self.polls += 1
+        self.latency = _ewma(self.latency, latency, self.alpha)
+        self.error_rate = _ewma(self.error_rate, 0.0, self.alpha)
+        self.consecutive_errors = 0
+
+        timestamps = sorted((t for t in timestamps if t is not None), reverse=True)
+        if len(timestamps) >= 2:
+            gap = statistics.median(a - b for a, b in zip(timestamps, timestamps[1:]))
+            if gap > 0:
+                self.update_interval = _ewma(self.update_interval, gap, self.alpha)
+
+        newest = timestamps[0] if timestamps else None
+        if newest is not None and (self.newest_entry is None or newest > self.newest_entry):
+            self.newest_entry = newest
+            self.idle_polls = 0
+        else:
+            self.idle_polls += 1
+
+        if articles:
+            self.articles = articles
+
+    def record_failure(self, latency):
+        """Update the statistics after a poll that errored"""
+        self.polls += 1
+        self.latency = _ewma(self.latency, latency, self.alpha)
+        self.error_rate = _ewma(self.error_rate, 1.0, self.alpha)
+        self.consecutive_errors += 1
+
+    def poll_interval(self):
+        """Seconds until this feed should be polled again"""
+        if self.update_interval:
+            interval = self.update_interval / 2
+        else:
+            interval = FEED_POLL_INTERVAL
+        interval *= IDLE_BACKOFF ** min(self.idle_polls, MAX_BACKOFF_STEPS)
+        interval *= 2 ** min(self.consecutive_errors, MAX_BACKOFF_STEPS)
+        return min(FEED_MAX_POLL_INTERVAL, max(FEED_MIN_POLL_INTERVAL, interval))
+
+    def score(self):
+        """Priority of the feed: reliable, fast and frequently updated scores highest"""
+        reliability = (1.0 - self.error_rate) * 0.5 ** min(self.consecutive_errors, MAX_BACKOFF_STEPS)
+        freshness = 1.0
+        if self.update_interval:
+            freshness = min(1.0, math.sqrt(FEED_POLL_INTERVAL / self.update_interval))
+        speed = 1.0 / (1.0 + (self.latency or 0.0))
+        return reliability * freshness * speed
+
+    def priority(self):
+        """Sort key: feeds that are currently failing always go after healthy ones"""
+        return (self.consecutive_errors > 0, -self.score())
+
+    def summary(self):
+        return {
+            "name": self.name,
+            "score": round(self.score(), 3),
+            "poll_interval": round(self.poll_interval()),
+            "error_rate": round(self.error_rate, 3),
+            "latency_ms": round(self.latency * 1000) if self.latency is not None else None,
+            "update_interval": round(self.update_interval) if self.update_interval else None,
+            "polls": self.polls,
+            "articles": len(self.articles),
+        }
+
+
+class FeedScheduler:
+    """Decides which feeds to poll on each refresh and in what order"""
+
+    def __init__(self):
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def stats_for(self, feed_config):
+        url = feed_config["url"]
+        with self._lock:
+            stats = self.stats.get(url)
+            if stats is None:
+                stats = self.stats[url] = FeedStats(feed_config["name"], url)
+            return stats
+
+    def plan(self, feeds, force=False, now=None):
+        """
+        Split feeds into (due, idle), due ones ordered best first. Due feeds
+        are claimed until their next interval, so concurrent refreshes from
+        other sessions do not poll them again; those can wait_for() a claimed
+        feed's articles. Call finish() for every due feed once it is handled.
+        """
+        now = time.time() if now is None else now
+        due, idle = [], []
+        for feed_config in feeds:
+            stats = self.stats_for(feed_config)
+            with self._lock:
+                if force or now >= stats.next_due:
+                    stats.last_polled = now
+                    stats.next_due = now + stats.poll_interval()
+                    if stats.in_flight is None:
+                        stats.in_flight = threading.Event()
+                    due.append((feed_config, stats))
+                else:
+                    idle.append((feed_config, stats))
+        due.sort(key=lambda item: item[1].priority())
+        return due, idle
+
+    def finish(self, stats):
+        """End the poll plan() claimed, waking refreshes waiting for it"""
+        with self._lock:
+            in_flight, stats.in_flight = stats.in_flight, None
+        if in_flight is not None:
+            in_flight.set()
+
+    def wait_for(self, stats, timeout):
+        """Wait up to timeout for a claimed poll of the feed to finish"""
+        in_flight = stats.in_flight
+        if in_flight is not None:
+            in_flight.wait(max(0.0, timeout))
+
+    def _reschedule(self, stats):
+        if stats.last_polled is None:
+            stats.last_polled = time.time()
+        stats.next_due = stats.last_polled + stats.poll_interval()
+
+    def record_success(self, stats, latency, timestamps, articles):
+        with self._lock:
+            stats.record_success(latency, timestamps, articles)
+            self._reschedule(stats)
+
+    def record_failure(self, stats, latency):
+        with self._lock:
+            stats.record_failure(latency)
+            self._reschedule(stats)
+
+    def health(self):
+        """Per-feed statistics, best feed first"""
+        with self._lock:
+            feeds = sorted(self.stats.values(), key=FeedStats.priority)
+        return [stats.summary() for stats in feeds]
@@ -0,0 +1,132 @@
+import threading
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def record_coordinates(record):
+    """Extract (latitude, longitude) from a Swecha record, or None"""
+    location = record.get("location") if isinstance(record, dict) else None
+    if not location:
+        return None
+    try:
+        if isinstance(location, dict):
+            if "latitude" in location and "longitude" in location:
+                return float(location["latitude"]), float(location["longitude"])
+            # GeoJSON points are stored as [longitude, latitude]
+            if location.get("type") == "Point":
+                lon, lat = location["coordinates"][:2]
+                return float(lat), float(lon)
+    except (TypeError, ValueError, KeyError, IndexError):
+        return None
+    return None
+
+
+class RecordGeoIndex:
+    """
+    In-memory spatial index over Swecha records.
+    Points are kept in NumPy arrays sorted by latitude, so a query slices
+    the latitude band with a binary search and filters only that band.
+    New records are buffered and merged on the next query; a record that
+    moved makes the next query rebuild the arrays.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.lat = np.empty(0, dtype=np.float64)
+        self.lon = np.empty(0, dtype=np.float64)
+        self.order = np.empty(0, dtype=np.int64)  # positions into self.records
+        self.records = []
+        self.points = []  # (latitude, longitude) of each record
+        self.ids = {}
+        self._merged = 0  # records already in the sorted arrays
+        self._moved = False
+
+    def __len__(self):
+        return len(self.records)
+
+    def add(self, records):
+        """Add records not seen before, returning how many were new"""
+        added = 0
+        with self._lock:
+            for record in records:
+                coords = record_coordinates(record)
+                if coords is None:
+                    continue
+                key = record.get("id") or (coords, record.get("title"))
+                position = self.ids.get(key)
+                if position is not None:
+                    # Same record seen again, keep the fresher copy and location
+                    self.records[position] = record
+                    if self.points[position] != coords:
+                        self.points[position] = coords
+                        self._moved = True
+                    continue
+                self.ids[key] = len(self.records)
+                self.records.append(record)
+                self.points.append(coords)
+                added += 1
+        return added
+
+    def _merge_pending(self):
+        """Fold buffered points into the sorted arrays"""
+        if self._moved:
+            points = np.asarray(self.points, dtype=np.float64).reshape(-1, 2)
+            sort = np.argsort(points[:, 0], kind="stable")
+            self.lat, self.lon, self.order = points[sort, 0], points[sort, 1], sort
+            self._merged = len(self.points)
+            self._moved = False
+            return
+        if self._merged == len(self.points):
+            return
+        start = self._merged
+        new = np.asarray(self.points[start:], dtype=np.float64)
+        lat = np.concatenate([self.lat, new[:, 0]])
+        lon = np.concatenate([self.lon, new[:, 1]])
+        order = np.concatenate([self.order, np.arange(start, len(self.points))])
+
+        # Existing points are already sorted, mergesort keeps this close to linear
+        sort = np.argsort(lat, kind="mergesort")
+        self.lat, self.lon, self.order = lat[sort], lon[sort], order[sort]
+        self._merged = len(self.points)
+
+    def _band(self, min_lat, max_lat):
+        start = np.searchsorted(self.lat, min_lat, side="left")
+        end = np.searchsorted(self.lat, max_lat, side="right")
+        return start, end
+
+    def bbox(self, min_lat, min_lon, max_lat, max_lon):
+        """Records inside a bounding box"""
+        with self._lock:
+            self._merge_pending()
+            start, end = self._band(min_lat, max_lat)
+            lon = self.lon[start:end]
+            if min_lon <= max_lon:
+                mask = (lon >= min_lon) & (lon <= max_lon)
+            else:
+                # Box crosses the antimeridian
+                mask = (lon >= min_lon) | (lon <= max_lon)
+            return [self.records[i] for i in self.order[start:end][mask]]
+
+    def nearby(self, latitude, longitude, radius_km):
+        """Records within radius_km of a point, nearest first"""
+        with self._lock:
+            self._merge_pending()
+            delta_lat = np.degrees(radius_km / EARTH_RADIUS_KM)
+            start, end = self._band(latitude - delta_lat, latitude + delta_lat)
+            if start == end:
+                return []
+
+            lat = np.radians(self.lat[start:end])
+            lon = np.radians(self.lon[start:end])
+            lat0, lon0 = np.radians(latitude), np.radians(longitude)
+
+            # Haversine distance over the latitude band only
+            a = np.sin((lat - lat0) / 2) ** 2 + \
+                np.cos(lat0) * np.cos(lat) * np.sin((lon - lon0) / 2) ** 2
+            distance = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+            hits = np.nonzero(distance <= radius_km)[0]
+            hits = hits[np.argsort(distance[hits], kind="stable")]
+            order = self.order[start:end]
+            return [self.records[order[i]] for i in hits]
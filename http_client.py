@@ -0,0 +1,30 @@
+"""
+Pooled HTTP session for outbound requests.
+
+Hugging Face and the RSS feeds used to be called through requests.get and
+requests.post, which open a new connection, and a new TLS handshake, per
+call. One process-wide session keeps connections alive and bounds how
+many are held open per host.
+"""
+import threading
+from config import HTTP_POOL_HOSTS, HTTP_POOL_SIZE
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Shared requests session, created on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_SIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
@@ -0,0 +1,141 @@
+"""
+Lightweight character n-gram language identifier.
+
+Tells Telugu script, romanized Telugu and English apart. The trigram
+profiles are built once, on first use, from the small seed vocabularies
+below, so importing this module costs nothing and classifying a chat
+message is a few dictionary lookups per character.
+
+Trigrams alone make many English names and loanwords look Telugu
+(banana, India, Anaconda), so romanized Telugu must also beat English by
+a margin per trigram, and by a wide one unless a word of the text is in
+the romanized Telugu vocabulary.
+"""
+import math
+import re
+import threading
+
+TELUGU_SCRIPT = re.compile(r'[ఀ-౿]')
+LATIN_WORD = re.compile(r"[a-z']+")
+
+MIN_MARGIN = 0.5  # log-likelihood lead per trigram romanized Telugu needs over English
+UNKNOWN_WORDS_MARGIN = 1.5  # the lead needed when no word is in the Telugu vocabulary
+
+ROMANIZED_TELUGU_SEED = """
+namaskaram namaste baagunnara bagunnara bagunnava ela unnaru ela unnavu
+elaa unnaaru nenu baagunnanu bagunnanu meeru miru nuvvu memu manam vaallu
+atanu aame idi adi ikkada akkada ippudu appudu eppudu enduku emiti enti
+emi entha ekkada evaru ela cheppandi cheppu chepthanu cheyandi cheyyi
+chesanu chestunnanu chestanu vellu vellandi vastanu vachanu vastunnanu
+raavali randi ranu ledu undi unnadi unnayi kaadu avunu sare chala chaala
+konchem kuda kooda inka malli dhanyavadalu dhanyavaadaalu thanks andi
+sahayam sahaayam cheyagalara kavali kaavali kaadhu telugu matladandi
+matladu matladutunnanu artham kaledu arthamaindi baaga bagundi bagane
+pani emaindi emayyindi tinnara tinnava annam bhojanam intiki illu
+amma nanna anna akka tammudu chelli snehitudu abbayi ammayi pillalu
+ooru peru mee naa mana vaari sangati sangathi vishayam varthalu vaarthalu
+vaatavaranam varsham endalu chali roju ninna repu ee aa okka rendu
+moodu naalugu aidu enni entasepu samayam ganta nimishalu pedda chinna
+kottha paata manchi chedda santosham kopam badha prema istam ishtam
+ledhu unnaanu untaanu vellaali chudali chuddam choodandi vinandi
+"""
+
+ENGLISH_SEED = """
+hello hi hey how are you what is the weather today please help me with
+this thank you thanks good morning evening night can could would should
+will shall have has had do does did not no yes okay sure where when why
+who which there their they them this that these those it its about
+from into over under again news latest update tell show give make take
+know think want need like love time year people way day man woman child
+world life hand part place case week company system program question
+work government number point home water room mother area money story
+fact month lot right study book eye job word business issue side kind
+head house service friend father power hour game line end member law car
+city community name president team minute idea kid body information
+back parent face others level office door health person art war history
+party result change morning reason research girl guy moment air teacher
+force education language chat speak english translate meaning explain
+"""
+
+
+class LanguageIdentifier:
+    """Naive Bayes over character trigrams with add-one smoothing"""
+
+    labels = ("romanized_telugu", "english")
+
+    def __init__(self, seeds=None, n=3):
+        self.n = n
+        seeds = seeds or {
+            "romanized_telugu": ROMANIZED_TELUGU_SEED,
+            "english": ENGLISH_SEED,
+        }
+        self.telugu_words = set(LATIN_WORD.findall(seeds["romanized_telugu"].lower()))
+        counts = {label: {} for label in seeds}
+        for label, text in seeds.items():
+            for gram in self.ngrams(text):
+                counts[label][gram] = counts[label].get(gram, 0) + 1
+
+        vocabulary = set()
+        for table in counts.values():
+            vocabulary.update(table)
+        size = len(vocabulary) + 1
+
+        # Precompute log probabilities so classification is lookups and adds
+        self.log_probs = {}
+        self.unseen = {}
+        for label, table in counts.items():
+            total = sum(table.values()) + size
+            self.log_probs[label] = {
+                gram: math.log((count + 1) / total) for gram, count in table.items()
+            }
+            self.unseen[label] = math.log(1 / total)
+
+    def ngrams(self, text):
+        for word in LATIN_WORD.findall(text.lower()):
+            padded = f" {word} "
+            for i in range(len(padded) - self.n + 1):
+                yield padded[i:i + self.n]
+
+    def scores(self, text):
+        """Log likelihood of the Latin-script part of text under each label"""
+        totals = {label: 0.0 for label in self.log_probs}
+        for gram in self.ngrams(text):
+            for label, table in self.log_probs.items():
+                totals[label] += table.get(gram, self.unseen[label])
+        return totals
+
+    def classify(self, text):
+        """Return telugu, mixed, romanized_telugu, english or unknown"""
+        has_telugu = bool(TELUGU_SCRIPT.search(text))
+        has_latin = bool(LATIN_WORD.search(text.lower()))
+
+        if has_telugu:
+            return "mixed" if has_latin else "telugu"
+        if not has_latin:
+            return "unknown"
+
+        scores = self.scores(text)
+        grams = sum(1 for _ in self.ngrams(text))
+        margin = (scores["romanized_telugu"] - scores["english"]) / grams
+        known = any(word in self.telugu_words for word in LATIN_WORD.findall(text.lower()))
+        if margin > (MIN_MARGIN if known else UNKNOWN_WORDS_MARGIN):
+            return "romanized_telugu"
+        return "english"
+
+
+_identifier = None
+_identifier_lock = threading.Lock()
+
+
+def get_identifier():
+    """Shared identifier, built on first use"""
+    global _identifier
+    if _identifier is None:
+        with _identifier_lock:
+            if _identifier is None:
+                _identifier = LanguageIdentifier()
+    return _identifier
+
+
+def identify_language(text):
+    return get_identifier().classify(text)
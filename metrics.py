@@ -0,0 +1,279 @@
+"""
+Lightweight in-process metrics: counters, latency histograms and timing
+spans, exported in Prometheus text format over HTTP or to a file.
+"""
+import bisect
+import functools
+import http.server
+import inspect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from config import METRICS_HOST, METRICS_PORT, METRICS_FILE, METRICS_FILE_INTERVAL
+
+# Seconds; covers cache hits through slow TTS and model calls
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=None):
+    items = list(key) + (list(extra.items()) if extra else [])
+    if not items:
+        return ""
+    body = ",".join(f'{name}="{value}"' for name, value in items)
+    return "{" + body + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(_label_key(labels), 0)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    "counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0,
+                }
+            series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def quantile(self, q, **labels):
+        """Approximate quantile from bucket counts, by linear interpolation"""
+        with self._lock:
+            series = self._series.get(_label_key(labels))
+            if not series or not series["count"]:
+                return None
+            counts = list(series["counts"])
+            total = series["count"]
+
+        rank = q * total
+        seen = 0
+        lower = 0.0
+        for i, count in enumerate(counts):
+            upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+            if count and seen + count >= rank:
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+            lower = upper
+        return self.buckets[-1]
+
+    def summary(self):
+        """count, mean, p50 and p99 for every label set"""
+        with self._lock:
+            keys = list(self._series)
+        result = {}
+        for key in keys:
+            labels = dict(key)
+            series = self._series[key]
+            result[key] = {
+                "labels": labels,
+                "count": series["count"],
+                "mean": series["sum"] / series["count"] if series["count"] else 0.0,
+                "p50": self.quantile(0.5, **labels),
+                "p99": self.quantile(0.99, **labels),
+            }
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series["counts"]):
+                    cumulative += count
+                    lines.append(
+                        f"{self.name}_bucket{_format_labels(key, {'le': bound})} {cumulative}"
+                    )
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(key, {'le': '+Inf'})} {series['count']}"
+                )
+                lines.append(f"{self.name}_sum{_format_labels(key)} {series['sum']:.6f}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help_text, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, **kwargs)
+            return metric
+
+    def counter(self, name, help_text=""):
+        return self._get(Counter, name, help_text)
+
+    def histogram(self, name, help_text="", buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, help_text, buckets=buckets)
+
+    def reset(self):
+        """Clear every recorded value, keeping the metrics registered"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    def render(self):
+        """All metrics in Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+stage_seconds = registry.histogram(
+    "telugu_ai_stage_seconds", "Latency of each chat pipeline stage"
+)
+stage_calls = registry.counter(
+    "telugu_ai_stage_calls_total", "Calls to each chat pipeline stage"
+)
+stage_errors = registry.counter(
+    "telugu_ai_stage_errors_total", "Calls to each stage that raised"
+)
+
+
+@contextmanager
+def span(stage):
+    """Time a block of code as one observation of stage"""
+    start = time.perf_counter()
+    try:
+        yield
+    except GeneratorExit:
+        # A stream the consumer stopped reading early did not fail
+        raise
+    except BaseException:
+        stage_errors.inc(stage=stage)
+        raise
+    finally:
+        stage_seconds.observe(time.perf_counter() - start, stage=stage)
+        stage_calls.inc(stage=stage)
+
+
+def timed(stage):
+    """Decorator form of span; generator functions are timed until exhausted"""
+    def decorator(fn):
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def generator_wrapper(*args, **kwargs):
+                with span(stage):
+                    yield from fn(*args, **kwargs)
+            return generator_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def write_metrics_file(path=METRICS_FILE):
+    """Atomically write the current metrics to path"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(registry.render())
+    os.replace(temp_path, path)
+
+
+_exporter_started = False
+_exporter_lock = threading.Lock()
+
+
+def start_exporter(port=METRICS_PORT, path=METRICS_FILE, interval=METRICS_FILE_INTERVAL,
+                   host=METRICS_HOST):
+    """Start the configured HTTP endpoint and/or file writer once per process"""
+    global _exporter_started
+    with _exporter_lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+
+    if port:
+        try:
+            server = http.server.ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(
+                target=server.serve_forever, name="metrics-http", daemon=True
+            ).start()
+        except OSError as e:
+            # Another worker on this host already serves the port
+            print(f"Metrics endpoint not started on {host}:{port}: {e}")
+
+    if path:
+        def write_loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    write_metrics_file(path)
+                except OSError as e:
+                    print(f"Error writing metrics file: {e}")
+
+        threading.Thread(target=write_loop, name="metrics-file", daemon=True).start()
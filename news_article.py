@@ -0,0 +1,83 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from config import NEWS_UTC_OFFSET_MINUTES
+
+# Article times are stored in UTC and shown in the readers' time zone
+DISPLAY_TIMEZONE = timezone(timedelta(minutes=NEWS_UTC_OFFSET_MINUTES))
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+
+def article_id(link, title="", source=""):
+    """Stable id from the article's link, or its title and source when it has none"""
+    key = link if link and link != "#" else f"{source}\n{title}"
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def parse_date(date_string):
+    """Parse an RSS or ISO date string to an aware UTC datetime, or None"""
+    if not date_string:
+        return None
+    try:
+        # RFC 822, what almost every feed uses
+        parsed = parsedate_to_datetime(date_string)
+    except (TypeError, ValueError, IndexError):
+        try:
+            from dateutil import parser
+            parsed = parser.parse(date_string)
+        except (ValueError, OverflowError):
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=DISPLAY_TIMEZONE)
+    return parsed.astimezone(timezone.utc)
+
+
+def entry_date(entry):
+    """Publication time of a feedparser entry, preferring its pre-parsed fields"""
+    parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+    if parsed:
+        return datetime(*parsed[:6], tzinfo=timezone.utc)
+    return parse_date(entry.get("published") or entry.get("updated"))
+
+
+class Article:
+    """A news article with a stable id and its publication time parsed once"""
+
+    __slots__ = ("id", "title", "summary", "source", "published", "published_text", "link", "category")
+
+    def __init__(self, title, summary, source, published=None, link="#", id=None, category="general"):
+        self.title = title
+        self.summary = summary
+        self.source = source
+        self.published = published or datetime.now(timezone.utc)
+        self.published_text = self.published.astimezone(DISPLAY_TIMEZONE).strftime(DATE_FORMAT)
+        self.link = link
+        self.id = id or article_id(link, title, source)
+        self.category = category
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "title": self.title,
+            "summary": self.summary,
+            "source": self.source,
+            "published": self.published_text,
+            "timestamp": self.published.timestamp(),
+            "link": self.link,
+            "category": self.category,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            title=data["title"],
+            summary=data["summary"],
+            source=data["source"],
+            published=datetime.fromtimestamp(data["timestamp"], timezone.utc),
+            link=data["link"],
+            id=data["id"],
+            category=data["category"],
+        )
+
+    def __repr__(self):
+        return f"Article({self.id}, {self.title[:40]!r}, {self.source!r})"
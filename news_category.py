@@ -0,0 +1,127 @@
+"""
+Topic categories for news articles.
+
+Each category has Telugu word stems, matched at word starts so inflected
+forms count (వర్ష matches వర్షాలకు), and whole words for keywords too
+short to be safe as prefixes (ధర would match ధరణి, నేర would match
+నేరుగా), with their common inflections listed. A few English keywords
+cover mixed-script copy. Text is cleaned like the search index but not
+folded: vowel length tells ఎంపీ (MP) from ఎంపిక (selection). An article
+is classified once, when it is fetched: every keyword hit votes for its
+category, title hits count double, and the category with the most votes
+wins. Articles with no hits are "general".
+"""
+import re
+from news_index import clean
+
+GENERAL = "general"
+
+# Category: (label shown in the app, prefix stems, whole words)
+CATEGORIES = {
+    "politics": ("రాజకీయాలు", [
+        "రాజకీయ", "ప్రభుత్వ", "ముఖ్యమంత్రి", "మంత్రి", "అసెంబ్లీ", "ఎన్నిక", "పార్టీ",
+        "బిల్లు", "ఎమ్మెల్యే", "కాంగ్రెస్", "బీజేపీ", "బీఆర్ఎస్", "గవర్నర్",
+        "politic", "election", "minister", "assembly",
+    ], [
+        "ఎంపీ", "ఎంపీలు", "ఎంపీల", "ఎంపీగా",
+    ]),
+    "weather": ("వాతావరణం", [
+        "వాతావరణ", "వర్ష", "ఉష్ణోగ్రత", "తుఫాను", "చలిగాలు", "అల్పపీడన", "వరద",
+        "weather", "cyclone", "monsoon",
+    ], [
+        "వాన", "వానలు", "వానల", "ఎండ", "ఎండలు", "ఎండల", "ఎండలో", "చలి", "చలికి", "చలిలో",
+        "rain", "rains", "rainfall",
+    ]),
+    "tech": ("సాంకేతికం", [
+        "ఐటీ", "సాఫ్ట్‌వేర్", "టెక్నాలజీ", "సాంకేతిక", "కంప్యూటర్", "ఇంటర్నెట్",
+        "స్మార్ట్‌ఫోన్", "స్టార్టప్", "కృత్రిమ మేధ",
+        "software", "startup", "technolog", "internet",
+    ], [
+        "ఐటి", "టెక్",
+    ]),
+    "education": ("విద్య", [
+        "విద్య", "పాఠశాల", "కళాశాల", "విశ్వవిద్యాలయ", "విద్యార్థ", "పరీక్ష", "ఉపాధ్యాయ",
+        "టీచర్", "అడ్మిషన్",
+        "school", "examination", "universit", "student",
+    ], [
+        "exam", "exams",
+    ]),
+    "metro": ("నగరం", [
+        "మెట్రో", "ట్రాఫిక్", "రైలు", "ఆర్టీసీ", "బస్సు", "జీహెచ్ఎంసీ", "ఫ్లైఓవర్", "రోడ్డు",
+        "metro", "traffic", "ghmc",
+    ], []),
+    "business": ("వ్యాపారం", [
+        "వ్యాపార", "మార్కెట్", "స్టాక్", "సెన్సెక్స్", "నిఫ్టీ", "బంగారం", "పెట్టుబడి",
+        "బ్యాంక్", "కంపెనీ", "ధరల",
+        "business", "market", "sensex", "invest",
+    ], [
+        "ధర", "ధరలు",
+    ]),
+    "sports": ("క్రీడలు", [
+        "క్రికెట్", "క్రీడ", "మ్యాచ్", "టోర్నమెంట్", "ఒలింపిక్", "ఫుట్‌బాల్", "ఐపీఎల్",
+        "cricket", "football", "olympic",
+    ], [
+        "ipl",
+    ]),
+    "cinema": ("సినిమా", [
+        "సినిమా", "చిత్రం", "హీరో", "దర్శకు", "బాక్సాఫీస్", "టాలీవుడ్", "ట్రైలర్",
+        "movie", "film", "tollywood",
+    ], []),
+    "crime": ("నేరాలు", [
+        "పోలీసు", "అరెస్ట్", "హత్య", "దొంగ", "నేరా", "నేరస్థ", "ప్రమాద",
+        "police", "arrest", "murder",
+    ], [
+        "నేరం", "నేరంలో",
+    ]),
+    "health": ("ఆరోగ్యం", [
+        "ఆరోగ్య", "ఆసుపత్రి", "వైద్య", "డాక్టర్", "వ్యాధి", "జ్వరం", "వ్యాక్సిన్",
+        "hospital", "health", "vaccine",
+    ], []),
+}
+
+TITLE_VOTES = 2  # a keyword in the title counts this many times
+# Telugu vowel signs and viramas are not \w, so the whole block is listed
+WORD_CHAR = r"[\wఀ-౿]"
+
+
+def category_label(category):
+    if category == GENERAL:
+        return "సాధారణం"
+    return CATEGORIES[category][0]
+
+
+class CategoryClassifier:
+    """Keyword classifier compiled to a single regular expression"""
+
+    def __init__(self, categories=CATEGORIES):
+        self.categories = list(categories)
+        self.keywords = {}
+        patterns = {}
+        for category, (_, stems, words) in categories.items():
+            for stem in stems:
+                stem = clean(stem)
+                self.keywords.setdefault(stem, category)
+                patterns.setdefault(stem, re.escape(stem))
+            for word in words:
+                word = clean(word)
+                self.keywords.setdefault(word, category)
+                patterns.setdefault(word, re.escape(word) + rf"(?!{WORD_CHAR})")
+        # Longest keywords first so the most specific one wins at each position
+        alternation = "|".join(
+            patterns[keyword] for keyword in sorted(patterns, key=len, reverse=True)
+        )
+        self.pattern = re.compile(rf"(?<!{WORD_CHAR})(?:{alternation})")
+
+    def votes(self, title, text=""):
+        counts = dict.fromkeys(self.categories, 0)
+        for weight, part in ((TITLE_VOTES, title), (1, text)):
+            for match in self.pattern.finditer(clean(part)):
+                counts[self.keywords[match.group()]] += weight
+        return counts
+
+    def classify(self, title, text=""):
+        """Category of an article from its title and description"""
+        counts = self.votes(title, text)
+        # Ties go to the category listed first
+        best = max(self.categories, key=lambda category: counts[category])
+        return best if counts[best] else GENERAL
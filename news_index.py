@@ -0,0 +1,176 @@
+"""
+Full-text search over ingested news articles.
+
+Articles are indexed once, when a refresh fetches them, into an SQLite
+FTS5 table next to a plain table holding the article itself. Text is
+normalized before it reaches FTS5, for documents and queries alike: NFC,
+zero-width joiners dropped, lowercased and folded the same way chat
+keywords are, so spelling variants of vowel length, retroflexes and the
+anusvara find each other. Romanized queries also match their Telugu
+transliteration. Results are ranked by BM25 with titles weighted above
+summaries.
+"""
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from datetime import datetime, timezone
+from config import NEWS_INDEX_PATH, NEWS_SEARCH_LIMIT
+from news_article import Article
+from summarizer import tokenize
+from transliteration import fold_for_matching, transliterate
+
+# Zero-width (non-)joiners change rendering, not the word
+ZERO_WIDTH = dict.fromkeys(map(ord, "‌‍﻿"))
+LATIN = re.compile(r"[A-Za-z]")
+
+TITLE_WEIGHT = 2.0  # BM25 weight of the title column; summaries weigh 1.0
+ARTICLE_COLUMNS = "a.id, a.title, a.summary, a.source, a.published, a.link, a.category"
+
+
+def clean(text):
+    """NFC, zero-width joiners dropped and lowercased, spelling kept as is"""
+    return unicodedata.normalize("NFC", text or "").translate(ZERO_WIDTH).lower()
+
+
+def normalize(text):
+    """Normalize Telugu text for indexing and queries"""
+    return fold_for_matching(clean(text))
+
+
+def index_terms(text):
+    return " ".join(tokenize(normalize(text)))
+
+
+def build_query(text):
+    """FTS5 query for free text: every word must match, as a prefix"""
+    groups = []
+    for word in tokenize(text):
+        variants = {normalize(word)}
+        if LATIN.search(word):
+            variants.update(tokenize(normalize(transliterate(word))))
+        groups.append("(" + " OR ".join(f'"{variant}"*' for variant in sorted(variants)) + ")")
+    return " AND ".join(groups)
+
+
+def _article(row):
+    article_id, title, summary, source, published, link, category = row
+    return Article(
+        title=title,
+        summary=summary,
+        source=source,
+        published=datetime.fromtimestamp(published, timezone.utc),
+        link=link,
+        id=article_id,
+        category=category,
+    )
+
+
+class NewsIndex:
+    """On-disk inverted index of news articles backed by SQLite FTS5"""
+
+    def __init__(self, path=NEWS_INDEX_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS articles (
+                rowid INTEGER PRIMARY KEY,
+                id TEXT NOT NULL UNIQUE,
+                title TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                source TEXT NOT NULL,
+                published REAL NOT NULL,
+                link TEXT NOT NULL,
+                category TEXT NOT NULL DEFAULT 'general'
+            )
+            """
+        )
+        # Indexes created before categories existed gain the column; their
+        # articles stay "general"
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(articles)")}
+        if "category" not in columns:
+            self._conn.execute(
+                "ALTER TABLE articles ADD COLUMN category TEXT NOT NULL DEFAULT 'general'"
+            )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS articles_category ON articles (category, published)"
+        )
+        # Holds only the normalized terms; the article is read from articles.
+        # unicode61 splits words at vowel signs and viramas unless marks (M*)
+        # count as token characters.
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+            "title, summary, "
+            "tokenize = \"unicode61 remove_diacritics 0 categories 'L* N* Co M*'\")"
+        )
+
+    def add(self, articles):
+        """Index articles not seen before; returns how many were added"""
+        if not articles:
+            return 0
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                added = 0
+                for article in articles:
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO articles "
+                        "(id, title, summary, source, published, link, category) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (article.id, article.title, article.summary, article.source,
+                         article.published.timestamp(), article.link, article.category),
+                    )
+                    if cursor.rowcount:
+                        self._conn.execute(
+                            "INSERT INTO articles_fts (rowid, title, summary) VALUES (?, ?, ?)",
+                            (cursor.lastrowid, index_terms(article.title), index_terms(article.summary)),
+                        )
+                        added += 1
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def search(self, text, limit=NEWS_SEARCH_LIMIT):
+        """Articles matching every word of text, best match first"""
+        query = build_query(text)
+        if not query:
+            return []
+        with self._lock:
+            # Ranked inside FTS5 first, so only the top rows are joined
+            rows = self._conn.execute(
+                f"SELECT {ARTICLE_COLUMNS} FROM ("
+                f"SELECT rowid, bm25(articles_fts, {TITLE_WEIGHT}, 1.0) AS score "
+                "FROM articles_fts WHERE articles_fts MATCH ? ORDER BY score LIMIT ?"
+                ") AS hits JOIN articles a ON a.rowid = hits.rowid "
+                "ORDER BY hits.score, a.published DESC",
+                (query, limit),
+            ).fetchall()
+        return [_article(row) for row in rows]
+
+    def latest(self, category, limit=NEWS_SEARCH_LIMIT):
+        """Newest articles of one category"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {ARTICLE_COLUMNS} FROM articles a WHERE a.category = ? "
+                "ORDER BY a.published DESC LIMIT ?",
+                (category, limit),
+            ).fetchall()
+        return [_article(row) for row in rows]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
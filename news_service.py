@@ -1,10 +1,20 @@
-import feedparser
-import requests
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import streamlit as st
 import json
 import re
-from bs4 import BeautifulSoup
+import sqlite3
+import time
+from urllib.parse import urlsplit
+from config import REQUEST_TIMEOUT, NEWS_REFRESH_DEADLINE
+from feed_scheduler import FeedScheduler
+from http_client import get_session
+from news_category import CategoryClassifier
+from news_index import NewsIndex
+from news_article import Article, DATE_FORMAT, DISPLAY_TIMEZONE, entry_date, parse_date
+from metrics import timed
+from resilience import CircuitOpenError, DeadlineExceeded, deadline, get_breaker, remaining, timeout_for
+from shared_cache import cache_requests, get_shared_cache
+from summarizer import Summarizer
 
 class NewsService:
     def __init__(self):
@@ -27,54 +37,72 @@ class NewsService:
             }
         ]
         
+        # Per-feed health statistics and adaptive poll intervals
+        self.scheduler = FeedScheduler()
+        
+        # Articles fetched by any worker process, so each feed is fetched once per interval
+        self.cache = get_shared_cache()
+        
+        # Topic of each article, decided once when it is fetched
+        self.classifier = CategoryClassifier()
+        
+        # Extractive summaries, computed for all new articles of a refresh at once
+        self.summarizer = Summarizer()
+        
+        # Search index over every article fetched so far
+        try:
+            self.index = NewsIndex()
+        except sqlite3.Error as e:
+            print(f"News search index unavailable: {e}")
+            self.index = None
+        
         # Backup news in case RSS fails
+        now = datetime.now(timezone.utc)
         self.backup_news = [
-            {
-                'id': 1,
-                'title': 'తెలంగాణ రాష్ట్ర వార్తలు - రాజకీయ పరిణామాలు',
-                'summary': 'తెలంగాణ రాష్ట్రంలో నేటి రాజకీయ పరిణామాలు మరియు ప్రభుత్వ విధానాల గురించిన తాజా సమాచారం. ముఖ్యమంత్రి కేసీఆర్ ఇవాళ ముఖ్యమైన ప్రకటనలు చేశారు.',
-                'source': 'తెలుగు న్యూస్',
-                'published': datetime.now().strftime("%Y-%m-%d %H:%M"),
-                'link': 'https://example.com/news1'
-            },
-            {
-                'id': 2,
-                'title': 'హైదరాబాద్ మెట్రో రైలు సేవలు - కొత్త మార్గాలు',
-                'summary': 'హైదరాబాద్ మెట్రో రైలు కొత్త మార్గాలు ప్రారంభం. ప్రజలకు మరింత సౌకర్యవంతమైన ప్రయాణం కలుగుతుంది. టికెట్ ధరలు మరియు సమయ పట్టిక వివరాలు.',
-                'source': 'మెట్రో న్యూస్',
-                'published': (datetime.now() - timedelta(hours=2)).strftime("%Y-%m-%d %H:%M"),
-                'link': 'https://example.com/news2'
-            },
-            {
-                'id': 3,
-                'title': 'వాతావరణ సమాచారం - వర్షాలకు అవకాశం',
-                'summary': 'తెలంగాణ రాష్ట్రంలో రాబోయే రెండు రోజుల పాటు వర్షాలకు అవకాశం ఉందని వాతావరణ శాఖ తెలిపింది. రైతులు అవసరమైన జాగ్రత్తలు తీసుకోవాలని సూచించారు.',
-                'source': 'వాతావరణ విభాగం',
-                'published': (datetime.now() - timedelta(hours=1)).strftime("%Y-%m-%d %H:%M"),
-                'link': 'https://example.com/news3'
-            },
-            {
-                'id': 4,
-                'title': 'ఐటి సెక్టార్ వృద్ధి - కొత్త ఉద్యోగావకాశాలు',
-                'summary': 'హైదరాబాద్‌లో ఐటి సంస్థలు విస్తరణ. కొత్త ఉద్యోగావకాశాలు సృష్టి అవుతున్నాయి. సైబరాబాద్‌లో కొత్త కంపెనీలు స్థాపన.',
-                'source': 'టెక్ న్యూస్',
-                'published': (datetime.now() - timedelta(hours=3)).strftime("%Y-%m-%d %H:%M"),
-                'link': 'https://example.com/news4'
-            },
-            {
-                'id': 5,
-                'title': 'విద్యా రంగంలో కొత్త పథకాలు',
-                'summary': 'తెలంగాణ ప్రభుత్వం విద్యా రంగంలో కొత్త పథకాలు ప్రవేశపెట్టనుంది. ఉచిత విద్య మరియు కొత్త పాఠశాలల నిర్మాణం గురించిన వివరాలు.',
-                'source': 'విద్యా శాఖ',
-                'published': (datetime.now() - timedelta(hours=4)).strftime("%Y-%m-%d %H:%M"),
-                'link': 'https://example.com/news5'
-            }
+            Article(
+                title='తెలంగాణ రాష్ట్ర వార్తలు - రాజకీయ పరిణామాలు',
+                summary='తెలంగాణ రాష్ట్రంలో నేటి రాజకీయ పరిణామాలు మరియు ప్రభుత్వ విధానాల గురించిన తాజా సమాచారం. ముఖ్యమంత్రి కేసీఆర్ ఇవాళ ముఖ్యమైన ప్రకటనలు చేశారు.',
+                source='తెలుగు న్యూస్',
+                published=now,
+                link='https://example.com/news1',
+            ),
+            Article(
+                title='హైదరాబాద్ మెట్రో రైలు సేవలు - కొత్త మార్గాలు',
+                summary='హైదరాబాద్ మెట్రో రైలు కొత్త మార్గాలు ప్రారంభం. ప్రజలకు మరింత సౌకర్యవంతమైన ప్రయాణం కలుగుతుంది. టికెట్ ధరలు మరియు సమయ పట్టిక వివరాలు.',
+                source='మెట్రో న్యూస్',
+                published=now - timedelta(hours=2),
+                link='https://example.com/news2',
+            ),
+            Article(
+                title='వాతావరణ సమాచారం - వర్షాలకు అవకాశం',
+                summary='తెలంగాణ రాష్ట్రంలో రాబోయే రెండు రోజుల పాటు వర్షాలకు అవకాశం ఉందని వాతావరణ శాఖ తెలిపింది. రైతులు అవసరమైన జాగ్రత్తలు తీసుకోవాలని సూచించారు.',
+                source='వాతావరణ విభాగం',
+                published=now - timedelta(hours=1),
+                link='https://example.com/news3',
+            ),
+            Article(
+                title='ఐటి సెక్టార్ వృద్ధి - కొత్త ఉద్యోగావకాశాలు',
+                summary='హైదరాబాద్‌లో ఐటి సంస్థలు విస్తరణ. కొత్త ఉద్యోగావకాశాలు సృష్టి అవుతున్నాయి. సైబరాబాద్‌లో కొత్త కంపెనీలు స్థాపన.',
+                source='టెక్ న్యూస్',
+                published=now - timedelta(hours=3),
+                link='https://example.com/news4',
+            ),
+            Article(
+                title='విద్యా రంగంలో కొత్త పథకాలు',
+                summary='తెలంగాణ ప్రభుత్వం విద్యా రంగంలో కొత్త పథకాలు ప్రవేశపెట్టనుంది. ఉచిత విద్య మరియు కొత్త పాఠశాలల నిర్మాణం గురించిన వివరాలు.',
+                source='విద్యా శాఖ',
+                published=now - timedelta(hours=4),
+                link='https://example.com/news5',
+            ),
         ]
+        for article in self.backup_news:
+            article.category = self.classifier.classify(article.title, article.summary)
     
     def clean_html(self, text):
         """Remove HTML tags from text"""
         if not text:
             return ""
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup(text, 'html.parser')
         return soup.get_text().strip()
     
@@ -82,43 +110,48 @@ class NewsService:
         """Create a concise Telugu summary"""
         if not description:
             return f"{title[:100]}... గురించిన వివరాలు."
-        
-        # Clean HTML
-        clean_desc = self.clean_html(description)
-        
-        # Take first 2 sentences or 150 characters
-        sentences = clean_desc.split('.')
-        if len(sentences) > 1:
-            summary = '. '.join(sentences[:2]) + '.'
-        else:
-            summary = clean_desc
-        
-        # Limit length
-        if len(summary) > 200:
-            summary = summary[:200] + "..."
-        
+        summary = self.summarizer.summarize([(title, self.clean_html(description))])[0]
+        return self._with_context(summary, title)
+    
+    def _with_context(self, summary, title):
         # If summary is too short, add context
         if len(summary) < 50:
             summary = f"{title[:50]}... గురించిన వివరాలు మరియు తాజా సమాచారం."
-        
         return summary
     
+    @timed("news.summarize")
+    def summarize_articles(self, articles):
+        """
+        Replace the cleaned descriptions of freshly fetched articles with
+        summaries, scoring the whole batch together
+        """
+        if not articles:
+            return articles
+        summaries = self.summarizer.summarize([(article.title, article.summary) for article in articles])
+        for article, summary in zip(articles, summaries):
+            if not article.summary:
+                article.summary = f"{article.title[:100]}... గురించిన వివరాలు."
+            else:
+                article.summary = self._with_context(summary, article.title)
+        return articles
+    
     def format_date(self, date_string):
-        """Format date string"""
-        try:
-            if not date_string:
-                return datetime.now().strftime("%Y-%m-%d %H:%M")
-            
-            # Try parsing different formats
-            from dateutil import parser
-            parsed_date = parser.parse(date_string)
-            return parsed_date.strftime("%Y-%m-%d %H:%M")
-        except:
-            return datetime.now().strftime("%Y-%m-%d %H:%M")
+        """Format a date string for display, or the current time if it cannot be parsed"""
+        parsed_date = parse_date(date_string) or datetime.now(timezone.utc)
+        return parsed_date.astimezone(DISPLAY_TIMEZONE).strftime(DATE_FORMAT)
     
-    def fetch_rss_feed(self, feed_config, max_articles=3):
-        """Fetch articles from a single RSS feed"""
+    @timed("news.fetch_rss_feed")
+    def fetch_rss_feed(self, feed_config, max_articles=3, summarize=True):
+        """
+        Fetch articles from a single RSS feed. With summarize=False the
+        articles carry their cleaned description until summarize_articles runs.
+        """
+        import feedparser
+        import requests
+        
         articles = []
+        stats = self.scheduler.stats_for(feed_config)
+        start = time.monotonic()
         
         try:
             # Add user agent to avoid blocking
@@ -126,11 +159,17 @@ class NewsService:
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
             
-            # Fetch with timeout
-            response = requests.get(feed_config["url"], headers=headers, timeout=10)
+            # Fetch with timeout, skipping hosts that keep failing
+            breaker = get_breaker(f"rss:{urlsplit(feed_config['url']).netloc}")
+            with breaker.guard():
+                response = get_session().get(feed_config["url"], headers=headers,
+                                             timeout=timeout_for(REQUEST_TIMEOUT))
+                if response.status_code >= 500:
+                    response.raise_for_status()
             
             if response.status_code != 200:
                 print(f"HTTP {response.status_code} for {feed_config['name']}")
+                self.scheduler.record_failure(stats, time.monotonic() - start)
                 return articles
             
             # Parse feed
@@ -138,30 +177,45 @@ class NewsService:
             
             if not feed.entries:
                 print(f"No entries found in {feed_config['name']}")
+                self.scheduler.record_success(stats, time.monotonic() - start, [], articles)
                 return articles
             
+            # Dates are parsed once, for the articles and the feed statistics
+            dates = [entry_date(entry) for entry in feed.entries]
+            
             # Process entries
-            for entry in feed.entries[:max_articles]:
+            for entry, published in zip(feed.entries[:max_articles], dates):
                 try:
-                    article = {
-                        'id': hash(entry.link) if hasattr(entry, 'link') else hash(str(entry)),
-                        'title': self.clean_html(entry.title) if hasattr(entry, 'title') else 'శీర్షిక అందుబాటులో లేదు',
-                        'summary': self.create_summary(
-                            entry.description if hasattr(entry, 'description') else '',
-                            entry.title if hasattr(entry, 'title') else ''
-                        ),
-                        'source': feed_config["name"],
-                        'published': self.format_date(entry.published if hasattr(entry, 'published') else ''),
-                        'link': entry.link if hasattr(entry, 'link') else '#'
-                    }
-                    articles.append(article)
+                    title = self.clean_html(entry.get('title', '')) or 'శీర్షిక అందుబాటులో లేదు'
+                    description = self.clean_html(entry.get('description', ''))
+                    articles.append(Article(
+                        title=title,
+                        summary=description,
+                        source=feed_config["name"],
+                        published=published,
+                        link=entry.get('link', '#'),
+                        category=self.classifier.classify(title, description),
+                    ))
                 except Exception as e:
                     print(f"Error processing entry from {feed_config['name']}: {e}")
                     continue
             
+            if summarize:
+                self.summarize_articles(articles)
             print(f"Successfully fetched {len(articles)} articles from {feed_config['name']}")
+            self.scheduler.record_success(
+                stats, time.monotonic() - start,
+                [date.timestamp() for date in dates if date is not None], articles,
+            )
             return articles
             
+        except CircuitOpenError as e:
+            # Not polled, so the feed statistics are left as they were
+            print(f"Skipping {feed_config['name']}: {e}")
+            return articles
+        except DeadlineExceeded:
+            print(f"No time left to fetch {feed_config['name']}")
+            return articles
         except requests.exceptions.Timeout:
             print(f"Timeout fetching {feed_config['name']}")
         except requests.exceptions.ConnectionError:
@@ -169,25 +223,97 @@ class NewsService:
         except Exception as e:
             print(f"Error fetching {feed_config['name']}: {e}")
         
+        self.scheduler.record_failure(stats, time.monotonic() - start)
         return articles
     
-    def get_telugu_news(self):
-        """Fetch Telugu news from multiple sources"""
+    @timed("news.get_telugu_news")
+    def get_telugu_news(self, force=False):
+        """Fetch Telugu news from multiple sources, polling only the feeds that are due"""
         all_articles = []
+        fetched = []
+        received = []
+        leased = {}  # shared cache key -> (stats, articles, lease token) of feeds this worker fetches
+        waiting = []
         successful_feeds = 0
         
-        # Try to fetch from each RSS feed
-        for feed_config in self.rss_feeds:
+        due, idle = self.scheduler.plan(self.rss_feeds, force=force)
+        
+        # Feeds that are not due yet contribute their last fetched articles
+        polling = []  # claimed by a concurrent refresh that has not finished yet
+        for feed_config, stats in idle:
+            if stats.articles:
+                all_articles.extend(stats.articles)
+                successful_feeds += 1
+            elif stats.in_flight is not None:
+                polling.append((feed_config, stats))
+        
+        with deadline(NEWS_REFRESH_DEADLINE):
             try:
-                articles = self.fetch_rss_feed(feed_config)
-                if articles:
-                    all_articles.extend(articles)
+                # Fetch the due feeds best first, all within one refresh budget
+                for feed_config, stats in due:
+                    key = self._feed_key(feed_config)
+                    # A forced refresh skips articles other workers fetched earlier
+                    articles = None if force else self._shared_articles(self.cache.get(key))
+                    if articles is not None:
+                        # Another worker fetched this feed within its poll interval
+                        cache_requests.inc(cache="news", result="hit")
+                        stats.articles = articles
+                        received.extend(articles)
+                        print(f"✓ Shared articles for {feed_config['name']}: {len(articles)} articles")
+                    else:
+                        token = self.cache.lease(key, NEWS_REFRESH_DEADLINE)
+                        if not token:
+                            # Another worker is fetching it right now, collected below
+                            waiting.append((feed_config, stats, key))
+                            continue
+                        cache_requests.inc(cache="news", result="miss")
+                        leased[key] = (stats, [], token)
+                        try:
+                            articles = self.fetch_rss_feed(feed_config, summarize=False)
+                        except Exception as e:
+                            print(f"✗ Failed to fetch from {feed_config['name']}: {e}")
+                            articles = []
+                        if articles:
+                            fetched.extend(articles)
+                            leased[key] = (stats, articles, token)
+                            print(f"✓ Fetched from {feed_config['name']}: {len(articles)} articles")
+                    successful_feeds += self._add_feed_articles(feed_config, stats, articles, all_articles)
+                
+                # One summarizer pass for everything new in this refresh
+                self.summarize_articles(fetched)
+                
+                # Shared until the feed is due again
+                for key, (stats, articles, _) in leased.items():
+                    if articles:
+                        self.cache.set_json(
+                            key, [article.to_dict() for article in articles], stats.poll_interval()
+                        )
+            finally:
+                for key, (_, _, token) in leased.items():
+                    self.cache.release(key, token)
+                # Wake the sessions waiting on these polls; the rest finish below
+                waiting_stats = [stats for _, stats, _ in waiting]
+                for feed_config, stats in due:
+                    if stats not in waiting_stats:
+                        self.scheduler.finish(stats)
+            
+            for feed_config, stats, key in waiting:
+                articles = self._shared_articles(self.cache.wait(key, remaining()))
+                if articles is not None:
+                    cache_requests.inc(cache="news", result="shared")
+                    stats.articles = articles
+                    received.extend(articles)
+                self.scheduler.finish(stats)
+                successful_feeds += self._add_feed_articles(feed_config, stats, articles, all_articles)
+            
+            # Another session's first poll of these is still running; wait for its articles
+            for feed_config, stats in polling:
+                self.scheduler.wait_for(stats, remaining())
+                if stats.articles:
+                    all_articles.extend(stats.articles)
                     successful_feeds += 1
-                    print(f"✓ Fetched from {feed_config['name']}: {len(articles)} articles")
-                else:
-                    print(f"✗ No articles from {feed_config['name']}")
-            except Exception as e:
-                print(f"✗ Failed to fetch from {feed_config['name']}: {e}")
+        
+        self.index_articles(fetched + received)
         
         # If we got some articles, use them
         if all_articles:
@@ -195,14 +321,7 @@ class NewsService:
             unique_articles = self.remove_duplicate_articles(all_articles)
             
             # Sort by published date
-            try:
-                unique_articles.sort(
-                    key=lambda x: datetime.strptime(x['published'], "%Y-%m-%d %H:%M"), 
-                    reverse=True
-                )
-            except:
-                # If sorting fails, just return as is
-                pass
+            unique_articles.sort(key=lambda article: article.published, reverse=True)
             
             print(f"📰 Total unique articles fetched: {len(unique_articles)}")
             return unique_articles[:10]  # Return top 10
@@ -211,13 +330,66 @@ class NewsService:
         print("📰 Using backup news articles")
         return self.backup_news
     
+    def _add_feed_articles(self, feed_config, stats, articles, all_articles):
+        """Add one due feed's articles to the refresh; 1 if it contributed any"""
+        if articles:
+            all_articles.extend(articles)
+            return 1
+        if stats.articles:
+            # Keep showing the last good articles of a failing feed
+            all_articles.extend(stats.articles)
+            print(f"✗ No new articles from {feed_config['name']}, using previous ones")
+            return 1
+        print(f"✗ No articles from {feed_config['name']}")
+        return 0
+    
+    def _feed_key(self, feed_config):
+        return f"news:feed:{feed_config['url']}"
+    
+    def _shared_articles(self, value):
+        """Articles another worker stored in the shared cache, or None"""
+        if value is None:
+            return None
+        try:
+            return [Article.from_dict(data) for data in json.loads(value)]
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Ignoring unreadable shared news entry: {e}")
+            return None
+    
+    @timed("news.index")
+    def index_articles(self, articles):
+        """Add newly fetched articles to the search index"""
+        if self.index is None or not articles:
+            return
+        try:
+            self.index.add(articles)
+        except sqlite3.Error as e:
+            print(f"Error indexing articles: {e}")
+    
+    @timed("news.search")
+    def search_news(self, query, limit=None):
+        """Articles fetched so far that match the query, best match first"""
+        if self.index is None or not query or not query.strip():
+            return []
+        try:
+            if limit is None:
+                return self.index.search(query)
+            return self.index.search(query, limit=limit)
+        except sqlite3.Error as e:
+            print(f"Error searching news: {e}")
+            return []
+    
+    def feed_health(self):
+        """Per-feed statistics for display, best feed first"""
+        return self.scheduler.health()
+    
     def remove_duplicate_articles(self, articles):
         """Remove duplicate articles based on title similarity"""
         unique_articles = []
         seen_titles = set()
         
         for article in articles:
-            title_key = article['title'].lower().strip()[:50]  # First 50 chars
+            title_key = article.title.lower().strip()[:50]  # First 50 chars
             
             if title_key not in seen_titles:
                 seen_titles.add(title_key)
@@ -226,6 +398,14 @@ class NewsService:
         return unique_articles
     
     def get_news_by_category(self, category="all"):
-        """Get news by specific category (future enhancement)"""
-        # This can be enhanced to filter news by category
-        return self.get_telugu_news()
\ No newline at end of file
+        """Newest articles of one category, read from the search index without refetching"""
+        if category == "all":
+            return self.get_telugu_news()
+        if self.index is not None:
+            try:
+                # Empty until a refresh brings articles of this category
+                return self.index.latest(category)
+            except sqlite3.Error as e:
+                print(f"Error reading {category} news: {e}")
+        # Without a usable index, filter what a refresh would show
+        return [article for article in self.get_telugu_news() if article.category == category]
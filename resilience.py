@@ -0,0 +1,189 @@
+"""
+Circuit breakers and deadline budgets for outbound calls.
+
+Every external dependency gets one process-wide breaker. After enough
+consecutive failures it opens and calls fail immediately with
+CircuitOpenError, then after a cool-down a single probe is let through
+(half-open) to decide whether to close it again.
+
+A deadline bounds the total time one user request may spend on outbound
+calls. Each call asks timeout_for() for its timeout, which is its own cap
+shortened to whatever is left of the enclosing deadline.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from config import BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT
+from metrics import registry
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+breaker_transitions = registry.counter(
+    "telugu_ai_breaker_transitions_total", "Circuit breaker state changes per dependency"
+)
+breaker_rejections = registry.counter(
+    "telugu_ai_breaker_rejections_total", "Calls skipped because a breaker was open"
+)
+deadline_exceeded = registry.counter(
+    "telugu_ai_deadline_exceeded_total", "Calls not made because the request deadline had passed"
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose breaker is open"""
+
+    def __init__(self, name, retry_in):
+        super().__init__(f"{name} is unavailable, retrying in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the request deadline has no time left for another call"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a single half-open probe"""
+
+    def __init__(self, name, failure_threshold=BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout=BREAKER_RESET_TIMEOUT, is_failure=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure or (lambda error: True)
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _set_state(self, state):
+        if state != self.state:
+            self.state = state
+            breaker_transitions.inc(dependency=self.name, state=state)
+
+    def allow(self):
+        """Whether a call may go ahead now; an open breaker admits one probe after the cool-down"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def retry_in(self):
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    @contextmanager
+    def guard(self):
+        """Run a block as one call to the dependency, recording its outcome"""
+        if not self.allow():
+            breaker_rejections.inc(dependency=self.name)
+            raise CircuitOpenError(self.name, self.retry_in())
+        try:
+            yield self
+        except DeadlineExceeded:
+            # The dependency was never asked, so its health is unknown
+            self._release_probe()
+            raise
+        except Exception as e:
+            if self.is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        except BaseException:
+            # e.g. a guarded stream closed early by its consumer
+            self._release_probe()
+            raise
+        else:
+            self.record_success()
+
+    def _release_probe(self):
+        with self._lock:
+            self._probing = False
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name, **kwargs):
+    """Shared breaker for a dependency, created with kwargs on first use"""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name, **kwargs)
+        return breaker
+
+
+def breaker_states():
+    """Current state of every breaker, for display"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.state for breaker in breakers}
+
+
+class Deadline:
+    """A point in time by which a request must be finished"""
+
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return self.expires_at - time.monotonic()
+
+
+_current_deadline = contextvars.ContextVar("deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds):
+    """Bound every outbound call in the block by a shared budget; nested budgets only shrink"""
+    budget = Deadline(seconds)
+    parent = _current_deadline.get()
+    if parent is not None and parent.expires_at < budget.expires_at:
+        budget = parent
+    token = _current_deadline.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_deadline.reset(token)
+
+
+def remaining():
+    """Seconds left in the current deadline, infinite outside one"""
+    budget = _current_deadline.get()
+    return budget.remaining() if budget is not None else float("inf")
+
+
+def timeout_for(cap, budget=None):
+    """
+    Timeout for one outbound call: cap, shortened to the time left in the
+    given Deadline or, by default, the one set by the enclosing deadline()
+    """
+    left = budget.remaining() if budget is not None else remaining()
+    if left <= 0:
+        deadline_exceeded.inc()
+        raise DeadlineExceeded("request deadline exceeded")
+    return min(cap, left)
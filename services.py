@@ -0,0 +1,31 @@
+"""
+Service objects shared by the Streamlit app and the API server.
+"""
+from config import SUPABASE_URL, SUPABASE_KEY
+from database import Database
+from ai_services import TeluguAI
+from news_service import NewsService
+from swecha_service import SwechaAPI
+from contribution_queue import ContributionUploader
+from metrics import start_exporter
+
+
+def create_services():
+    """Create the services once per process; db is None without Supabase settings"""
+    db = None
+    if SUPABASE_URL:
+        db = Database(SUPABASE_URL, SUPABASE_KEY)
+        # Probe the connection off the first request
+        db.start_health_check()
+
+    # Prometheus endpoint/file, when METRICS_PORT or METRICS_FILE is set
+    start_exporter()
+
+    ai = TeluguAI()
+    news = NewsService()
+    swecha_api = SwechaAPI()
+    uploader = ContributionUploader(swecha_api)
+    # Also contributes conversations left behind by sessions of an earlier run
+    uploader.start()
+
+    return db, ai, news, swecha_api, uploader
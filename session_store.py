@@ -0,0 +1,144 @@
+import base64
+import binascii
+import hashlib
+import itertools
+import threading
+import weakref
+from collections import OrderedDict, deque
+from config import MAX_CHAT_HISTORY, AUDIO_CACHE_MAX_BYTES
+
+
+class AudioCache:
+    """
+    Process-wide LRU cache of TTS audio, bounded by total bytes.
+    Messages hold a content-hash key, so identical replies share one copy
+    and evicted audio simply stops being playable instead of growing memory.
+    """
+
+    def __init__(self, max_bytes=AUDIO_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def put(self, audio_bytes):
+        """Store audio bytes and return their reference key"""
+        key = hashlib.sha1(audio_bytes).hexdigest()
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return key
+            if len(audio_bytes) > self.max_bytes:
+                return None
+            self._data[key] = audio_bytes
+            self.bytes += len(audio_bytes)
+            while self.bytes > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.evictions += 1
+        return key
+
+    def get(self, key):
+        """Return audio bytes for a key, or None if evicted"""
+        with self._lock:
+            audio = self._data.get(key)
+            if audio is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return audio
+
+    def stats(self):
+        with self._lock:
+            return {
+                "audio_bytes": self.bytes,
+                "audio_budget_bytes": self.max_bytes,
+                "audio_entries": len(self._data),
+                "audio_hits": self.hits,
+                "audio_misses": self.misses,
+                "audio_evictions": self.evictions,
+            }
+
+
+audio_cache = AudioCache()
+_stores = weakref.WeakSet()
+_message_ids = itertools.count(1)
+
+
+class MessageStore:
+    """
+    Ring buffer of chat messages for one session, capped at MAX_CHAT_HISTORY.
+    Assistant audio lives in the shared AudioCache and is referenced by key.
+    """
+
+    def __init__(self, maxlen=MAX_CHAT_HISTORY, cache=None):
+        self.messages = deque(maxlen=maxlen)
+        self.cache = cache if cache is not None else audio_cache
+        _stores.add(self)
+
+    def __len__(self):
+        return len(self.messages)
+
+    def __iter__(self):
+        return iter(self.messages)
+
+    def append(self, message):
+        """Add a message dict, moving any inline audio into the shared cache"""
+        message = dict(message)
+        audio = message.pop("audio_file", None)
+        if isinstance(audio, str):
+            # Audio loaded from the database is stored base64 encoded
+            try:
+                audio = base64.b64decode(audio)
+            except (binascii.Error, ValueError):
+                audio = None
+        if audio:
+            message["audio_ref"] = self.cache.put(audio)
+        message.setdefault("id", next(_message_ids))
+        self.messages.append(message)
+        return message
+
+    def extend(self, messages):
+        for message in messages:
+            self.append(message)
+
+    def recent(self, count):
+        """The last count messages, oldest first"""
+        if count >= len(self.messages):
+            return list(self.messages)
+        return list(itertools.islice(self.messages, len(self.messages) - count, None))
+
+    def audio(self, message):
+        """Audio bytes for a message, or None if it has none or it was evicted"""
+        key = message.get("audio_ref")
+        return self.cache.get(key) if key else None
+
+    def attach_audio(self, message_id, audio_bytes):
+        """Attach audio that finished after the message was added"""
+        for message in reversed(self.messages):
+            if message.get("id") == message_id:
+                message["audio_ref"] = self.cache.put(audio_bytes)
+                return True
+        return False
+
+    def clear(self):
+        self.messages.clear()
+
+    def text_bytes(self):
+        return sum(len(m.get("content", "").encode("utf-8")) for m in self.messages)
+
+
+def memory_stats():
+    """Per-process memory metrics for chat sessions and the audio cache"""
+    stores = list(_stores)
+    stats = audio_cache.stats()
+    stats.update({
+        "sessions": len(stores),
+        "messages": sum(len(store) for store in stores),
+        "message_text_bytes": sum(store.text_bytes() for store in stores),
+    })
+    return stats
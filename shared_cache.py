@@ -0,0 +1,346 @@
+"""
+Cache shared by every worker process.
+
+st.cache_resource, st.session_state and the in-process caches are per
+process, so behind a load balancer each Streamlit worker would fetch the
+same feeds, synthesize the same audio and ask the model the same
+questions on its own. These caches store results where every worker can
+see them:
+
+    SQLiteCache  a WAL-mode SQLite file (memory-mapped) shared by the
+                 processes on one host; the default
+    RedisCache   any Redis-compatible server, for workers on several
+                 hosts; chosen with SHARED_CACHE_URL=redis://...
+
+Values are bytes with a TTL. add() stores only when the key is absent
+or expired, atomically across processes, which makes it usable as a
+lease: get_or_set() lets one worker compute a value while the others
+wait for its result instead of repeating the work. Each lease holds a
+token of its own, so a holder that outlived its lease never releases
+the next worker's. Cache errors are
+logged and treated as misses, so a broken cache only costs speed.
+
+The SQLite file is capped at SHARED_CACHE_MAX_BYTES of values; the
+oldest entries are evicted past it. A Redis server is bounded by its
+own maxmemory policy.
+"""
+import abc
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from config import (
+    SHARED_CACHE_URL,
+    SHARED_CACHE_PATH,
+    SHARED_CACHE_MMAP_BYTES,
+    SHARED_CACHE_MAX_BYTES,
+    REQUEST_TIMEOUT,
+)
+from metrics import registry
+
+cache_requests = registry.counter(
+    "telugu_ai_shared_cache_requests_total",
+    "Shared cache lookups by cache and result (hit, shared, miss)",
+)
+
+PURGE_EVERY = 200  # writes between sweeps of expired SQLite rows
+PURGE_BYTES_FRACTION = 0.1  # also sweep once this share of the size cap was written
+EVICT_TO_FRACTION = 0.9  # eviction frees space down to this share of the cap
+LEASE_POLL_INTERVAL = 0.05  # seconds between checks while another worker computes
+
+DELETE_IF_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class SharedCache(abc.ABC):
+    """Interface of the cache backends, plus helpers built on it"""
+
+    @abc.abstractmethod
+    def get(self, key):
+        """Value of key, or None if it is absent or expired"""
+
+    @abc.abstractmethod
+    def set(self, key, value, ttl):
+        """Store value for ttl seconds"""
+
+    @abc.abstractmethod
+    def add(self, key, value, ttl):
+        """Store value only if key is absent or expired; True if it was stored"""
+
+    @abc.abstractmethod
+    def delete(self, key):
+        """Remove key if it is present"""
+
+    @abc.abstractmethod
+    def delete_if(self, key, value):
+        """Remove key only if it still holds value"""
+
+    def get_json(self, key):
+        value = self.get(key)
+        return json.loads(value) if value is not None else None
+
+    def set_json(self, key, value, ttl):
+        self.set(key, json.dumps(value, ensure_ascii=False).encode("utf-8"), ttl)
+
+    def lease(self, key, ttl):
+        """Claim the right to compute key for ttl seconds; the lease token, or None"""
+        token = uuid.uuid4().hex.encode()
+        return token if self.add(f"lease:{key}", token, ttl) else None
+
+    def release(self, key, token):
+        """Give up a lease, unless it expired and another worker holds it now"""
+        self.delete_if(f"lease:{key}", token)
+
+    def wait(self, key, timeout):
+        """
+        Wait for another worker's value for key; None once its lease is
+        released without a value or timeout passes
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            value = self.get(key)
+            if value is not None:
+                return value
+            if self.get(f"lease:{key}") is None:
+                return self.get(key)
+            time.sleep(LEASE_POLL_INTERVAL)
+        return None
+
+    def get_or_set(self, key, compute, ttl, lease_ttl=REQUEST_TIMEOUT, name="default"):
+        """
+        Cached value for key, or compute() it. Only one worker computes a
+        missing key at a time; the rest wait up to lease_ttl for its result
+        before computing it themselves.
+        """
+        value = self.get(key)
+        if value is not None:
+            cache_requests.inc(cache=name, result="hit")
+            return value
+
+        token = self.lease(key, lease_ttl)
+        if not token:
+            value = self.wait(key, lease_ttl)
+            if value is not None:
+                cache_requests.inc(cache=name, result="shared")
+                return value
+
+        cache_requests.inc(cache=name, result="miss")
+        try:
+            value = compute()
+            if value is not None:
+                self.set(key, value, ttl)
+            return value
+        finally:
+            if token:
+                self.release(key, token)
+
+
+class SQLiteCache(SharedCache):
+    """Shared cache in an SQLite file, for the worker processes on one host"""
+
+    def __init__(self, path=SHARED_CACHE_PATH, mmap_bytes=SHARED_CACHE_MMAP_BYTES,
+                 max_bytes=SHARED_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._written_bytes = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        # Reads are served from the OS page cache every worker shares
+        self._conn.execute(f"PRAGMA mmap_size={int(mmap_bytes)}")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                expires_at REAL NOT NULL,
+                stored_at REAL NOT NULL DEFAULT 0
+            )
+            """
+        )
+        # Files created before the size cap gain the column; their rows go first
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(cache)")}
+        if "stored_at" not in columns:
+            self._conn.execute("ALTER TABLE cache ADD COLUMN stored_at REAL NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_stored_at ON cache (stored_at)")
+
+    def get(self, key):
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value FROM cache WHERE key = ? AND expires_at > ?",
+                    (key, time.time()),
+                ).fetchone()
+            return bytes(row[0]) if row else None
+        except sqlite3.Error as e:
+            print(f"Shared cache read error: {e}")
+            return None
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, expires_at, stored_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, value, now + ttl, now),
+                )
+                self._maybe_purge(len(value))
+        except sqlite3.Error as e:
+            print(f"Shared cache write error: {e}")
+
+    def add(self, key, value, ttl):
+        now = time.time()
+        try:
+            with self._lock:
+                # One statement, so two processes can never both store the key
+                cursor = self._conn.execute(
+                    "INSERT INTO cache (key, value, expires_at, stored_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET value = excluded.value, "
+                    "expires_at = excluded.expires_at, stored_at = excluded.stored_at "
+                    "WHERE cache.expires_at <= ?",
+                    (key, value, now + ttl, now, now),
+                )
+                self._maybe_purge(len(value))
+            return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            # Without a working cache every worker just does its own work
+            print(f"Shared cache write error: {e}")
+            return True
+
+    def delete(self, key):
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            print(f"Shared cache write error: {e}")
+
+    def delete_if(self, key, value):
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM cache WHERE key = ? AND value = ?", (key, value))
+        except sqlite3.Error as e:
+            print(f"Shared cache write error: {e}")
+
+    def _maybe_purge(self, size):
+        self._writes += 1
+        self._written_bytes += size
+        if self._writes < PURGE_EVERY and self._written_bytes < self.max_bytes * PURGE_BYTES_FRACTION:
+            return
+        self._writes = 0
+        self._written_bytes = 0
+        self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+        self._evict()
+
+    def _evict(self):
+        """Delete the oldest entries while the values exceed max_bytes"""
+        # length() of a blob column is read from the record header, not the value
+        total = self._conn.execute("SELECT COALESCE(SUM(length(value)), 0) FROM cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes * EVICT_TO_FRACTION
+        evicted = []
+        cursor = self._conn.execute(
+            "SELECT key, length(value) FROM cache WHERE key NOT LIKE 'lease:%' ORDER BY stored_at"
+        )
+        for key, size in cursor:
+            evicted.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        cursor.close()
+        self._conn.executemany("DELETE FROM cache WHERE key = ?", evicted)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RedisCache(SharedCache):
+    """Shared cache on a Redis-compatible server, for workers on several hosts"""
+
+    def __init__(self, url=SHARED_CACHE_URL):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("A Redis shared cache requires redis (pip install redis)")
+        self._errors = redis.exceptions.RedisError
+        self._client = redis.Redis.from_url(
+            url, socket_timeout=REQUEST_TIMEOUT, socket_connect_timeout=REQUEST_TIMEOUT
+        )
+        self._delete_if = self._client.register_script(DELETE_IF_SCRIPT)
+
+    def get(self, key):
+        try:
+            return self._client.get(key)
+        except self._errors as e:
+            print(f"Shared cache read error: {e}")
+            return None
+
+    def set(self, key, value, ttl):
+        try:
+            self._client.set(key, value, px=max(1, int(ttl * 1000)))
+        except self._errors as e:
+            print(f"Shared cache write error: {e}")
+
+    def add(self, key, value, ttl):
+        try:
+            return bool(self._client.set(key, value, nx=True, px=max(1, int(ttl * 1000))))
+        except self._errors as e:
+            print(f"Shared cache write error: {e}")
+            return True
+
+    def delete(self, key):
+        try:
+            self._client.delete(key)
+        except self._errors as e:
+            print(f"Shared cache write error: {e}")
+
+    def delete_if(self, key, value):
+        try:
+            # Compared and deleted in one step on the server
+            self._delete_if(keys=[key], args=[value])
+        except self._errors as e:
+            print(f"Shared cache write error: {e}")
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_cache():
+    """The configured shared cache, created on first use"""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                _shared_cache = _create_cache()
+    return _shared_cache
+
+
+def use_shared_cache(cache):
+    """Replace the process-wide cache, e.g. with a fresh one for each load test level"""
+    global _shared_cache
+    with _shared_cache_lock:
+        _shared_cache = cache
+
+
+def _create_cache():
+    if SHARED_CACHE_URL.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            return RedisCache(SHARED_CACHE_URL)
+        except ImportError as e:
+            print(f"{e}; using the local SQLite cache")
+    return SQLiteCache()
@@ -0,0 +1,171 @@
+"""
+Extractive summaries for news articles.
+
+A whole batch of articles is summarized at once: every sentence of every
+article becomes a row of one sparse term matrix (kept as NumPy coordinate
+arrays), IDF is computed across the batch so wording shared by every
+story scores low, and each sentence is scored by its TF-IDF mass, its
+overlap with the article title and its position. The best sentences are
+kept, in their original order, up to a sentence and character budget.
+Small batches, such as the single description of create_summary, are
+scored in plain Python: NumPy's fixed per-call cost would outweigh the
+work, and numpy is only imported once a larger batch needs it.
+"""
+import math
+import re
+from collections import Counter
+from config import SUMMARY_MAX_SENTENCES, SUMMARY_MAX_CHARS
+
+# Sentence ends: full stop, question and exclamation marks, danda and double danda
+SENTENCE_END = re.compile(r"(?<=[.!?।॥])\s+|\n+")
+# Telugu vowel signs and viramas are not \w, so the whole block is listed
+TOKEN = re.compile(r"[\wఀ-౿]+")
+
+TITLE_WEIGHT = 0.5  # extra weight for terms that also appear in the title
+POSITION_DECAY = 0.15  # lead sentences carry the story in news copy
+NUMPY_MIN_DOCUMENTS = 8  # smaller batches are scored without NumPy
+
+
+def split_sentences(text):
+    return [sentence.strip() for sentence in SENTENCE_END.split(text) if sentence.strip()]
+
+
+def tokenize(text):
+    return TOKEN.findall(text.lower())
+
+
+def truncate(text, max_chars):
+    """Cut text to max_chars at a word boundary"""
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars].rsplit(" ", 1)[0]
+    return cut.rstrip(" ,;:") + "..."
+
+
+class Summarizer:
+    """Batch TF-IDF sentence extractor"""
+
+    def __init__(self, max_sentences=SUMMARY_MAX_SENTENCES, max_chars=SUMMARY_MAX_CHARS):
+        self.max_sentences = max_sentences
+        self.max_chars = max_chars
+
+    def score_sentences(self, documents):
+        """
+        Split every (title, text) document into sentences and score them.
+        Returns the sentences of each document and one score sequence per document.
+        """
+        sentences = [split_sentences(text) for _, text in documents]
+        if len(documents) < NUMPY_MIN_DOCUMENTS:
+            return sentences, self._score_small(documents, sentences)
+        return sentences, self._score_batch(documents, sentences)
+
+    def _score_small(self, documents, sentences):
+        """The same scores as _score_batch, computed with dictionaries"""
+        doc_counts = []
+        df = Counter()
+        for doc_sentences in sentences:
+            counts = [Counter(tokenize(sentence)) for sentence in doc_sentences]
+            doc_counts.append(counts)
+            df.update(set().union(*counts))
+
+        n_documents = len(documents)
+        scores = []
+        for (title, _), counts in zip(documents, doc_counts):
+            title_terms = set(tokenize(title))
+            doc_scores = []
+            for position, sentence_counts in enumerate(counts):
+                score = 0.0
+                for term, count in sentence_counts.items():
+                    weight = (1.0 + math.log(count)) * (math.log((1 + n_documents) / (1 + df[term])) + 1.0)
+                    if term in title_terms:
+                        weight *= 1.0 + TITLE_WEIGHT
+                    score += weight
+                length = max(sum(sentence_counts.values()), 1)
+                doc_scores.append(score / math.sqrt(length) / (1.0 + POSITION_DECAY * position))
+            scores.append(doc_scores)
+        return scores
+
+    def _score_batch(self, documents, sentences):
+        import numpy as np
+
+        vocabulary = {}
+        rows, cols = [], []
+        sentence_doc, sentence_position, sentence_length = [], [], []
+        title_docs, title_terms = [], []
+
+        for doc_index, ((title, _), doc_sentences) in enumerate(zip(documents, sentences)):
+            for position, sentence in enumerate(doc_sentences):
+                row = len(sentence_doc)
+                tokens = tokenize(sentence)
+                for token in tokens:
+                    rows.append(row)
+                    cols.append(vocabulary.setdefault(token, len(vocabulary)))
+                sentence_doc.append(doc_index)
+                sentence_position.append(position)
+                sentence_length.append(len(tokens))
+            for token in set(tokenize(title)):
+                term = vocabulary.get(token)
+                if term is not None:
+                    title_docs.append(doc_index)
+                    title_terms.append(term)
+
+        if not rows:
+            return [np.zeros(len(doc)) for doc in sentences]
+
+        vocab_size = len(vocabulary)
+        n_sentences = len(sentence_doc)
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        sentence_doc = np.asarray(sentence_doc, dtype=np.int64)
+
+        # Term counts per sentence, as unique (sentence, term) cells
+        cells, counts = np.unique(rows * vocab_size + cols, return_counts=True)
+        cell_rows = cells // vocab_size
+        cell_cols = cells % vocab_size
+        cell_docs = sentence_doc[cell_rows]
+
+        # Document frequency over articles, not sentences
+        doc_terms = np.unique(cell_docs * vocab_size + cell_cols)
+        df = np.bincount(doc_terms % vocab_size, minlength=vocab_size)
+        idf = np.log((1 + len(documents)) / (1 + df)) + 1.0
+
+        weights = (1.0 + np.log(counts)) * idf[cell_cols]
+        if title_terms:
+            title_keys = np.asarray(title_docs, dtype=np.int64) * vocab_size \
+                + np.asarray(title_terms, dtype=np.int64)
+            in_title = np.isin(cell_docs * vocab_size + cell_cols, title_keys)
+            weights = weights * (1.0 + TITLE_WEIGHT * in_title)
+
+        scores = np.bincount(cell_rows, weights=weights, minlength=n_sentences)
+        lengths = np.maximum(np.asarray(sentence_length, dtype=np.float64), 1.0)
+        positions = np.asarray(sentence_position, dtype=np.float64)
+        scores = scores / np.sqrt(lengths) / (1.0 + POSITION_DECAY * positions)
+
+        # Back to one score array per document
+        bounds = np.cumsum([0] + [len(doc) for doc in sentences])
+        return [scores[bounds[i]:bounds[i + 1]] for i in range(len(sentences))]
+
+    def summarize(self, documents):
+        """Summaries for a batch of (title, text) documents, in order"""
+        sentences, scores = self.score_sentences(documents)
+        summaries = []
+        for doc_sentences, doc_scores in zip(sentences, scores):
+            if not doc_sentences:
+                summaries.append("")
+                continue
+
+            chosen = []
+            length = 0
+            ranked = sorted(range(len(doc_sentences)), key=lambda i: -doc_scores[i])
+            for index in ranked:
+                sentence = doc_sentences[index]
+                if chosen and length + len(sentence) + 1 > self.max_chars:
+                    continue
+                chosen.append(index)
+                length += len(sentence) + 1
+                if len(chosen) >= self.max_sentences:
+                    break
+
+            summary = " ".join(doc_sentences[i] for i in sorted(chosen))
+            summaries.append(truncate(summary, self.max_chars))
+        return summaries
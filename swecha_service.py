@@ -0,0 +1,631 @@
+import streamlit as st
+import http.client
+import json
+import queue
+import socket
+import threading
+import time
+import uuid
+from urllib.parse import urlencode
+from config import (
+    SWECHA_API_HOST,
+    SWECHA_POOL_SIZE,
+    SWECHA_MAX_RETRIES,
+    SWECHA_PAGE_SIZE,
+    SWECHA_PAGE_CACHE_TTL,
+    GEO_INDEX_REBUILD_INTERVAL,
+    REQUEST_TIMEOUT,
+    SWECHA_REQUEST_DEADLINE,
+)
+from utils import TTLCache
+from metrics import timed
+from resilience import deadline, get_breaker, remaining, timeout_for
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRY_STATUSES = {502, 503, 504}
+RETRY_BACKOFF = 0.2  # seconds, doubled on every retry
+
+# Raised when a kept-alive connection was closed by the server between requests
+STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+
+class SwechaAPIError(Exception):
+    """Raised when the Swecha API answers with an error status"""
+    
+    def __init__(self, status, body):
+        super().__init__(f"HTTP {status}: {body[:200]}")
+        self.status = status
+        self.body = body
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of keep-alive HTTPS connections to a single host
+    (plain HTTP when secure is False, for local stand-ins).
+    Each request checks out its own connection, so concurrent Streamlit
+    sessions never share one in flight.
+    """
+    
+    def __init__(self, host, pool_size=SWECHA_POOL_SIZE, timeout=REQUEST_TIMEOUT, secure=True):
+        self.host = host
+        self.secure = secure
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+        self._lock = threading.Lock()
+        self._open = 0
+    
+    def _new_connection(self):
+        if self.secure:
+            return http.client.HTTPSConnection(self.host, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, timeout=self.timeout)
+    
+    def acquire(self, timeout=None):
+        """Check out a connection, returning (connection, reused)"""
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            if self._open < self.pool_size:
+                self._open += 1
+                return self._new_connection(), False
+        
+        # Pool exhausted, wait for another request to hand one back
+        timeout = timeout or self.timeout
+        try:
+            return self._idle.get(timeout=timeout), True
+        except queue.Empty:
+            raise TimeoutError(
+                f"All {self.pool_size} connections to {self.host} stayed busy for {timeout:.1f}s"
+            ) from None
+    
+    def release(self, conn, discard=False):
+        """Return a connection to the pool, replacing it if it is no longer usable"""
+        if discard:
+            conn.close()
+            conn = self._new_connection()
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+            with self._lock:
+                self._open -= 1
+    
+    def close(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._open -= 1
+
+
+def is_swecha_failure(error):
+    """Client errors are answers from a healthy API, not outages"""
+    return not (isinstance(error, SwechaAPIError) and error.status < 500)
+
+
+class SwechaAPI:
+    """
+    Swecha Corpus API Integration for Telugu AI Chat
+    Handles authentication, user management, and data contributions
+    """
+    
+    def __init__(self, base_url=SWECHA_API_HOST, pool_size=SWECHA_POOL_SIZE,
+                 timeout=REQUEST_TIMEOUT, max_retries=SWECHA_MAX_RETRIES, secure=True):
+        self.base_url = base_url
+        self.pool = ConnectionPool(base_url, pool_size=pool_size, timeout=timeout,
+                                   secure=secure)
+        self.headers = {"content-type": "application/json"}
+        self.auth_token = None
+        self.max_retries = max_retries
+        self.breaker = get_breaker("swecha", is_failure=is_swecha_failure)
+        self.page_cache = TTLCache(SWECHA_PAGE_CACHE_TTL)
+        self._geo_index = None
+        self.geo_refreshed_at = 0.0
+        self.geo_rebuilt_at = 0.0
+        self.geo_next_page = 0  # first records page the next geo refresh fetches
+    
+    def _send(self, method, endpoint, payload=None):
+        """Send one request on a pooled connection and return (status, body)"""
+        timeout = timeout_for(self.pool.timeout)
+        conn, reused = self.pool.acquire(timeout)
+        sent = False
+        try:
+            # Pooled connections keep their socket, so the budget is applied to it too
+            conn.timeout = timeout
+            if conn.sock:
+                conn.sock.settimeout(timeout)
+            if payload:
+                conn.request(method, endpoint, payload, self.headers)
+            else:
+                conn.request(method, endpoint, headers=self.headers)
+            sent = True
+            
+            res = conn.getresponse()
+            data = res.read()
+        except Exception as e:
+            self.pool.release(conn, discard=True)
+            e.reused_connection = reused
+            e.request_sent = sent
+            raise
+        
+        self.pool.release(conn, discard=res.will_close)
+        return res.status, data
+    
+    def _backoff(self, attempt):
+        """Sleep before a retry, or return False if the deadline leaves no time for it"""
+        delay = RETRY_BACKOFF * (2 ** (attempt - 1))
+        if remaining() <= delay:
+            return False
+        time.sleep(delay)
+        return True
+    
+    @timed("swecha.request")
+    def _request(self, method, endpoint, payload=None):
+        """Make HTTP request to Swecha API, raising on failure"""
+        with deadline(SWECHA_REQUEST_DEADLINE), self.breaker.guard():
+            return self._request_with_retries(method, endpoint, payload)
+    
+    def _request_with_retries(self, method, endpoint, payload):
+        attempt = 0
+        while True:
+            try:
+                status, data = self._send(method, endpoint, payload)
+                if status in RETRY_STATUSES and method in IDEMPOTENT_METHODS \
+                        and attempt < self.max_retries and self._backoff(attempt + 1):
+                    attempt += 1
+                    continue
+                if status >= 400:
+                    raise SwechaAPIError(status, data.decode("utf-8", "replace"))
+                return json.loads(data.decode("utf-8"))
+            except STALE_CONNECTION_ERRORS as e:
+                # A request that could not be sent on a kept-alive connection the
+                # server had closed never reached it, so resending is safe for any
+                # verb. Once sent, the server may have acted on it before the reset.
+                unsent = getattr(e, "reused_connection", False) \
+                    and not getattr(e, "request_sent", True)
+                if attempt < self.max_retries and (unsent or method in IDEMPOTENT_METHODS):
+                    attempt += 1
+                    continue
+                raise
+            except (socket.timeout, OSError):
+                if method in IDEMPOTENT_METHODS and attempt < self.max_retries \
+                        and self._backoff(attempt + 1):
+                    attempt += 1
+                    continue
+                raise
+    
+    def _make_request(self, method, endpoint, payload=None, invalidate=()):
+        """
+        Make HTTP request to Swecha API. invalidate lists the cached page
+        prefixes a successful write makes stale; they are dropped only once
+        the write has gone through.
+        """
+        try:
+            result = self._request(method, endpoint, payload)
+        except SwechaAPIError as e:
+            # Error bodies are still JSON the UI knows how to show
+            try:
+                return json.loads(e.body)
+            except ValueError:
+                st.error(f"API Error: {e}")
+                return None
+        except Exception as e:
+            st.error(f"API Error: {e}")
+            return None
+        for prefix in invalidate:
+            self.page_cache.invalidate(prefix)
+        return result
+    
+    def get_page(self, endpoint, page=0, page_size=SWECHA_PAGE_SIZE):
+        """Get one page of a list endpoint, reusing recently fetched pages"""
+        path = f"{endpoint}?{urlencode({'skip': page * page_size, 'limit': page_size})}"
+        items = self.page_cache.get(path)
+        if items is not None:
+            return items
+        
+        # A write finishing during the fetch may make this page stale
+        generation = self.page_cache.generation
+        result = self._make_request("GET", path)
+        
+        # List endpoints answer with either a bare list or a wrapped one
+        if isinstance(result, dict):
+            for key in ("items", "data", "results", "records", "contributions"):
+                if isinstance(result.get(key), list):
+                    result = result[key]
+                    break
+        if not isinstance(result, list):
+            # An error body such as {"detail": ...}, not a page of rows
+            if result is not None:
+                print(f"Swecha page {path} failed: {result}")
+            return None
+        self.page_cache.set(path, result, generation)
+        return result
+    
+    # Authentication Methods
+    def send_signup_otp(self, phone_number):
+        """Send OTP for signup"""
+        payload = json.dumps({"phone_number": phone_number})
+        return self._make_request("POST", "/api/v1/auth/signup/send-otp", payload)
+    
+    def verify_signup_otp(self, phone_number, otp_code, name, email, password):
+        """Verify OTP and complete signup"""
+        payload = json.dumps({
+            "phone_number": phone_number,
+            "otp_code": otp_code,
+            "name": name,
+            "email": email,
+            "password": password,
+            "has_given_consent": True
+        })
+        return self._make_request("POST", "/api/v1/auth/signup/verify-otp", payload)
+    
+    def resend_signup_otp(self, phone_number):
+        """Resend signup OTP"""
+        payload = json.dumps({"phone_number": phone_number})
+        return self._make_request("POST", "/api/v1/auth/signup/resend-otp", payload)
+    
+    def send_login_otp(self, phone_number):
+        """Send OTP for login"""
+        payload = json.dumps({"phone_number": phone_number})
+        return self._make_request("POST", "/api/v1/auth/login/send-otp", payload)
+    
+    def verify_login_otp(self, phone_number, otp_code):
+        """Verify login OTP"""
+        payload = json.dumps({
+            "phone_number": phone_number,
+            "otp_code": otp_code
+        })
+        return self._make_request("POST", "/api/v1/auth/login/verify-otp", payload)
+    
+    def resend_login_otp(self, phone_number):
+        """Resend login OTP"""
+        payload = json.dumps({"phone_number": phone_number})
+        return self._make_request("POST", "/api/v1/auth/login/resend-otp", payload)
+    
+    def get_user_profile(self):
+        """Get current user profile"""
+        return self._make_request("GET", "/api/v1/auth/me")
+    
+    def change_password(self, current_password, new_password):
+        """Change user password"""
+        payload = json.dumps({
+            "current_password": current_password,
+            "new_password": new_password
+        })
+        return self._make_request("POST", "/api/v1/auth/change-password", payload)
+    
+    def reset_password(self, phone, new_password):
+        """Reset password"""
+        payload = json.dumps({
+            "phone": phone,
+            "new_password": new_password
+        })
+        return self._make_request("POST", "/api/v1/auth/reset-password", payload)
+    
+    def forgot_password_init(self, phone_number):
+        """Initialize forgot password process"""
+        payload = json.dumps({"phone_number": phone_number})
+        return self._make_request("POST", "/api/v1/auth/forgot-password/init", payload)
+    
+    def forgot_password_confirm(self, phone_number, otp_code, new_password, confirm_password):
+        """Confirm forgot password with OTP"""
+        payload = json.dumps({
+            "phone_number": phone_number,
+            "otp_code": otp_code,
+            "new_password": new_password,
+            "confirm_password": confirm_password
+        })
+        return self._make_request("POST", "/api/v1/auth/forgot-password/confirm", payload)
+    
+    # User Management Methods
+    def get_users(self):
+        """Get all users"""
+        return self._make_request("GET", "/api/v1/users/")
+    
+    def create_user(self, phone, name, email, gender, date_of_birth, place, password, role_ids):
+        """Create new user"""
+        payload = json.dumps({
+            "phone": phone,
+            "name": name,
+            "email": email,
+            "gender": gender,
+            "date_of_birth": date_of_birth,
+            "place": place,
+            "password": password,
+            "role_ids": role_ids,
+            "has_given_consent": True
+        })
+        return self._make_request("POST", "/api/v1/users/", payload)
+    
+    def get_user_by_id(self, user_id):
+        """Get user by ID"""
+        return self._make_request("GET", f"/api/v1/users/{user_id}")
+    
+    def update_user(self, user_id, name, email, gender, date_of_birth, place, is_active):
+        """Update user information"""
+        payload = json.dumps({
+            "name": name,
+            "email": email,
+            "gender": gender,
+            "date_of_birth": date_of_birth,
+            "place": place,
+            "is_active": is_active,
+            "has_given_consent": True
+        })
+        return self._make_request("PUT", f"/api/v1/users/{user_id}", payload)
+    
+    def get_user_with_roles(self, user_id):
+        """Get user with roles"""
+        return self._make_request("GET", f"/api/v1/users/{user_id}/with-roles")
+    
+    def get_user_by_phone(self, phone):
+        """Get user by phone number"""
+        return self._make_request("GET", f"/api/v1/users/phone/{phone}")
+    
+    def get_user_contributions(self, user_id):
+        """Get user contributions"""
+        return self._make_request("GET", f"/api/v1/users/{user_id}/contributions")
+    
+    def get_user_contributions_page(self, user_id, page=0, page_size=SWECHA_PAGE_SIZE):
+        """Get one page of user contributions"""
+        return self.get_page(f"/api/v1/users/{user_id}/contributions", page, page_size)
+    
+    def get_user_contributions_by_type(self, user_id, media_type):
+        """Get user contributions by media type"""
+        return self._make_request("GET", f"/api/v1/users/{user_id}/contributions/{media_type}")
+    
+    # Role Management Methods
+    def get_roles(self):
+        """Get all roles"""
+        return self._make_request("GET", "/api/v1/roles/")
+    
+    def create_role(self, name, description):
+        """Create new role"""
+        payload = json.dumps({
+            "name": name,
+            "description": description
+        })
+        return self._make_request("POST", "/api/v1/roles/", payload)
+    
+    def get_role_by_id(self, role_id):
+        """Get role by ID"""
+        return self._make_request("GET", f"/api/v1/roles/{role_id}")
+    
+    def get_user_roles(self, user_id):
+        """Get user roles"""
+        return self._make_request("GET", f"/api/v1/users/{user_id}/roles")
+    
+    def assign_user_roles(self, user_id, role_ids):
+        """Assign roles to user"""
+        payload = json.dumps(role_ids)
+        return self._make_request("POST", f"/api/v1/users/{user_id}/roles", payload)
+    
+    # Category Management Methods
+    def get_categories(self):
+        """Get all categories"""
+        return self._make_request("GET", "/api/v1/categories/")
+    
+    def get_categories_page(self, page=0, page_size=SWECHA_PAGE_SIZE):
+        """Get one page of categories"""
+        return self.get_page("/api/v1/categories/", page, page_size)
+    
+    def create_category(self, name, title, description, published, rank):
+        """Create new category"""
+        payload = json.dumps({
+            "name": name,
+            "title": title,
+            "description": description,
+            "published": published,
+            "rank": rank
+        })
+        return self._make_request("POST", "/api/v1/categories/", payload,
+                                  invalidate=["/api/v1/categories/"])
+    
+    def get_category_by_id(self, category_id):
+        """Get category by ID"""
+        return self._make_request("GET", f"/api/v1/categories/{category_id}")
+    
+    def delete_category(self, category_id):
+        """Delete category"""
+        return self._make_request("DELETE", f"/api/v1/categories/{category_id}",
+                                  invalidate=["/api/v1/categories/"])
+    
+    # Records Management Methods
+    def get_records(self):
+        """Get all records"""
+        return self._make_request("GET", "/api/v1/records/")
+    
+    def get_records_page(self, page=0, page_size=SWECHA_PAGE_SIZE):
+        """Get one page of records"""
+        return self.get_page("/api/v1/records/", page, page_size)
+    
+    def build_record(self, title, description, media_type, file_url, file_name, 
+                     file_size, location, release_rights, language, user_id, category_id):
+        """Build the JSON body for a new record"""
+        return json.dumps({
+            "title": title,
+            "description": description,
+            "media_type": media_type,
+            "file_url": file_url,
+            "file_name": file_name,
+            "file_size": file_size,
+            "status": "pending",
+            "location": location,
+            "reviewed": False,
+            "release_rights": release_rights,
+            "language": language,
+            "user_id": user_id,
+            "category_id": category_id
+        })
+    
+    def create_record(self, title, description, media_type, file_url, file_name, 
+                     file_size, location, release_rights, language, user_id, category_id):
+        """Create new record"""
+        payload = self.build_record(title, description, media_type, file_url, file_name,
+                                    file_size, location, release_rights, language,
+                                    user_id, category_id)
+        return self._make_request("POST", "/api/v1/records/", payload,
+                                  invalidate=self._record_pages(user_id))
+    
+    def submit_record(self, payload):
+        """Post a prebuilt record body, raising on failure"""
+        result = self._request("POST", "/api/v1/records/", payload)
+        for prefix in self._record_pages(json.loads(payload).get("user_id")):
+            self.page_cache.invalidate(prefix)
+        return result
+    
+    def _record_pages(self, user_id):
+        """Cached pages a new record for user_id makes stale"""
+        prefixes = ["/api/v1/records/"]
+        if user_id:
+            prefixes.append(f"/api/v1/users/{user_id}/contributions")
+        return prefixes
+    
+    def get_record_by_id(self, record_id):
+        """Get record by ID"""
+        return self._make_request("GET", f"/api/v1/records/{record_id}")
+    
+    def update_record(self, record_id, title, description, media_type, file_url, 
+                     file_name, file_size, status, location, reviewed, reviewed_by, 
+                     release_rights, language):
+        """Update record"""
+        payload = json.dumps({
+            "title": title,
+            "description": description,
+            "media_type": media_type,
+            "file_url": file_url,
+            "file_name": file_name,
+            "file_size": file_size,
+            "status": status,
+            "location": location,
+            "reviewed": reviewed,
+            "reviewed_by": reviewed_by,
+            "release_rights": release_rights,
+            "language": language
+        })
+        return self._make_request("PATCH", f"/api/v1/records/{record_id}", payload,
+                                  invalidate=["/api/v1/records/"])
+    
+    def upload_record(self, title, description, media_type, file_url, file_name, 
+                     file_size, location, release_rights, language, user_id, category_id):
+        """Upload record"""
+        payload = json.dumps({
+            "title": title,
+            "description": description,
+            "media_type": media_type,
+            "file_url": file_url,
+            "file_name": file_name,
+            "file_size": file_size,
+            "status": "pending",
+            "location": location,
+            "reviewed": False,
+            "release_rights": release_rights,
+            "language": language,
+            "user_id": user_id,
+            "category_id": category_id
+        })
+        return self._make_request("POST", "/api/v1/records/upload", payload,
+                                  invalidate=self._record_pages(user_id))
+    
+    def search_nearby_records(self, latitude, longitude, radius):
+        """Search records nearby"""
+        query = urlencode({"latitude": latitude, "longitude": longitude, "radius": radius})
+        return self._make_request("GET", f"/api/v1/records/search/nearby?{query}")
+    
+    def search_records_by_bbox(self, min_lat, min_lon, max_lat, max_lon):
+        """Search records by bounding box"""
+        query = urlencode({
+            "min_lat": min_lat,
+            "min_lon": min_lon,
+            "max_lat": max_lat,
+            "max_lon": max_lon
+        })
+        return self._make_request("GET", f"/api/v1/records/search/bbox?{query}")
+    
+    @property
+    def geo_index(self):
+        """Spatial index over fetched records, built on first use so numpy loads lazily"""
+        if self._geo_index is None:
+            from geo_index import RecordGeoIndex
+            self._geo_index = RecordGeoIndex()
+        return self._geo_index
+    
+    def refresh_geo_index(self, page_size=100, force=False):
+        """
+        Pull record pages into the local spatial index, returning how many
+        were indexed. Paging resumes from the last page seen, which is fetched
+        again in case it has filled up, and continues until the end of the
+        list. That only finds records appended since, so records deleted or
+        reordered on the server stay in the index until it is rebuilt from
+        the first page: every GEO_INDEX_REBUILD_INTERVAL seconds, or with
+        force. A rebuild replaces the old index only once it completes.
+        """
+        now = time.time()
+        rebuild = force or now - self.geo_rebuilt_at >= GEO_INDEX_REBUILD_INTERVAL
+        if not rebuild and now - self.geo_refreshed_at < SWECHA_PAGE_CACHE_TTL:
+            return 0
+        
+        if rebuild:
+            from geo_index import RecordGeoIndex
+            index, page = RecordGeoIndex(), 0
+        else:
+            index, page = self.geo_index, self.geo_next_page
+        
+        added = 0
+        while True:
+            records = self.get_page("/api/v1/records/", page, page_size)
+            if records is None:
+                break
+            added += index.add(records)
+            if len(records) < page_size:
+                break
+            page += 1
+        self.geo_refreshed_at = now
+        
+        if rebuild:
+            if records is None:
+                # Keep serving the old index and try the rebuild again later
+                return 0
+            self._geo_index = index
+            self.geo_rebuilt_at = now
+        # A failed page is fetched again first on the next refresh
+        self.geo_next_page = page
+        return added
+    
+    def nearby_records_local(self, latitude, longitude, radius_km):
+        """Answer a radius query from the local spatial index"""
+        self.refresh_geo_index()
+        return self.geo_index.nearby(latitude, longitude, radius_km)
+    
+    def bbox_records_local(self, min_lat, min_lon, max_lat, max_lon):
+        """Answer a bounding box query from the local spatial index"""
+        self.refresh_geo_index()
+        return self.geo_index.bbox(min_lat, min_lon, max_lat, max_lon)
+    
+    def get_record_url(self, record_id):
+        """Get record URL"""
+        return self._make_request("GET", f"/api/v1/records/{record_id}/record-url")
+    
+    # Task Management Methods
+    def export_data(self, task_name):
+        """Export data task"""
+        payload = json.dumps({
+            "task_id": str(uuid.uuid4()),
+            "task_name": task_name,
+            "status": "pending",
+            "message": "Export task initiated"
+        })
+        return self._make_request("POST", "/api/v1/tasks/export-data", payload)
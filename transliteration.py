@@ -0,0 +1,158 @@
+"""
+Romanized Telugu to Telugu script transliteration.
+
+The rule table is compiled once into a character trie and input is
+converted in a single left-to-right pass, always taking the longest
+matching rule. Conventions follow common casual typing: lowercase t/d/n/l
+are dental, uppercase T/D/N/L retroflex, doubled or uppercase vowels are
+long, and a word-final m becomes an anusvara.
+"""
+import threading
+
+VIRAMA = "్"
+ANUSVARA = "ం"
+
+# (independent form, dependent sign); the inherent "a" has no sign
+VOWELS = {
+    "a": ("అ", ""),
+    "aa": ("ఆ", "ా"), "A": ("ఆ", "ా"),
+    "i": ("ఇ", "ి"),
+    "ii": ("ఈ", "ీ"), "ee": ("ఈ", "ీ"), "I": ("ఈ", "ీ"),
+    "u": ("ఉ", "ు"),
+    "uu": ("ఊ", "ూ"), "oo": ("ఊ", "ూ"), "U": ("ఊ", "ూ"),
+    "e": ("ఎ", "ె"),
+    "ae": ("ఏ", "ే"), "E": ("ఏ", "ే"),
+    "ai": ("ఐ", "ై"),
+    "o": ("ఒ", "ొ"),
+    "O": ("ఓ", "ో"),
+    "au": ("ఔ", "ౌ"), "ou": ("ఔ", "ౌ"),
+    "R": ("ఋ", "ృ"),
+}
+
+CONSONANTS = {
+    "k": "క", "kh": "ఖ", "g": "గ", "gh": "ఘ",
+    "ch": "చ", "chh": "ఛ", "c": "చ", "j": "జ", "jh": "ఝ",
+    "T": "ట", "Th": "ఠ", "D": "డ", "Dh": "ఢ", "N": "ణ",
+    "t": "త", "th": "థ", "d": "ద", "dh": "ధ", "n": "న",
+    "p": "ప", "ph": "ఫ", "f": "ఫ", "b": "బ", "bh": "భ", "m": "మ",
+    "y": "య", "r": "ర", "l": "ల", "L": "ళ", "v": "వ", "w": "వ",
+    "sh": "శ", "Sh": "ష", "s": "స", "h": "హ",
+    "x": "క్స", "z": "జ", "q": "క",
+}
+
+OTHER = {
+    "M": ANUSVARA,
+    "H": "ః",
+}
+
+# Folding used for loose matching, where casual typing loses vowel length,
+# retroflex/dental contrast and anusvara spelling
+MATCH_FOLD = str.maketrans({
+    "ఆ": "అ", "ా": "",
+    "ఈ": "ఇ", "ీ": "ి",
+    "ఊ": "ఉ", "ూ": "ు",
+    "ఏ": "ఎ", "ే": "ె",
+    "ఓ": "ఒ", "ో": "ొ",
+    "ట": "త", "ఠ": "థ", "డ": "ద", "ఢ": "ధ", "ణ": "న", "ళ": "ల", "ష": "శ",
+    ANUSVARA: "న" + VIRAMA,
+})
+
+_END = object()
+
+
+class Transliterator:
+    """Longest-match trie transliterator for romanized Telugu"""
+
+    def __init__(self):
+        self.trie = {}
+        for key, (independent, sign) in VOWELS.items():
+            self._add(key, ("V", independent, sign))
+        for key, letter in CONSONANTS.items():
+            self._add(key, ("C", letter, None))
+        for key, letter in OTHER.items():
+            self._add(key, ("O", letter, None))
+
+    def _add(self, key, token):
+        node = self.trie
+        for char in key:
+            node = node.setdefault(char, {})
+        node[_END] = token
+
+    def _match(self, text, start):
+        """Longest rule starting at start, as (token, end) or (None, start + 1)"""
+        node = self.trie
+        token, end = None, start + 1
+        i = start
+        while i < len(text):
+            node = node.get(text[i])
+            if node is None:
+                break
+            i += 1
+            if _END in node:
+                token, end = node[_END], i
+        return token, end
+
+    def transliterate(self, text):
+        """Convert romanized Telugu to Telugu script, leaving other characters as is"""
+        out = []
+        pending = None  # consonant still carrying its inherent vowel
+        i = 0
+
+        while i < len(text):
+            token, end = self._match(text, i)
+
+            if token is None:
+                if pending:
+                    self._close_word(out, pending)
+                    pending = None
+                out.append(text[i])
+                i = end
+                continue
+
+            kind, letter, sign = token
+            if kind == "C":
+                if pending:
+                    out.append(VIRAMA)
+                out.append(letter)
+                pending = text[i:end]
+            elif kind == "V":
+                out.append(sign if pending else letter)
+                pending = None
+            else:
+                out.append(letter)
+                pending = None
+            i = end
+
+        if pending:
+            self._close_word(out, pending)
+        return "".join(out)
+
+    def _close_word(self, out, consonant):
+        """Finish a word that ended on a bare consonant"""
+        if consonant == "m":
+            out[-1] = ANUSVARA
+        else:
+            out.append(VIRAMA)
+
+
+def fold_for_matching(text):
+    """Normalize Telugu text so transliterated input can match native keywords"""
+    return text.translate(MATCH_FOLD)
+
+
+_transliterator = None
+_transliterator_lock = threading.Lock()
+
+
+def get_transliterator():
+    """Shared transliterator, compiled on first use"""
+    global _transliterator
+    if _transliterator is None:
+        with _transliterator_lock:
+            if _transliterator is None:
+                _transliterator = Transliterator()
+    return _transliterator
+
+
+def transliterate(text):
+    return get_transliterator().transliterate(text)
@@ -0,0 +1,45 @@
+import functools
+import hashlib
+import io
+from config import TTS_TIMEOUT, TTS_CACHE_TTL
+from metrics import timed
+from resilience import deadline, get_breaker, timeout_for
+from shared_cache import get_shared_cache
+
+
+@timed("tts.generate")
+def synthesize_speech(text, lang="te"):
+    """Synthesize text to MP3 bytes with gTTS, raising on failure"""
+    if not text or len(text.strip()) == 0:
+        return None
+
+    # Every worker reuses audio for the same text; one synthesizes it at a time
+    key = "tts:" + hashlib.sha1(f"{lang}\0{text}".encode("utf-8")).hexdigest()
+    return get_shared_cache().get_or_set(
+        key, lambda: _synthesize(text, lang), TTS_CACHE_TTL, lease_ttl=TTS_TIMEOUT, name="tts"
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def supported_languages():
+    """Language codes gTTS can speak, mapped to their names"""
+    from gtts.lang import tts_langs
+
+    return tts_langs()
+
+
+def _synthesize(text, lang):
+    from gtts import gTTS
+
+    # Create gTTS object
+    tts = gTTS(text=text, lang=lang, slow=False)
+
+    # Use BytesIO instead of temp file to avoid file access issues
+    audio_buffer = io.BytesIO()
+    with deadline(TTS_TIMEOUT), get_breaker("gtts").guard():
+        # Long text is sent in several parts; each one only gets what is left
+        tts.timeout = timeout_for(TTS_TIMEOUT)
+        for chunk in tts.stream():
+            audio_buffer.write(chunk)
+            tts.timeout = timeout_for(TTS_TIMEOUT)
+    return audio_buffer.getvalue()
@@ -0,0 +1,53 @@
+from concurrent.futures import ThreadPoolExecutor
+from config import TURN_TASK_WORKERS
+
+
+class TurnOrchestrator:
+    """
+    Runs the side effects of a chat turn (TTS, persistence, corpus upload)
+    on a shared executor so the reply can be shown as soon as it exists.
+    Worker threads have no Streamlit script context, so tasks must be given
+    plain values rather than reading st.session_state themselves.
+    """
+
+    def __init__(self, max_workers=TURN_TASK_WORKERS):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="turn-task"
+        )
+
+    def submit(self, fn, *args, **kwargs):
+        """Run a task in the background, logging instead of raising its errors"""
+        return self.executor.submit(self._guarded, None, None, fn, *args, **kwargs)
+
+    def _guarded(self, errors, kind, fn, *args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            print(f"Background task {getattr(fn, '__name__', fn)} failed: {e}")
+            if errors is not None:
+                errors.append((kind, e))
+            return None
+
+    def run_turn(self, synthesize=None, save=None, errors=None):
+        """
+        Start a turn's side effects and return the audio future (or None).
+        save receives the synthesized audio, so it is chained on the TTS task
+        instead of blocking a worker while it waits. A failed task appends
+        ("synthesize" or "save", error) to the errors list, so the caller can
+        report it from the script thread.
+        """
+        audio_future = None
+        if synthesize:
+            audio_future = self.executor.submit(self._guarded, errors, "synthesize", synthesize)
+
+        if save:
+            if audio_future:
+                audio_future.add_done_callback(
+                    lambda future: self.executor.submit(
+                        self._guarded, errors, "save", save, future.result()
+                    )
+                )
+            else:
+                self.executor.submit(self._guarded, errors, "save", save, None)
+
+        return audio_future
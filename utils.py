@@ -3,6 +3,9 @@ import base64
 import io
 import tempfile
 import os
+import threading
+import time
+from collections import OrderedDict
 
 def encode_audio_to_base64(audio_bytes):
     """Encode audio bytes to base64 string"""
@@ -59,4 +62,48 @@ def load_telugu_font():
 
 def create_chat_container():
     """Create a styled chat container"""
-    return st.container()
\ No newline at end of file
+    return st.container()
+
+
+class TTLCache:
+    """
+    Small thread-safe LRU cache whose entries expire after ttl seconds.
+    generation changes on every invalidate(), so a reader can pass the
+    value it saw before a slow fetch to set() and never cache data that
+    a concurrent write made stale.
+    """
+    
+    def __init__(self, ttl, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation = 0
+    
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key, value, generation=None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+    
+    def invalidate(self, prefix=""):
+        """Drop every entry whose key starts with prefix"""
+        with self._lock:
+            self.generation += 1
+            for key in [k for k in self._data if str(k).startswith(prefix)]:
+                del self._data[key]